@@ -0,0 +1,96 @@
+"""
+merge time of 1 MB sections differing by a few edits,
+run from the repository root with: python -m benchmarks.benchmark_merge
+"""
+import difflib
+import random
+import timeit
+from typing import Tuple
+
+import notes_app.diff
+from notes_app.diff import MyersMatcher, merge_strings, merge_three_way
+
+SECTION_SIZE = 1024 * 1024
+EDITS_COUNT = 5
+REPEAT = 3
+
+WORDS = (
+    "quod equidem non reprehendo quis istum dolorem timet sed ut perspiciatis unde omnis iste natus error "
+    "sit voluptatem accusantium doloremque laudantium totam rem aperiam eaque ipsa quae ab illo inventore"
+).split()
+
+
+def get_section_text(random_generator: random.Random) -> str:
+    words = []
+    size = 0
+    while size < SECTION_SIZE:
+        word = random_generator.choice(WORDS)
+        separator = random_generator.choice(" " * 12 + ".,\n")
+        words.append(word + separator)
+        size += len(word) + 1
+    return "".join(words)
+
+
+def get_edited_text(
+    text: str, random_generator: random.Random, edited_part: float = 1.0
+) -> str:
+    """
+    the text with the edits at random positions of the edited part of the text around its middle
+    """
+    edited_start = int(len(text) * (1 - edited_part) / 2)
+    edited_end = len(text) - edited_start
+    for _ in range(EDITS_COUNT):
+        position = random_generator.randrange(edited_start, edited_end)
+        text = text[:position] + " edited " + text[position + 20 :]
+    return text
+
+
+def get_merge_time_and_size(merge, **kwargs) -> Tuple[float, int]:
+    merge_time = min(timeit.repeat(lambda: merge(**kwargs), number=1, repeat=REPEAT))
+    return merge_time, len(merge(**kwargs))
+
+
+def benchmark_engines(base: str, ours: str, theirs: str):
+    # the SequenceMatcher engine is the one merge_strings used before, with its junk heuristic
+    for engine_name, engine in (
+        ("Myers", MyersMatcher),
+        ("SequenceMatcher", lambda a, b: difflib.SequenceMatcher(None, a, b)),
+    ):
+        notes_app.diff.MyersMatcher = engine
+        try:
+            merge_strings_time, merge_strings_size = get_merge_time_and_size(
+                merge_strings, before=ours, after=theirs
+            )
+            merge_three_way_time, merge_three_way_size = get_merge_time_and_size(
+                merge_three_way, base=base, ours=ours, theirs=theirs
+            )
+        finally:
+            notes_app.diff.MyersMatcher = MyersMatcher
+        print(
+            f"{engine_name}: merge_strings {merge_strings_time:.3f} s "
+            f"({merge_strings_size} characters), "
+            f"merge_three_way {merge_three_way_time:.3f} s "
+            f"({merge_three_way_size} characters)"
+        )
+
+
+def main():
+    random_generator = random.Random(0)
+    base = get_section_text(random_generator=random_generator)
+    for edited_part in (1.0, 0.01):
+        ours = get_edited_text(
+            text=base, random_generator=random_generator, edited_part=edited_part
+        )
+        theirs = get_edited_text(
+            text=base, random_generator=random_generator, edited_part=edited_part
+        )
+        print(
+            f"section size {len(base)} characters, {EDITS_COUNT} edits on each side "
+            f"in {edited_part:.0%} of the section, "
+            f"the merged size is expected close to the section size"
+        )
+        benchmark_engines(base=base, ours=ours, theirs=theirs)
+
+
+if __name__ == "__main__":
+    main()
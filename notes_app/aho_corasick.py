@@ -0,0 +1,137 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+AHO_CORASICK_AUTOMATON_CACHE_SIZE = 16
+
+_ROOT_STATE = 0
+
+
+class AhoCorasickAutomaton:
+    """
+    The `AhoCorasickAutomaton` class finds the occurrences of all the patterns in a single pass over a text,
+    the states are the prefixes of the patterns, the failure link of a state leads to its longest suffix
+    being a state too, the output link to its longest suffix being a pattern.
+    """
+
+    def __init__(self, patterns: Tuple[str, ...]):
+        self._pattern_lengths = [len(pattern) for pattern in patterns]
+
+        self._transitions: List[Dict[str, int]] = [dict()]
+        # index of the pattern a state is, -1 for the states being only a pattern prefix
+        self._pattern_indexes: List[int] = [-1]
+        self._failure_links: List[int] = [_ROOT_STATE]
+        self._output_links: List[int] = [_ROOT_STATE]
+
+        for pattern_index, pattern in enumerate(patterns):
+            state = _ROOT_STATE
+            for char in pattern:
+                next_state = self._transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self._transitions)
+                    self._transitions[state][char] = next_state
+                    self._transitions.append(dict())
+                    self._pattern_indexes.append(-1)
+                    self._failure_links.append(_ROOT_STATE)
+                    self._output_links.append(_ROOT_STATE)
+                state = next_state
+            if pattern and self._pattern_indexes[state] == -1:
+                self._pattern_indexes[state] = pattern_index
+
+        # the failure links of the shorter prefixes are known before the longer ones in the breadth-first order
+        states = deque(self._transitions[_ROOT_STATE].values())
+        while states:
+            state = states.popleft()
+            for char, next_state in self._transitions[state].items():
+                failure_state = self._failure_links[state]
+                while (
+                    failure_state != _ROOT_STATE
+                    and char not in self._transitions[failure_state]
+                ):
+                    failure_state = self._failure_links[failure_state]
+                failure_state = self._transitions[failure_state].get(
+                    char, _ROOT_STATE
+                )
+                self._failure_links[next_state] = failure_state
+                self._output_links[next_state] = (
+                    failure_state
+                    if self._pattern_indexes[failure_state] != -1
+                    else self._output_links[failure_state]
+                )
+                states.append(next_state)
+
+        # the scan skips to the next occurrence of any pattern while in the root state,
+        # found by a regex of the trie so the regex engine does not try every pattern at every position
+        start_regex = self._get_trie_regex(state=_ROOT_STATE)
+        self._start_regex = re.compile(start_regex) if start_regex else None
+
+    def _get_trie_regex(self, state: int) -> str:
+        """
+        regex matching the shortest continuations of the state to a pattern,
+        a chain of states with a single transition and no pattern is matched as a literal
+        """
+        if self._pattern_indexes[state] != -1:
+            return ""
+
+        alternatives = []
+        for char, next_state in sorted(self._transitions[state].items()):
+            chars = [char]
+            while (
+                self._pattern_indexes[next_state] == -1
+                and len(self._transitions[next_state]) == 1
+            ):
+                ((char, next_state),) = self._transitions[next_state].items()
+                chars.append(char)
+            alternatives.append(
+                f"{re.escape(''.join(chars))}{self._get_trie_regex(state=next_state)}"
+            )
+
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return f"(?:{'|'.join(alternatives)})" if alternatives else ""
+
+    def iter_occurrences(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        (pattern index, start, end) of all the occurrences of the patterns in the order of their ends,
+        overlapping occurrences included
+        """
+        if self._start_regex is None:
+            return
+
+        transitions = self._transitions
+        pattern_indexes = self._pattern_indexes
+        failure_links = self._failure_links
+        output_links = self._output_links
+        pattern_lengths = self._pattern_lengths
+        start_search = self._start_regex.search
+
+        state = _ROOT_STATE
+        position = 0
+        text_length = len(text)
+
+        while position < text_length:
+            if state == _ROOT_STATE:
+                m = start_search(text, position)
+                if m is None:
+                    return
+                position = m.start()
+
+            char = text[position]
+            position += 1
+            while state != _ROOT_STATE and char not in transitions[state]:
+                state = failure_links[state]
+            state = transitions[state].get(char, _ROOT_STATE)
+
+            output_state = (
+                state if pattern_indexes[state] != -1 else output_links[state]
+            )
+            while output_state != _ROOT_STATE:
+                pattern_index = pattern_indexes[output_state]
+                yield pattern_index, position - pattern_lengths[pattern_index], position
+                output_state = output_links[output_state]
+
+
+@lru_cache(maxsize=AHO_CORASICK_AUTOMATON_CACHE_SIZE)
+def get_aho_corasick_automaton(patterns: Tuple[str, ...]) -> AhoCorasickAutomaton:
+    return AhoCorasickAutomaton(patterns=patterns)
@@ -1,6 +1,76 @@
+import os
+import shutil
+import sqlite3
+import tempfile
 from datetime import datetime
+from itertools import chain
+from mmap import mmap, ACCESS_READ
+from notes_app.full_text_index import (
+    FullTextIndex,
+    get_file_stat_key,
+    get_full_text_index_file_path,
+)
+from notes_app.journal import get_journal_file_path
+from notes_app.storage.bundle_storage import BUNDLE_STORAGE_DIR_EXTENSION, BundleStorage
+from notes_app.storage.sqlite_storage import (
+    SQLITE_STORAGE_FILE_EXTENSION,
+    SQLITE_SYNCHRONOUS_FULL,
+    SQLITE_SYNCHRONOUS_NORMAL,
+    SQLITE_SYNCHRONOUS_OFF,
+    SqliteStorage,
+)
 from notes_app.view.notes_view import NotesView
 
+FSYNC_POLICY_ALWAYS = "always"
+FSYNC_POLICY_ON_CLOSE = "on_close"
+FSYNC_POLICY_NEVER = "never"
+
+SQLITE_SYNCHRONOUS_BY_FSYNC_POLICY = {
+    FSYNC_POLICY_ALWAYS: SQLITE_SYNCHRONOUS_FULL,
+    FSYNC_POLICY_ON_CLOSE: SQLITE_SYNCHRONOUS_NORMAL,
+    FSYNC_POLICY_NEVER: SQLITE_SYNCHRONOUS_OFF,
+}
+
+FILE_WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def _get_data_chunks(data):
+    """
+    get data as an iterator of chunks, data can be text, raw bytes or an iterable of text
+    or raw bytes chunks, None is returned when there is no data to write
+    """
+    if isinstance(data, (str, bytes)):
+        return iter((data,)) if data else None
+
+    data_chunks = iter(data)
+    first_data_chunk = next(data_chunks, None)
+    if first_data_chunk is None:
+        return None
+    return chain((first_data_chunk,), data_chunks)
+
+
+def _open_file_for_data_chunk(file, data_chunk, mode="w"):
+    """
+    open the file for writing in the binary mode for a raw bytes data chunk or in the text mode otherwise,
+    file can be a file path or a file descriptor
+    """
+    if isinstance(data_chunk, bytes):
+        return open(file, f"{mode}b", buffering=FILE_WRITE_BUFFER_SIZE)
+    return open(file, mode, buffering=FILE_WRITE_BUFFER_SIZE, encoding="utf8")
+
+
+def _fsync_dir(dir_path) -> None:
+    """
+    persist the directory entries, so that a file renamed in the directory survives a crash
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 class NotesController:
     """
@@ -20,6 +90,12 @@ class NotesController:
         self.model = model
         self._generate_default_file_if_not_exists()
 
+        # persistent index of the sections of the notes files searched in the folder of the notes file,
+        # kept in the app cache directory
+        self.full_text_index = FullTextIndex(
+            index_file_path=self._get_full_text_index_file_path()
+        )
+
         self.view = NotesView(
             settings=settings, controller=self, model=self.model, defaults=self.defaults
         )
@@ -33,35 +109,252 @@ class NotesController:
             with open(file=self.defaults.DEFAULT_NOTES_FILE_NAME, mode="w", encoding="utf8") as f:
                 f.write(self.defaults.DEFAULT_NOTES_FILE_CONTENT)
 
+    def _get_full_text_index_file_path(self) -> str:
+        return get_full_text_index_file_path(
+            file_path=self.model.file_path,
+            index_file_name=self.defaults.DEFAULT_FULL_TEXT_INDEX_FILE_NAME,
+            index_dir_path=self.defaults.DEFAULT_FULL_TEXT_INDEX_DIR_PATH,
+        )
+
     def set_file_path(self, file_path) -> None:
         self.model.file_path = file_path
         self.model.update()
         self.model.dump()
 
+        # the notes file in another folder gets the index of that folder
+        index_file_path = self._get_full_text_index_file_path()
+        if index_file_path != self.full_text_index.index_file_path:
+            self.full_text_index.close()
+            self.full_text_index = FullTextIndex(index_file_path=index_file_path)
+
     def read_file_data(self, file_path=None) -> str:
         f = open(file_path or self.model.file_path, "r", encoding="utf8")
         s = f.read()
         f.close()
         return s
 
-    def save_file_data(self, data) -> None:
+    def read_file_data_mmap(self, file_path=None) -> mmap:
+        """
+        read_file_data_mmap maps the file read-only into memory so that the file data
+        is paged in by the OS only when accessed
         """
-        save_file_data saves provided data to the file with location set in model.file_path
+        with open(file_path or self.model.file_path, "rb") as f:
+            return mmap(f.fileno(), 0, access=ACCESS_READ)
+
+    def _fsync(self, f, atomic_save=False) -> None:
         """
-        if len(data) == 0:
+        flush and fsync the file before it gets closed, the file written by an atomic save
+        is fsynced before it replaces the file unless the fsync policy is never,
+        a file written in place only with the always fsync policy
+        """
+        fsync_policy = self.defaults.DEFAULT_FILE_FSYNC_POLICY
+        if fsync_policy == FSYNC_POLICY_NEVER or (
+            fsync_policy == FSYNC_POLICY_ON_CLOSE and not atomic_save
+        ):
             return
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _write_data_chunks(
+        self, file, data_chunks, offset=None, atomic_save=False
+    ) -> None:
+        """
+        write the data chunks through a buffered file object as they are produced,
+        with the offset set the file is overwritten from the offset onwards instead of truncated
+        """
+        data_chunk = next(data_chunks)
+        with _open_file_for_data_chunk(
+            file, data_chunk, mode="w" if offset is None else "r+"
+        ) as f:
+            if offset is not None:
+                f.seek(offset)
+            f.write(data_chunk)
+            f.writelines(data_chunks)
+            if offset is not None:
+                f.truncate()
+            self._fsync(f, atomic_save=atomic_save)
+
+    def _save_file_data_atomically(self, data_chunks) -> None:
+        """
+        write the data chunks to a temporary file next to the file with location set in model.file_path
+        and replace the file with it, so the file is never left partially written
+        """
+        file_path = os.path.abspath(self.model.file_path)
+        dir_path, file_name = os.path.split(file_path)
+
+        fd, temp_file_path = tempfile.mkstemp(
+            prefix=f".{file_name}.", suffix=".tmp", dir=dir_path
+        )
+        try:
+            self._write_data_chunks(file=fd, data_chunks=data_chunks, atomic_save=True)
+            if os.path.exists(file_path):
+                shutil.copymode(file_path, temp_file_path)
+            os.replace(temp_file_path, self.model.file_path)
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+
+        if self.defaults.DEFAULT_FILE_FSYNC_POLICY == FSYNC_POLICY_ALWAYS:
+            _fsync_dir(dir_path)
+
+    def save_file_data(self, data, atomic_save=None) -> None:
+        """
+        save_file_data saves provided data to the file with location set in model.file_path,
+        data can be text, raw bytes or an iterable of text or raw bytes chunks which are written
+        as they are produced, so the whole data does not need to be held in memory,
+        atomic_save overrides the DEFAULT_FILE_ATOMIC_SAVE default
+        """
+        data_chunks = _get_data_chunks(data=data)
+        if data_chunks is None:
+            return
+
+        if atomic_save is None:
+            atomic_save = self.defaults.DEFAULT_FILE_ATOMIC_SAVE
+
+        if atomic_save:
+            # the file is left untouched on failure so no dump file is needed
+            self._save_file_data_atomically(data_chunks=data_chunks)
+        else:
+            try:
+                self._write_data_chunks(file=self.model.file_path, data_chunks=data_chunks)
+            except Exception as exc:
+                # another attempt at writing at least a dump file,
+                # possible only when the whole data was provided
+                if isinstance(data, (str, bytes)):
+                    self._write_data_chunks(
+                        file=f"__dump__{datetime.now():%Y_%m_%d_%H_%M_%S}",
+                        data_chunks=iter((data,)),
+                    )
+                raise exc
+
+        self.model.update()
+        self.model.dump()
+
+    def save_file_data_from_offset(self, data, offset) -> None:
+        """
+        save_file_data_from_offset overwrites the file with location set in model.file_path
+        with provided raw data or raw data chunks starting at the offset,
+        the file data before the offset is kept
+        """
+        data_chunks = _get_data_chunks(data=data) or iter((b"",))
+
+        self._write_data_chunks(
+            file=self.model.file_path, data_chunks=data_chunks, offset=offset
+        )
+
+        self.model.update()
+        self.model.dump()
+
+    def save_file_journal_data(self, data, new_journal=False) -> None:
+        """
+        save_file_journal_data appends provided raw data to the journal file of the file
+        with location set in model.file_path, so that the records appended by another instance
+        are never overwritten, a new journal is only created when there is no journal yet,
+        the file itself is left untouched
+        """
+        with _open_file_for_data_chunk(
+            get_journal_file_path(file_path=self.model.file_path),
+            data,
+            mode="x" if new_journal else "a",
+        ) as f:
+            f.write(data)
+            self._fsync(f)
+
+        self.model.update()
+        self.model.dump()
+
+    def update_full_text_index(
+        self, file_path, previous_file_stat_key, section_separators, changed_sections
+    ) -> None:
+        """
+        update_full_text_index updates the full text index of the saved file incrementally
+        with the changed sections, previous_file_stat_key is the (modification time, size)
+        of the file before the save, the index being a cache it is left as it was on failure
+        """
         try:
-            with open(self.model.file_path, "w", encoding="utf8") as f:
-                f.write(data)
-        except Exception as exc:
-            # another attempt at writing at least a dump file
-            with open(f"__dump__{datetime.now():%Y_%m_%d_%H_%M_%S}", "w", encoding="utf8") as f:
-                f.write(data)
-            raise exc
+            self.full_text_index.update_file(
+                file_path=os.path.abspath(file_path),
+                previous_file_stat_key=previous_file_stat_key,
+                file_stat_key=get_file_stat_key(file_path=file_path),
+                section_separators=section_separators,
+                changed_sections=changed_sections,
+            )
+        except (OSError, sqlite3.Error):
+            pass
+
+    def get_storage(self, file_path=None, read_only=False):
+        """
+        get_storage picks the storage keeping the sections apart by the extension of the file,
+        None is returned for a plain text file with all the sections in it,
+        a read only storage never writes the file
+        """
+        file_path = file_path or self.model.file_path
+
+        file_extension = os.path.splitext(file_path)[1]
+
+        if file_extension == SQLITE_STORAGE_FILE_EXTENSION:
+            return SqliteStorage(
+                file_path=file_path,
+                synchronous=SQLITE_SYNCHRONOUS_BY_FSYNC_POLICY[
+                    self.defaults.DEFAULT_FILE_FSYNC_POLICY
+                ],
+                read_only=read_only,
+            )
+        if file_extension == BUNDLE_STORAGE_DIR_EXTENSION:
+            return BundleStorage(
+                dir_path=file_path,
+                section_name_regex=self.defaults.DEFAULT_SECTION_FILE_SEPARATOR_GROUP_SUBSTR_REGEX,
+                fsync=self.defaults.DEFAULT_FILE_FSYNC_POLICY != FSYNC_POLICY_NEVER,
+            )
+        return None
+
+    def save_storage_data(
+        self, storage, section_separators, changed_sections, deleted_section_separators
+    ) -> None:
+        """
+        save_storage_data saves the changed sections and the order of the sections
+        to the storage of the file with location set in model.file_path,
+        only the deleted sections get deleted from the storage
+        """
+        storage.save_sections(
+            section_separators=section_separators,
+            changed_sections=changed_sections,
+            deleted_section_separators=deleted_section_separators,
+        )
 
         self.model.update()
         self.model.dump()
 
+    def export_file_data(self, file, file_path) -> None:
+        """
+        export_file_data saves all sections of the file to a plain text file at file_path
+        """
+        data_chunks = _get_data_chunks(data=file.iter_raw_data_content_chunks())
+        if data_chunks is None:
+            return
+
+        self._write_data_chunks(file=file_path, data_chunks=data_chunks)
+
+    def import_file_data(self, file, file_path) -> None:
+        """
+        import_file_data saves all sections of the file to a new storage at file_path
+        """
+        storage = self.get_storage(file_path=file_path)
+        try:
+            storage.save_sections(
+                section_separators=file.section_separators,
+                changed_sections=(
+                    (
+                        section_separator,
+                        file.get_section_content(section_separator=section_separator),
+                    )
+                    for section_separator in file.section_separators
+                ),
+            )
+        finally:
+            storage.close()
+
     def get_screen(self):
         """
         The method creates get the view.
@@ -6,10 +6,23 @@ class Defaults:
     DEFAULT_SECTION_FILE_SEPARATOR_GROUP_SUBSTR_REGEX = "<section=(.+?)> "
     DEFAULT_NOTES_FILE_CONTENT = f"{DEFAULT_SECTION_FILE_SEPARATOR.format(name='first')} Your first section. Here you can write your notes."
     DEFAULT_AUTO_SAVE_TEXT_INPUT_CHANGE_COUNT = 5
+    DEFAULT_FILE_MMAP_READ_MODE = False
+    DEFAULT_FILE_ATOMIC_SAVE = False
+    DEFAULT_FILE_FSYNC_POLICY = "on_close"
+    DEFAULT_FILE_JOURNAL_MODE = False
+    DEFAULT_FILE_JOURNAL_COMPACTION_SIZE = 8 * 1024 * 1024
     DEFAULT_VALUE_SEARCH_CASE_SENSITIVE = False
     DEFAULT_VALUE_SEARCH_ALL_SECTIONS = False
     DEFAULT_VALUE_SEARCH_FULL_WORDS = False
+    DEFAULT_VALUE_SEARCH_REGEX = False
+    DEFAULT_VALUE_SEARCH_LIVE = False
+    DEFAULT_VALUE_SEARCH_FUZZY = False
+    DEFAULT_VALUE_SEARCH_MULTIPLE = False
+    DEFAULT_VALUE_SEARCH_FOLDER = False
+    DEFAULT_SEARCH_PARALLEL_MODE = False
     DEFAULT_SETTINGS_STORE_FILE_NAME = "settings.json"
+    DEFAULT_FULL_TEXT_INDEX_FILE_NAME = "notes_index.sqlite"
+    DEFAULT_FULL_TEXT_INDEX_DIR_PATH = None
     DEFAULT_SETTINGS_VALUE_FONT_NAME = "RobotoMono-Regular"
     DEFAULT_SETTINGS_VALUE_FONT_SIZE = "14.0"
     DEFAULT_SETTINGS_VALUE_BACKGROUND_COLOR = "black"
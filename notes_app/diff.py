@@ -1,11 +1,288 @@
 import difflib
-from typing import List
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain, islice
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-TEXT_FILE_LINE_BREAK_CHAR = "\n"
-# TEXT_FILE_LINE_BREAK_CHAR_TEMP_REPLACEMENT is used because difflib SequenceMatcher consumes line endings
-# so we replace line endings with this temporary replacement and after retrieving the matched results we replace
-# back text file line ending defined in TEXT_FILE_LINE_BREAK_CHAR
-TEXT_FILE_LINE_BREAK_CHAR_TEMP_REPLACEMENT = "Y3j28cXxSDaoSStrtLsj"
+# the edit cost a middle snake is searched up to, a costlier difference is split at the furthest reaching path
+# instead, so that the diff of very different texts stays close to linear in time
+MYERS_MAX_COST = 256
+
+
+def _find_middle_snake(
+    a: Sequence, a_lo: int, a_hi: int, b: Sequence, b_lo: int, b_hi: int
+) -> Tuple[int, int, int, int]:
+    """
+    (a start, b start, a end, b end) of the middle snake of the shortest edit script of a[a_lo:a_hi]
+    and b[b_lo:b_hi], the sequences are expected to differ both in the first and in the last item
+    """
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta & 1
+    max_d = min((n + m + 1) // 2, MYERS_MAX_COST)
+
+    # the furthest x reached on every diagonal k = x - y, the backward x and y count from the ends
+    offset = max_d + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (
+                k != d and forward[offset + k - 1] < forward[offset + k + 1]
+            ):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -d < delta - k < d and x + backward[offset + delta - k] >= n:
+                return a_lo + x_start, b_lo + y_start, a_lo + x, b_lo + y
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (
+                k != d and backward[offset + k - 1] < backward[offset + k + 1]
+            ):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x_end, y_end = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if (
+                not odd
+                and -d <= delta - k <= d
+                and x + forward[offset + delta - k] >= n
+            ):
+                return a_hi - x, b_hi - y, a_hi - x_end, b_hi - y_end
+
+    # too costly, the sequences are split at the end of the forward path reaching furthest
+    x, y = max(
+        (
+            (min(forward[offset + k], n), min(max(forward[offset + k] - k, 0), m))
+            for k in range(-max_d, max_d + 1, 2)
+        ),
+        key=sum,
+    )
+    return a_lo + x, b_lo + y, a_lo + x, b_lo + y
+
+
+def _get_unique_anchors(a: Sequence, b: Sequence) -> List[Tuple[int, int]]:
+    """
+    (a index, b index) of the items found once in a and once in b, the longest list of these in the same order
+    in both sequences, the way the patience diff anchors the sequences on the lines unique to both
+    """
+    a_counts, b_counts = Counter(a), Counter(b)
+    # the index of the last occurrence, the only one of a unique item
+    a_indexes = dict(zip(a, range(len(a))))
+    b_indexes = dict(zip(b, range(len(b))))
+    pairs = sorted(
+        (a_indexes[item], b_indexes[item])
+        for item, count in a_counts.items()
+        if count == 1 and b_counts.get(item) == 1
+    )
+
+    # the longest increasing subsequence of the b indexes in patience sorting
+    pile_tops: List[int] = []
+    pile_top_pairs: List[int] = []
+    previous: List[Optional[int]] = []
+    for pair_index, (_, j) in enumerate(pairs):
+        pile = bisect_left(pile_tops, j)
+        previous.append(pile_top_pairs[pile - 1] if pile else None)
+        if pile == len(pile_tops):
+            pile_tops.append(j)
+            pile_top_pairs.append(pair_index)
+        else:
+            pile_tops[pile] = j
+            pile_top_pairs[pile] = pair_index
+
+    anchors = []
+    pair_index = pile_top_pairs[-1] if pile_top_pairs else None
+    while pair_index is not None:
+        anchors.append(pairs[pair_index])
+        pair_index = previous[pair_index]
+    anchors.reverse()
+    return anchors
+
+
+def _get_common_prefix_length(a: Sequence, b: Sequence) -> int:
+    """
+    length of the common prefix, compared in slices of growing and then shrinking length,
+    so that the items are compared at C speed
+    """
+    max_length = min(len(a), len(b))
+    length, chunk_length, growing = 0, 1, True
+    while chunk_length and length < max_length:
+        end = min(length + chunk_length, max_length)
+        if a[length:end] == b[length:end]:
+            length = end
+            if growing:
+                chunk_length *= 2
+        else:
+            growing = False
+            chunk_length //= 2
+    return length
+
+
+def _get_common_suffix_length(a: Sequence, b: Sequence, max_length: int) -> int:
+    """
+    length of the common suffix up to the max length, compared like the common prefix
+    """
+    a_length, b_length = len(a), len(b)
+    length, chunk_length, growing = 0, 1, True
+    while chunk_length and length < max_length:
+        end = min(length + chunk_length, max_length)
+        if (
+            a[a_length - end : a_length - length]
+            == b[b_length - end : b_length - length]
+        ):
+            length = end
+            if growing:
+                chunk_length *= 2
+        else:
+            growing = False
+            chunk_length //= 2
+    return length
+
+
+def _intern_tokens(a: Sequence, b: Sequence) -> Tuple[array, array]:
+    """
+    the tokens replaced by integer ids, the same tokens get the same id,
+    so the diff compares integers instead of hashing and comparing strings
+    """
+    token_ids = {token: i for i, token in enumerate(dict.fromkeys(chain(a, b)))}
+    return (
+        array("i", map(token_ids.__getitem__, a)),
+        array("i", map(token_ids.__getitem__, b)),
+    )
+
+
+def _find_matches(a: Sequence, b: Sequence) -> List[Tuple[int, int, int]]:
+    """
+    (a start, b start, size) of the matches of the shortest edit script, not in order
+    """
+    matches = []
+    pending = []
+    a_lo = b_lo = 0
+    for i, j in _get_unique_anchors(a=a, b=b):
+        matches.append((i, j, 1))
+        pending.append((a_lo, i, b_lo, j))
+        a_lo, b_lo = i + 1, j + 1
+    pending.append((a_lo, len(a), b_lo, len(b)))
+
+    while pending:
+        a_lo, a_hi, b_lo, b_hi = pending.pop()
+
+        # the common prefix and suffix are matched right away
+        a_start, b_start = a_lo, b_lo
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        if a_lo > a_start:
+            matches.append((a_start, b_start, a_lo - a_start))
+        a_end = a_hi
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+        if a_end > a_hi:
+            matches.append((a_hi, b_hi, a_end - a_hi))
+
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+        x, y, u, v = _find_middle_snake(
+            a=a, a_lo=a_lo, a_hi=a_hi, b=b, b_lo=b_lo, b_hi=b_hi
+        )
+        # a split making no progress leaves the rest as a replacement
+        if (x, y) == (a_hi, b_hi) or (u, v) == (a_lo, b_lo):
+            continue
+        if u > x:
+            matches.append((x, y, u - x))
+        pending.append((u, a_hi, v, b_hi))
+        pending.append((a_lo, x, b_lo, y))
+    return matches
+
+
+class MyersMatcher:
+    """
+    The `MyersMatcher` class finds the matching blocks and the opcodes of two sequences like difflib SequenceMatcher,
+    using the Myers O(ND) difference algorithm with the linear space divide and conquer refinement.
+    The time depends on the size of the difference rather than on the size of the sequences
+    and no junk heuristic drops the frequent items of long sequences.
+    The common prefix and suffix are matched without diffing them and the rest is diffed
+    as arrays of integer ids of the items, so the time is proportional to the edited part.
+    The sequences are first anchored on their unique items, so the frequent separators between
+    the changes are not matched at the cost of the words around them.
+    """
+
+    def __init__(self, a: Sequence, b: Sequence):
+        self.a = a
+        self.b = b
+        self._matching_blocks: Optional[List[difflib.Match]] = None
+
+    def get_matching_blocks(self) -> List[difflib.Match]:
+        """
+        (a start, b start, size) of the matching blocks in order, the last one is (len(a), len(b), 0)
+        """
+        if self._matching_blocks is not None:
+            return self._matching_blocks
+
+        a, b = self.a, self.b
+        # an edit usually touches a small part of a text, the common ends are matched without diffing them
+        prefix_length = _get_common_prefix_length(a=a, b=b)
+        suffix_length = _get_common_suffix_length(
+            a=a, b=b, max_length=min(len(a), len(b)) - prefix_length
+        )
+        a_ids, b_ids = _intern_tokens(
+            a=a[prefix_length : len(a) - suffix_length],
+            b=b[prefix_length : len(b) - suffix_length],
+        )
+        matches = [
+            (i + prefix_length, j + prefix_length, size)
+            for i, j, size in _find_matches(a=a_ids, b=b_ids)
+        ]
+        matches.append((0, 0, prefix_length))
+        matches.append((len(a) - suffix_length, len(b) - suffix_length, suffix_length))
+
+        matching_blocks = []
+        for i, j, size in sorted(match for match in matches if match[2]):
+            if matching_blocks:
+                last_i, last_j, last_size = matching_blocks[-1]
+                if last_i + last_size == i and last_j + last_size == j:
+                    matching_blocks[-1] = difflib.Match(
+                        last_i, last_j, last_size + size
+                    )
+                    continue
+            matching_blocks.append(difflib.Match(i, j, size))
+        matching_blocks.append(difflib.Match(len(self.a), len(self.b), 0))
+        self._matching_blocks = matching_blocks
+        return matching_blocks
+
+    def get_opcodes(self) -> List[Tuple[str, int, int, int, int]]:
+        """
+        the operations turning a into b, the same as of difflib SequenceMatcher.get_opcodes
+        """
+        opcodes = []
+        i = j = 0
+        for a_start, b_start, size in self.get_matching_blocks():
+            if i < a_start and j < b_start:
+                opcodes.append(("replace", i, a_start, j, b_start))
+            elif i < a_start:
+                opcodes.append(("delete", i, a_start, j, b_start))
+            elif j < b_start:
+                opcodes.append(("insert", i, a_start, j, b_start))
+            i, j = a_start + size, b_start + size
+            if size:
+                opcodes.append(("equal", a_start, i, b_start, j))
+        return opcodes
 
 
 def _merge(left, right):
@@ -13,7 +290,7 @@ def _merge(left, right):
     _merge
     https://stackoverflow.com/questions/37263682/how-to-find-union-of-two-strings-and-maintain-the-order
     """
-    m = difflib.SequenceMatcher(None, left, right)
+    m = MyersMatcher(a=left, b=right)
     for o, i1, i2, j1, j2 in m.get_opcodes():
         if o == "equal":
             yield left[i1:i2]
@@ -26,15 +303,6 @@ def _merge(left, right):
             yield right[j1:j2]
 
 
-def _replace_line_endings(
-    input_text: str, line_ending: str, line_ending_replacement: str
-) -> str:
-    """
-    _replace_line_endings
-    """
-    return input_text.replace(line_ending, line_ending_replacement)
-
-
 SEPARATORS = {
     " ",  # (blank space)
     "~",  # (tilde)
@@ -70,32 +338,30 @@ SEPARATORS = {
 }
 
 
+# the text is split on every separator, the words between the separators are kept, empty ones included,
+# the line breaks are not separators, so they stay in the words
+_SEPARATORS_REGEX = re.compile(
+    "([{}])".format("".join(re.escape(separator) for separator in sorted(SEPARATORS)))
+)
+
+
 def _split(input_text: str) -> List:
-    result = []
-    offset = 0
-    for idx, string in enumerate(input_text):
-        if string in SEPARATORS:
-            result.append(input_text[offset:idx])
-            result.append(string)
-            offset = idx + 1
-        # the last word in the enumerated input text
-        if idx + 1 == len(input_text):
-            result.append(input_text[offset : idx + 1])
-    return result
+    if not input_text:
+        return []
+    return _SEPARATORS_REGEX.split(input_text)
 
 
 def _join(input_list: List, separator: str) -> str:
-    result = str()
-    for idx, el in enumerate(input_list):
-        if (
-            idx == 0
-            or (el in SEPARATORS)
-            or (idx > 1 and input_list[idx - 1] in SEPARATORS)
-        ):
-            result += el
-        else:
-            result += f"{separator}{el}"
-    return result
+    result = input_list[:1]
+    # the separator is put between two words, the first item is taken for a word even when a separator
+    previous_is_separator = False
+    for el in islice(input_list, 1, None):
+        is_separator = el in SEPARATORS
+        if not is_separator and not previous_is_separator:
+            result.append(separator)
+        result.append(el)
+        previous_is_separator = is_separator
+    return "".join(result)
 
 
 def merge_strings(before: str, after: str) -> str:
@@ -103,27 +369,115 @@ def merge_strings(before: str, after: str) -> str:
     merge_strings
     """
     default_separator = " "
-    merged = _merge(
-        _split(
-            _replace_line_endings(
-                input_text=before,
-                line_ending=TEXT_FILE_LINE_BREAK_CHAR,
-                line_ending_replacement=TEXT_FILE_LINE_BREAK_CHAR_TEMP_REPLACEMENT,
-            )
-        ),
-        _split(
-            _replace_line_endings(
-                input_text=after,
-                line_ending=TEXT_FILE_LINE_BREAK_CHAR,
-                line_ending_replacement=TEXT_FILE_LINE_BREAK_CHAR_TEMP_REPLACEMENT,
-            )
-        ),
+    merged = _merge(_split(before), _split(after))
+    return _join(
+        input_list=list(chain.from_iterable(merged)), separator=default_separator
     )
 
-    merged_result_list = [el for sublist in merged for el in sublist]
 
-    return _replace_line_endings(
-        input_text=_join(input_list=merged_result_list, separator=default_separator),
-        line_ending=TEXT_FILE_LINE_BREAK_CHAR_TEMP_REPLACEMENT,
-        line_ending_replacement=TEXT_FILE_LINE_BREAK_CHAR,
+# the words and every other single character, so that joining the tokens gives the text back
+_TOKEN_REGEX = re.compile(r"\w+|\W")
+_WORD_REGEX = re.compile(r"\w")
+
+
+def _tokenize(input_text: str) -> List[str]:
+    return _TOKEN_REGEX.findall(input_text)
+
+
+def _iter_sync_regions(
+    base: List[str], ours: List[str], theirs: List[str]
+) -> Iterator[Tuple[int, int, int, int, int, int]]:
+    """
+    (base start, base end, ours start, ours end, theirs start, theirs end) of the regions
+    of the base unchanged both in ours and in theirs, followed by the empty region at the ends
+    """
+    ours_matches = MyersMatcher(a=base, b=ours).get_matching_blocks()
+    theirs_matches = MyersMatcher(a=base, b=theirs).get_matching_blocks()
+
+    ours_index = theirs_index = 0
+    while ours_index < len(ours_matches) and theirs_index < len(theirs_matches):
+        ours_base_start, ours_start, ours_length = ours_matches[ours_index]
+        theirs_base_start, theirs_start, theirs_length = theirs_matches[theirs_index]
+
+        base_start = max(ours_base_start, theirs_base_start)
+        base_end = min(
+            ours_base_start + ours_length, theirs_base_start + theirs_length
+        )
+        if base_start < base_end:
+            yield (
+                base_start,
+                base_end,
+                ours_start + base_start - ours_base_start,
+                ours_start + base_end - ours_base_start,
+                theirs_start + base_start - theirs_base_start,
+                theirs_start + base_end - theirs_base_start,
+            )
+
+        # the match ending first in the base cannot overlap any further match of the other side
+        if ours_base_start + ours_length < theirs_base_start + theirs_length:
+            ours_index += 1
+        else:
+            theirs_index += 1
+
+    yield len(base), len(base), len(ours), len(ours), len(theirs), len(theirs)
+
+
+def _merge_conflict(ours: List[str], theirs: List[str]) -> List[str]:
+    """
+    both ours and theirs changed the same part of the base differently, so the union of the changes is kept,
+    the words coming next to each other from the different sides get a space between them
+    """
+    merged = []
+    for token in chain.from_iterable(_merge(ours, theirs)):
+        if merged and _WORD_REGEX.match(token) and _WORD_REGEX.match(merged[-1]):
+            merged.append(" ")
+        merged.append(token)
+    return merged
+
+
+def _iter_merged_tokens(
+    base: List[str], ours: List[str], theirs: List[str]
+) -> Iterator[List[str]]:
+    base_index = ours_index = theirs_index = 0
+    for (
+        base_start,
+        base_end,
+        ours_start,
+        ours_end,
+        theirs_start,
+        theirs_end,
+    ) in _iter_sync_regions(base=base, ours=ours, theirs=theirs):
+        base_chunk = base[base_index:base_start]
+        ours_chunk = ours[ours_index:ours_start]
+        theirs_chunk = theirs[theirs_index:theirs_start]
+
+        if ours_chunk == theirs_chunk or theirs_chunk == base_chunk:
+            yield ours_chunk
+        elif ours_chunk == base_chunk:
+            yield theirs_chunk
+        else:
+            yield _merge_conflict(ours=ours_chunk, theirs=theirs_chunk)
+
+        yield base[base_start:base_end]
+        base_index, ours_index, theirs_index = base_end, ours_end, theirs_end
+
+
+def merge_three_way(base: str, ours: str, theirs: str) -> str:
+    """
+    merge the changes of ours and theirs made to the base, a part of the base changed on a single side
+    gets the change of that side, a part changed differently on both sides keeps both the changes
+    """
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+
+    return "".join(
+        chain.from_iterable(
+            _iter_merged_tokens(
+                base=_tokenize(input_text=base),
+                ours=_tokenize(input_text=ours),
+                theirs=_tokenize(input_text=theirs),
+            )
+        )
     )
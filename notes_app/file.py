@@ -1,11 +1,39 @@
 import re
-from typing import List, Dict, Optional
+from os import linesep, stat, stat_result
+from mmap import mmap
+from typing import List, Dict, Iterator, Optional, Tuple, Union
+
+from notes_app.diff import merge_three_way
+from notes_app.full_text_index import get_file_stat_key
+from notes_app.journal import (
+    JOURNAL_RECORD_TYPE_DELETE,
+    JOURNAL_RECORD_TYPE_REPLACE,
+    JournalRecord,
+    get_journal_file_path,
+    get_journal_header_data,
+    get_journal_record_data,
+    get_replaced_range,
+    read_journal,
+    remove_journal,
+)
+from notes_app.search_index import SearchIndex
+from notes_app.section_index import (
+    get_section_content_hash,
+    read_section_index,
+    write_section_index,
+)
+from notes_app.storage.bundle_storage import is_bundle
+from notes_app.storage.notes_storage import Storage
 
 SECTION_FILE_NEW_SECTION_PLACEHOLDER = ""
 SECTION_FILE_NAME_MINIMAL_CHAR_COUNT = 2
 
+FILE_ENCODING = "utf8"
+
 
 def get_validated_file_path(file_path: str) -> Optional[str]:
+    if is_bundle(dir_path=file_path):
+        return file_path
     try:
         with open(file=file_path, mode="r", encoding="utf8"):
             pass
@@ -14,6 +42,34 @@ def get_validated_file_path(file_path: str) -> Optional[str]:
     return file_path
 
 
+def decode_raw_data(raw_data: bytes) -> str:
+    """
+    decode raw bytes read from the file the same way as the file opened in text mode,
+    including the universal newlines translation
+    """
+    data = raw_data.decode(FILE_ENCODING)
+    if "\r" in data:
+        return data.replace("\r\n", "\n").replace("\r", "\n")
+    return data
+
+
+def encode_raw_data(data: str) -> bytes:
+    """
+    encode data to raw bytes the same way as the file opened in text mode for writing,
+    including the newlines translation to the OS line separator
+    """
+    if linesep != "\n":
+        data = data.replace("\n", linesep)
+    return data.encode(FILE_ENCODING)
+
+
+def get_file_identity(file_stat: stat_result) -> Tuple[int, int, int]:
+    """
+    the file rewritten in place or replaced gets a different identity
+    """
+    return file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
+
+
 def transform_section_separator_to_section_name(
     defaults, section_separator: str
 ) -> str:
@@ -27,100 +83,944 @@ def transform_section_name_to_section_separator(defaults, section_name: str) ->
 
 
 class File:
-    def __init__(self, file_path, controller, defaults):
+    def __init__(self, file_path, controller, defaults, read_only=False):
         self._file_path = file_path
         self._controller = controller
 
         self.defaults = defaults
 
-        self._raw_data_content: str = self._get_validated_raw_data(
-            raw_data=self.get_raw_data_content()
+        # a read only file is only read, it never repairs the journal, nor writes the section index
+        # or the storage, so that files owned by another instance can be searched
+        self._read_only: bool = read_only
+
+        # in the mmap read mode the raw data content is the memory-mapped file,
+        # separators are scanned on the mapped bytes and only the requested sections get decoded
+        self._mmap_read_mode: bool = self.defaults.DEFAULT_FILE_MMAP_READ_MODE
+
+        # in the journal mode saves append the changed section ranges to the journal file
+        # instead of rewriting the file, the journal gets folded back into the file by compact
+        self._journal_mode: bool = self.defaults.DEFAULT_FILE_JOURNAL_MODE
+        self._journal_size: int = 0
+        # the stat of the file as last read or saved, the journal applies only to that file
+        self._journal_file_stat: Optional[stat_result] = None
+
+        self._section_separator_regex = re.compile(
+            self.defaults.DEFAULT_SECTION_FILE_SEPARATOR_REGEX
+        )
+        self._section_separator_bytes_regex = re.compile(
+            self.defaults.DEFAULT_SECTION_FILE_SEPARATOR_REGEX.encode(FILE_ENCODING)
+        )
+
+        # the storage keeping the sections apart, None for a plain text file
+        self._storage: Optional[Storage] = self._controller.get_storage(
+            file_path=self._file_path, read_only=self._read_only
         )
 
-        self._data_by_sections: Dict[
-            str, str
-        ] = self._transform_raw_data_content_to_data_by_sections()
+        self._raw_data_content: Union[str, mmap] = ""
+        # the stat of the file when it was mapped, the mapping is read only while the file is unchanged,
+        # reading a file truncated under the mapping would otherwise crash the process
+        self._mapped_file_stat: Optional[stat_result] = None
 
-    def _get_validated_raw_data(self, raw_data) -> str:
-        matches = re.findall(
-            self.defaults.DEFAULT_SECTION_FILE_SEPARATOR_REGEX, raw_data
+        # section separator -> (start, end) offsets of the section content in the raw data content
+        # as last read from or saved to the file,
+        # the section content string is sliced from the raw data content only when requested
+        self._section_offsets: Dict[str, Tuple[int, int]] = dict()
+
+        # section separator -> hash of the raw section content as last read from or saved to the file,
+        # in the mmap read mode the hashes are indexed with the offsets, otherwise computed when needed
+        self._section_hashes: Dict[str, int] = dict()
+
+        # section separator -> section content set after the file was read,
+        # None marks a section whose content is still to be read from the file or the storage
+        self._data_by_sections: Dict[str, Optional[str]] = dict.fromkeys(
+            self._read_section_separators()
+        )
+
+        # the sections as last read from or saved to the file, the section contents are compared
+        # by identity, any section content set equal to the saved one is replaced by the saved one,
+        # a section content gets kept here once it is read or changed, so that it stays the base
+        # of the changes made to it even when the file gets changed externally in the meantime,
+        # None marks a section neither read nor changed since the last read or save
+        self._saved_data_by_sections: Dict[str, Optional[str]] = dict(
+            self._data_by_sections
         )
-        if not matches:
+
+        # incremented with every change of the sections, so the sections do not need to be compared
+        # with the saved sections when nothing was changed since the last read or save
+        self._version: int = 0
+        self._saved_version: int = 0
+
+        # inverted index of the section words narrowing the sections searched for a pattern
+        self._search_index = SearchIndex(get_section_content=self.get_section_content)
+
+        self._replay_journal()
+
+    def _get_section_separator_regex(self, raw_data):
+        if isinstance(raw_data, str):
+            return self._section_separator_regex
+        return self._section_separator_bytes_regex
+
+    def _get_validated_raw_data(self, raw_data):
+        if not self._get_section_separator_regex(raw_data=raw_data).search(raw_data):
             raise ValueError("No section in file found")
         return raw_data
 
+    def _read_raw_data_content(self) -> Union[str, mmap]:
+        if self._mmap_read_mode:
+            return self._map_file()
+        return self.get_raw_data_content()
+
+    def _map_file(self) -> mmap:
+        # the file is stat before it is mapped, so a change in between is taken for a change after the mapping
+        self._mapped_file_stat = stat(self._file_path)
+        return self._controller.read_file_data_mmap(file_path=self._file_path)
+
+    def _is_mapped_file_changed(self) -> bool:
+        """
+        whether the mapped file was changed, replaced or removed since it was mapped
+        """
+        try:
+            file_stat = stat(self._file_path)
+        except FileNotFoundError:
+            return True
+        return get_file_identity(file_stat=file_stat) != get_file_identity(
+            file_stat=self._mapped_file_stat
+        )
+
+    def _is_saved_file_mapped(self) -> bool:
+        """
+        whether the mapped file is still the file as last read or saved,
+        the section offsets of the saved sections are only valid in that file
+        """
+        return not self._is_mapped_file_changed() and get_file_identity(
+            file_stat=self._mapped_file_stat
+        ) == get_file_identity(file_stat=self._journal_file_stat)
+
+    def _remap_file(self) -> None:
+        """
+        map the changed file again and index the sections in it,
+        the section contents not read yet get read from the changed file
+        """
+        self.close()
+        self._raw_data_content = self._get_validated_raw_data(
+            raw_data=self._map_file()
+        )
+        self._index_raw_data_content()
+
+    def _read_section_separators(self) -> List[str]:
+        """
+        read the section separators in the order of the sections,
+        the section contents get read only when requested
+        """
+        if self._storage is not None:
+            section_separators = self._storage.read_section_separators()
+            if not section_separators:
+                raise ValueError("No section in file found")
+            self._section_hashes = dict()
+            return section_separators
+
+        self._raw_data_content = self._get_validated_raw_data(
+            raw_data=self._read_raw_data_content()
+        )
+        self._index_raw_data_content()
+        return list(self._section_offsets)
+
     def reload(self):
         """
         reload data from file to variables
         """
-        self._raw_data_content = self._get_validated_raw_data(
-            raw_data=self.get_raw_data_content()
+        self.close()
+
+        self._data_by_sections = dict.fromkeys(self._read_section_separators())
+        self._set_data_by_sections_saved()
+        self._search_index.clear()
+        self._replay_journal()
+
+    def merge_external_update(self) -> None:
+        """
+        reload the sections updated externally keeping the sections changed since the last read or save,
+        a section changed on a single side gets the content of that side and only a section changed
+        on both sides gets its contents merged, a section deleted on one side and changed on the other is kept,
+        as well as a section deleted without being read
+        """
+        data_by_sections = self._data_by_sections
+        saved_data_by_sections = self._saved_data_by_sections
+
+        # the saved contents the changes were made to, kept since the sections were first read or changed,
+        # the file changed externally in the meantime is never read for them
+        base_data_by_sections = {
+            section_separator: saved_section_content
+            for section_separator, saved_section_content in saved_data_by_sections.items()
+            if saved_section_content is not None
+            and (
+                section_separator not in data_by_sections
+                or data_by_sections[section_separator] is not saved_section_content
+            )
+        }
+
+        self.reload()
+
+        for section_separator, base_section_content in base_data_by_sections.items():
+            if (
+                section_separator not in data_by_sections
+                and section_separator in self._data_by_sections
+                and self._is_saved_section_content(
+                    section_separator=section_separator,
+                    section_content=base_section_content,
+                )
+            ):
+                self.delete_section_content(section_separator=section_separator)
+
+        for section_separator, section_content in data_by_sections.items():
+            if (
+                section_separator in saved_data_by_sections
+                and section_content is saved_data_by_sections[section_separator]
+            ):
+                continue
+
+            base_section_content = base_data_by_sections.get(section_separator, "")
+            if section_separator in self._data_by_sections and not (
+                self._is_saved_section_content(
+                    section_separator=section_separator,
+                    section_content=base_section_content,
+                )
+            ):
+                section_content = merge_three_way(
+                    base=base_section_content,
+                    ours=section_content,
+                    theirs=self.get_section_content(
+                        section_separator=section_separator
+                    ),
+                )
+
+            self.set_section_content(
+                section_separator=section_separator, section_content=section_content
+            )
+
+    def _replay_journal(self) -> None:
+        """
+        apply the journal records saved since the last compaction over the sections read from the file,
+        in the journal mode the replayed sections are saved ones, otherwise they are still to be saved to the file
+        """
+        if self._storage is not None:
+            return
+
+        self._journal_file_stat = stat(self._file_path)
+        journal = read_journal(
+            file_path=self._file_path,
+            file_stat=self._journal_file_stat,
+            read_only=self._read_only,
+        )
+        if journal is None:
+            self._journal_size = 0
+            return
+
+        journal_records, self._journal_size = journal
+
+        for journal_record in journal_records:
+            section_separator = journal_record.section_separator
+
+            if journal_record.record_type == JOURNAL_RECORD_TYPE_DELETE:
+                self._data_by_sections.pop(section_separator, None)
+                continue
+
+            section_content = (
+                self.get_section_content(section_separator=section_separator)
+                if section_separator in self._data_by_sections
+                else ""
+            )
+            self._data_by_sections[section_separator] = "".join(
+                (
+                    section_content[: journal_record.start],
+                    journal_record.text,
+                    section_content[journal_record.end :],
+                )
+            )
+
+        self._version += 1
+        if self._journal_mode:
+            self._drop_changed_section_hashes()
+            self._set_data_by_sections_saved()
+
+    def _drop_changed_section_hashes(self) -> None:
+        """
+        keep only the hashes of the sections whose content is still the saved one
+        """
+        self._section_hashes = {
+            section_separator: section_hash
+            for section_separator, section_hash in self._section_hashes.items()
+            if section_separator in self._data_by_sections
+            and section_separator in self._saved_data_by_sections
+            and self._data_by_sections[section_separator]
+            is self._saved_data_by_sections[section_separator]
+        }
+
+    def _set_data_by_sections_saved(self) -> None:
+        """
+        mark the current sections as the sections last read from or saved to the file
+        """
+        self._saved_data_by_sections = dict(self._data_by_sections)
+        self._version += 1
+        self._saved_version = self._version
+
+    def _get_section_content_hash(self, section_content: str) -> int:
+        return get_section_content_hash(
+            section_content_data=encode_raw_data(data=section_content)
+        )
+
+    def _get_saved_section_content_hash(self, section_separator: str) -> int:
+        if section_separator not in self._section_hashes:
+            self._section_hashes[section_separator] = self._get_section_content_hash(
+                section_content=self._get_saved_section_content(
+                    section_separator=section_separator
+                )
+            )
+        return self._section_hashes[section_separator]
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        whether the sections differ from the sections last read from or saved to the file,
+        e.g. a section content typed in and then undone is not a change
+        """
+        if self._version == self._saved_version:
+            return False
+
+        if len(self._data_by_sections) == len(
+            self._saved_data_by_sections
+        ) and self._get_first_changed_section_index() == len(self._data_by_sections):
+            self._saved_version = self._version
+            return False
+
+        return True
+
+    def _index_raw_data_content(self) -> None:
+        """
+        set the section offsets of the raw data content, in the mmap read mode the offsets
+        are read from the section index file unless the file changed since it was indexed,
+        otherwise the file gets scanned and the section index file written unless read only
+        """
+        if not isinstance(self._raw_data_content, mmap):
+            self._section_offsets = (
+                self._transform_raw_data_content_to_data_by_sections()
+            )
+            self._section_hashes = dict()
+            return
+
+        file_stat = stat(self._file_path)
+        section_index = read_section_index(
+            file_path=self._file_path, file_stat=file_stat
         )
 
-        self._data_by_sections = self._transform_raw_data_content_to_data_by_sections()
+        if section_index and file_stat.st_size == len(self._raw_data_content):
+            self._section_offsets, self._section_hashes = section_index
+            return
+
+        self._section_offsets = self._transform_raw_data_content_to_data_by_sections()
+
+        with memoryview(self._raw_data_content) as raw_data_content_view:
+            self._section_hashes = {
+                section_separator: get_section_content_hash(
+                    section_content_data=raw_data_content_view[start:end]
+                )
+                for section_separator, (start, end) in self._section_offsets.items()
+            }
+
+        if self._read_only:
+            return
+
+        write_section_index(
+            file_path=self._file_path,
+            file_stat=file_stat,
+            section_offsets=self._section_offsets,
+            section_hashes=self._section_hashes,
+        )
+
+    def close(self) -> None:
+        """
+        release the memory-mapped file, sections not yet read from it become unavailable,
+        the storage gets released too until accessed again
+        """
+        if isinstance(self._raw_data_content, mmap):
+            self._raw_data_content.close()
+        if self._storage is not None:
+            self._storage.close()
 
     def get_raw_data_content(self) -> str:
         return self._controller.read_file_data(file_path=self._file_path)
 
     @property
     def default_section_separator(self) -> str:
-        return [k for k in self._data_by_sections.keys()][0]
+        return next(iter(self._data_by_sections))
+
+    @property
+    def section_separators(self) -> List[str]:
+        return list(self._data_by_sections)
 
     @property
     def section_separators_sorted(self) -> List[str]:
-        return sorted([k for k in self._data_by_sections.keys()])
+        return sorted(self._data_by_sections)
+
+    @property
+    def version(self) -> int:
+        """
+        incremented with every change of the sections, including reading them again from the file
+        """
+        return self._version
+
+    @property
+    def search_index(self) -> SearchIndex:
+        return self._search_index
+
+    def _is_saved_section_content(
+        self, section_separator: str, section_content: str
+    ) -> bool:
+        """
+        whether the section content equals the saved section content, the hashes are compared first
+        so that the saved section content is only read from the file when the contents are likely equal
+        """
+        if section_separator not in self._saved_data_by_sections:
+            return False
+        if self._get_section_content_hash(
+            section_content=section_content
+        ) != self._get_saved_section_content_hash(section_separator=section_separator):
+            return False
+
+        return section_content == self._get_saved_section_content(
+            section_separator=section_separator
+        )
+
+    def get_saved_section_content(self, section_separator: str) -> str:
+        """
+        the section content as last read from or saved to the file, the base of the changes made since,
+        KeyError is raised for a section not saved yet
+        """
+        return self._get_saved_section_content(section_separator=section_separator)
+
+    def _get_saved_section_content(self, section_separator: str) -> str:
+        saved_section_content = self._saved_data_by_sections[section_separator]
+        if saved_section_content is None:
+            return self._read_section_content(section_separator=section_separator)
+        return saved_section_content
+
+    def _read_section_content(self, section_separator: str) -> str:
+        """
+        read the section content as last read from or saved to the file or the storage
+        """
+        if self._storage is not None:
+            return self._storage.read_section_content(
+                section_separator=section_separator
+            )
+
+        if isinstance(self._raw_data_content, str):
+            start, end = self._section_offsets[section_separator]
+            return self._raw_data_content[start:end]
+
+        if self._is_mapped_file_changed():
+            self._remap_file()
+        # the section removed from the changed file is read as a new section
+        if section_separator not in self._section_offsets:
+            return SECTION_FILE_NEW_SECTION_PLACEHOLDER
+
+        start, end = self._section_offsets[section_separator]
+        return decode_raw_data(raw_data=self._raw_data_content[start:end])
+
+    def _read_saved_section_content(self, section_separator: str) -> str:
+        """
+        read the section content not read yet and keep it as the saved section content
+        """
+        section_content = self._read_section_content(section_separator=section_separator)
+        self._data_by_sections[section_separator] = section_content
+        if section_separator in self._saved_data_by_sections:
+            self._saved_data_by_sections[section_separator] = section_content
+        return section_content
 
     def set_section_content(self, section_separator: str, section_content: str) -> None:
+        if self._data_by_sections.get(section_separator, "") is None:
+            self._read_saved_section_content(section_separator=section_separator)
+
+        if self._is_saved_section_content(
+            section_separator=section_separator, section_content=section_content
+        ):
+            section_content = self._saved_data_by_sections[section_separator]
+
+        if (
+            section_separator in self._data_by_sections
+            and self._data_by_sections[section_separator] is section_content
+        ):
+            return
+
         self._data_by_sections[section_separator] = section_content
+        self._version += 1
+        self._search_index.invalidate_section(section_separator=section_separator)
 
     def get_section_content(self, section_separator: str) -> str:
-        return self._data_by_sections[section_separator]
+        section_content = self._data_by_sections[section_separator]
+        if section_content is None:
+            return self._read_saved_section_content(section_separator=section_separator)
+        return section_content
 
     def delete_all_sections_content(self) -> None:
         self._data_by_sections = dict()
+        self._version += 1
+        self._search_index.clear()
 
     def delete_section_content(self, section_separator: str) -> None:
+        if self._data_by_sections[section_separator] is None:
+            self._read_saved_section_content(section_separator=section_separator)
+
         self._data_by_sections.pop(section_separator)
+        self._version += 1
+        self._search_index.invalidate_section(section_separator=section_separator)
 
     def rename_section(
         self, old_section_separator: str, new_section_separator: str
     ) -> None:
-        self._data_by_sections[new_section_separator] = self._data_by_sections[
-            old_section_separator
-        ]
+        section_content = self.get_section_content(
+            section_separator=old_section_separator
+        )
         del self._data_by_sections[old_section_separator]
+        self._version += 1
 
-    def _transform_raw_data_content_to_data_by_sections(self) -> Dict[str, str]:
+        self.set_section_content(
+            section_separator=new_section_separator, section_content=section_content
+        )
+        self._search_index.rename_section(
+            old_section_separator=old_section_separator,
+            new_section_separator=new_section_separator,
+        )
+
+    def _transform_raw_data_content_to_data_by_sections(
+        self,
+    ) -> Dict[str, Tuple[int, int]]:
+        """
+        single pass over the raw data content recording only the offsets of each section content,
+        section content spans from the end of its separator to the start of the next separator
+        """
         result = dict()
-        positions = []
-
-        matches = re.finditer(
-            self.defaults.DEFAULT_SECTION_FILE_SEPARATOR_REGEX, self._raw_data_content
-        )
-        matches_list = list(matches)
-        for idx, match in enumerate(matches_list):
-            _match_span = match.span()
-            if idx > 0:
-                positions.append((positions[len(positions) - 1][1], _match_span[0]))
-            positions.append(_match_span)
-            if idx + 1 == len(list(matches_list)):
-                positions.append((_match_span[1], len(self._raw_data_content)))
-
-        last_set_key = None
-        for idx, pos in enumerate(positions):
-            if idx % 2 == 0:
-                section_separator = self._raw_data_content[pos[0] : pos[1]]
-                result[section_separator] = last_set_key
-                last_set_key = section_separator
-            else:
-                result[last_set_key] = self._raw_data_content[pos[0] : pos[1]]
+
+        section_separator = None
+        section_content_start = 0
+
+        matches = self._get_section_separator_regex(
+            raw_data=self._raw_data_content
+        ).finditer(self._raw_data_content)
+
+        for match in matches:
+            if section_separator is not None:
+                result[section_separator] = (section_content_start, match.start())
+            section_separator = match.group()
+            if not isinstance(section_separator, str):
+                section_separator = decode_raw_data(raw_data=section_separator)
+            section_content_start = match.end()
+
+        if section_separator is not None:
+            result[section_separator] = (
+                section_content_start,
+                len(self._raw_data_content),
+            )
 
         return result
 
+    def iter_raw_data_content_chunks(self) -> Iterator[str]:
+        """
+        yield the section separators and section contents one by one,
+        so the whole raw data content never has to be built in memory
+        """
+        for section_separator in self._data_by_sections:
+            yield section_separator
+            yield self.get_section_content(section_separator=section_separator)
+
     def transform_data_by_sections_to_raw_data_content(self) -> str:
-        text_data = str()
-        for k, v in self._data_by_sections.items():
-            text_data += k
-            text_data += v
+        return "".join(self.iter_raw_data_content_chunks())
+
+    def _get_first_changed_section_index(self) -> int:
+        """
+        index of the first section that differs from the sections last read from
+        or saved to the file, all sections before it are kept in the file as they are
+        """
+        saved_section_separators = list(self._saved_data_by_sections)
+
+        for idx, (section_separator, section_content) in enumerate(
+            self._data_by_sections.items()
+        ):
+            if (
+                idx >= len(saved_section_separators)
+                or saved_section_separators[idx] != section_separator
+                or section_content
+                is not self._saved_data_by_sections[section_separator]
+            ):
+                return idx
+
+        return len(self._data_by_sections)
+
+    def _iter_raw_data_chunks(
+        self,
+        section_separators: List[str],
+        offset: int,
+        section_offsets: Dict[str, Tuple[int, int]],
+        section_hashes: Dict[str, int],
+        close_when_done: bool,
+    ) -> Iterator[bytes]:
+        """
+        yield the encoded section separators and section contents one by one, while recording
+        the offsets of the section contents in the file written from the offset onwards
+        and the hashes of the section contents
+        """
+        position = offset
+
+        for section_separator in section_separators:
+            section_separator_data = encode_raw_data(data=section_separator)
+            section_content_data = encode_raw_data(
+                data=self.get_section_content(section_separator=section_separator)
+            )
+
+            position += len(section_separator_data)
+            section_offsets[section_separator] = (
+                position,
+                position + len(section_content_data),
+            )
+            position += len(section_content_data)
+            section_hashes[section_separator] = get_section_content_hash(
+                section_content_data=section_content_data
+            )
+
+            yield section_separator_data
+            yield section_content_data
+
+        if close_when_done:
+            self.close()
+
+    def _save_from_first_changed_section(self, atomic_save: bool) -> None:
+        """
+        rewrite the file only from the first changed section onwards,
+        when the last section is the only changed one, the section gets just appended,
+        the atomic save cannot rewrite a file in place, so it writes all sections to a new file
+        """
+        section_separators = list(self._data_by_sections)
+        if not section_separators:
+            return
+
+        if atomic_save:
+            first_changed_section_index = 0
+            offset = 0
+        elif not self._is_saved_file_mapped():
+            # the section offsets of the saved sections in a file changed since it was read or saved
+            # are unknown, so all sections get read and the whole file rewritten
+            first_changed_section_index = 0
+            offset = 0
+            for section_separator in section_separators:
+                self._data_by_sections[section_separator] = self.get_section_content(
+                    section_separator=section_separator
+                )
+            self.close()
+        else:
+            saved_section_separators = list(self._section_offsets)
+            first_changed_section_index = self._get_first_changed_section_index()
+
+            if first_changed_section_index < len(saved_section_separators):
+                first_changed_saved_section_separator = saved_section_separators[
+                    first_changed_section_index
+                ]
+                offset = self._section_offsets[first_changed_saved_section_separator][
+                    0
+                ] - len(encode_raw_data(data=first_changed_saved_section_separator))
+            else:
+                offset = self._section_offsets[saved_section_separators[-1]][1]
+
+            # the rewritten part of the mapped file cannot be read while it is being written to,
+            # so the changed sections are kept in memory until the file is mapped again
+            for section_separator in section_separators[first_changed_section_index:]:
+                self._data_by_sections[section_separator] = self.get_section_content(
+                    section_separator=section_separator
+                )
+            self.close()
+
+        changed_section_offsets = dict()
+        changed_section_hashes = dict()
+        data_chunks = self._iter_raw_data_chunks(
+            section_separators=section_separators[first_changed_section_index:],
+            offset=offset,
+            section_offsets=changed_section_offsets,
+            section_hashes=changed_section_hashes,
+            # the atomic save streams the sections from the mapped file into the new file,
+            # the mapped file gets released right before the new file replaces it
+            close_when_done=atomic_save,
+        )
 
-        return text_data
+        try:
+            if atomic_save:
+                self._controller.save_file_data(data=data_chunks, atomic_save=True)
+            else:
+                self._controller.save_file_data_from_offset(
+                    data=data_chunks, offset=offset
+                )
+        except Exception:
+            if not atomic_save:
+                # the file content from the offset onwards is unknown after a failed write,
+                # so only the sections before the offset are still considered saved
+                self._saved_data_by_sections = {
+                    section_separator: self._saved_data_by_sections[section_separator]
+                    for section_separator in section_separators[
+                        :first_changed_section_index
+                    ]
+                }
+            raise
+        finally:
+            self.close()
+            self._raw_data_content = self._map_file()
+
+        unchanged_section_separators = section_separators[:first_changed_section_index]
+        self._section_offsets = {
+            section_separator: self._section_offsets[section_separator]
+            for section_separator in unchanged_section_separators
+        }
+        self._section_offsets.update(changed_section_offsets)
+        self._section_hashes = {
+            section_separator: self._section_hashes[section_separator]
+            for section_separator in unchanged_section_separators
+        }
+        self._section_hashes.update(changed_section_hashes)
+        self._set_data_by_sections_saved()
+
+        write_section_index(
+            file_path=self._file_path,
+            file_stat=stat(self._file_path),
+            section_offsets=self._section_offsets,
+            section_hashes=self._section_hashes,
+        )
+
+    def _iter_journal_records(self) -> Iterator[JournalRecord]:
+        """
+        journal records turning the saved sections into the current sections,
+        the sections kept in their place get only the changed range of their content journaled,
+        the deleted sections are journaled as deleted and the moved or new sections as set at the end
+        """
+        section_separators = list(self._data_by_sections)
+        kept_section_separators = []
+
+        for section_separator in self._saved_data_by_sections:
+            if section_separator in self._data_by_sections:
+                kept_section_separators.append(section_separator)
+            else:
+                yield JournalRecord(
+                    record_type=JOURNAL_RECORD_TYPE_DELETE,
+                    section_separator=section_separator,
+                )
+
+        kept_in_place_count = 0
+        for section_separator in kept_section_separators:
+            if section_separator != section_separators[kept_in_place_count]:
+                break
+            kept_in_place_count += 1
+
+        for section_separator in kept_section_separators[kept_in_place_count:]:
+            yield JournalRecord(
+                record_type=JOURNAL_RECORD_TYPE_DELETE,
+                section_separator=section_separator,
+            )
+
+        for section_separator in section_separators[:kept_in_place_count]:
+            if (
+                self._data_by_sections[section_separator]
+                is self._saved_data_by_sections[section_separator]
+            ):
+                continue
+
+            start, end, text = get_replaced_range(
+                before=self._get_saved_section_content(
+                    section_separator=section_separator
+                ),
+                after=self.get_section_content(section_separator=section_separator),
+            )
+            yield JournalRecord(
+                record_type=JOURNAL_RECORD_TYPE_REPLACE,
+                section_separator=section_separator,
+                start=start,
+                end=end,
+                text=text,
+            )
+
+        for section_separator in section_separators[kept_in_place_count:]:
+            yield JournalRecord(
+                record_type=JOURNAL_RECORD_TYPE_REPLACE,
+                section_separator=section_separator,
+                text=self.get_section_content(section_separator=section_separator),
+            )
+
+    def _save_to_journal(self) -> None:
+        data = b"".join(
+            get_journal_record_data(journal_record=journal_record)
+            for journal_record in self._iter_journal_records()
+        )
+        new_journal = not self._journal_size
+        if new_journal:
+            data = get_journal_header_data(file_stat=self._journal_file_stat) + data
+
+        self._controller.save_file_journal_data(data=data, new_journal=new_journal)
+        self._journal_size += len(data)
+
+        self._drop_changed_section_hashes()
+        self._set_data_by_sections_saved()
+
+    def _is_journal_changed(self) -> bool:
+        """
+        whether the journal or the file changed since the last read or save, e.g. another instance
+        appended to the journal or compacted it, a record left torn by a failed append is a change too
+        """
+        try:
+            journal_size = stat(
+                get_journal_file_path(file_path=self._file_path)
+            ).st_size
+        except FileNotFoundError:
+            journal_size = 0
+
+        return journal_size != self._journal_size or get_file_identity(
+            file_stat=stat(self._file_path)
+        ) != get_file_identity(file_stat=self._journal_file_stat)
+
+    def _save_to_storage(self) -> None:
+        self._controller.save_storage_data(
+            storage=self._storage,
+            section_separators=list(self._data_by_sections),
+            changed_sections=(
+                (section_separator, section_content)
+                for section_separator, section_content in self._data_by_sections.items()
+                if section_content is not None
+                and section_content
+                is not self._saved_data_by_sections.get(section_separator)
+            ),
+            # only the sections read and deleted since get deleted, never the sections saved
+            # by another instance meanwhile
+            deleted_section_separators=[
+                section_separator
+                for section_separator in self._saved_data_by_sections
+                if section_separator not in self._data_by_sections
+            ],
+        )
+
+        self._drop_changed_section_hashes()
+        self._set_data_by_sections_saved()
+
+    def _save_to_file(self, atomic_save: bool) -> None:
+        if self._mmap_read_mode:
+            self._save_from_first_changed_section(atomic_save=atomic_save)
+        else:
+            if atomic_save:
+                self._controller.save_file_data(
+                    data=self.iter_raw_data_content_chunks(), atomic_save=True
+                )
+            else:
+                try:
+                    # the whole text data is needed for the dump file written when the save fails
+                    self._controller.save_file_data(
+                        data=self.transform_data_by_sections_to_raw_data_content(),
+                        atomic_save=False,
+                    )
+                except Exception:
+                    # the file content is unknown after a failed write,
+                    # so no section is considered saved anymore
+                    self._saved_data_by_sections = dict()
+                    raise
+
+            self._drop_changed_section_hashes()
+            self._set_data_by_sections_saved()
+
+        # the file now holds all sections, so the journal is not needed anymore
+        if self._journal_size:
+            remove_journal(file_path=self._file_path)
+            self._journal_size = 0
+        self._journal_file_stat = stat(self._file_path)
+
+    def save(self) -> None:
+        """
+        save all sections, nothing is written when no section changed since the last save,
+        a storage gets only the changed sections saved,
+        in the journal mode the changes are appended to the journal, after merging in the changes
+        appended by another instance, and the journal gets compacted once it grows
+        past DEFAULT_FILE_JOURNAL_COMPACTION_SIZE, in the mmap read mode the section offsets
+        in the file are known, so unless the file is saved atomically,
+        only the part of the file starting with the first changed section gets rewritten
+        """
+        if not self.is_dirty:
+            return
+
+        if self._storage is not None:
+            if self._storage.is_changed():
+                # the changes saved by another instance get merged in first, so they are not overwritten
+                self.merge_external_update()
+        elif self._journal_mode and self._is_journal_changed():
+            # the journal records get appended to the journal they were made against,
+            # so the changes saved since the last read or save get merged in first
+            self.merge_external_update()
+
+        previous_file_stat_key = self._get_file_stat_key()
+        changed_section_separators = [
+            section_separator
+            for section_separator, section_content in self._data_by_sections.items()
+            if section_content is not None
+            and section_content
+            is not self._saved_data_by_sections.get(section_separator)
+        ]
+
+        if self._storage is not None:
+            self._save_to_storage()
+        elif self._journal_mode:
+            self._save_to_journal()
+            if self._journal_size > self.defaults.DEFAULT_FILE_JOURNAL_COMPACTION_SIZE:
+                self._compact()
+        else:
+            self._save_to_file(atomic_save=self.defaults.DEFAULT_FILE_ATOMIC_SAVE)
+
+        self._update_full_text_index(
+            previous_file_stat_key=previous_file_stat_key,
+            changed_section_separators=changed_section_separators,
+        )
+
+    def _get_file_stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            return get_file_stat_key(file_path=self._file_path)
+        except OSError:
+            return None
+
+    def _update_full_text_index(
+        self, previous_file_stat_key, changed_section_separators
+    ) -> None:
+        """
+        only the changed sections of the saved file get indexed again
+        """
+        self._controller.update_full_text_index(
+            file_path=self._file_path,
+            previous_file_stat_key=previous_file_stat_key,
+            section_separators=self.section_separators,
+            changed_sections=(
+                (
+                    section_separator,
+                    self.get_section_content(section_separator=section_separator),
+                )
+                for section_separator in changed_section_separators
+            ),
+        )
+
+    def _compact(self) -> None:
+        if not self._journal_size:
+            return
+
+        self._save_to_file(
+            atomic_save=self._mmap_read_mode or self.defaults.DEFAULT_FILE_ATOMIC_SAVE
+        )
+
+    def compact(self) -> None:
+        """
+        fold the journal back into the file, so that the file alone holds all the sections,
+        the mapped file is read while the file gets rewritten, so it is always replaced atomically
+        """
+        if not self._journal_size:
+            return
+
+        previous_file_stat_key = self._get_file_stat_key()
+        self._compact()
+        self._update_full_text_index(
+            previous_file_stat_key=previous_file_stat_key,
+            changed_section_separators=[],
+        )
@@ -0,0 +1,381 @@
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Event, Lock
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from notes_app.file import File
+from notes_app.full_text_index import get_file_stat_key, get_full_text_index_query
+from notes_app.search import (
+    SEARCH_LIST_ITEM_MATCHED_EXTRA_CHAR_COUNT,
+    Search,
+    get_multiple_patterns,
+    get_search_regex,
+)
+from notes_app.search_index import is_literal_pattern
+from notes_app.storage.bundle_storage import BUNDLE_STORAGE_DIR_EXTENSION, is_bundle
+from notes_app.storage.sqlite_storage import SQLITE_STORAGE_FILE_EXTENSION
+
+FOLDER_SEARCH_FILE_EXTENSIONS = (".txt", SQLITE_STORAGE_FILE_EXTENSION)
+FOLDER_SEARCH_THREAD_COUNT = 4
+# files read ahead of the search results consumed, per thread
+FOLDER_SEARCH_PENDING_FILE_COUNT_PER_THREAD = 2
+
+# the options of the Search the files are searched with, the folder search always searches all sections
+FOLDER_SEARCH_OPTIONS = (
+    "search_case_sensitive",
+    "search_full_words",
+    "search_regex",
+    "search_fuzzy",
+    "search_multiple",
+)
+
+
+class FolderSearchHit(NamedTuple):
+    file_path: str
+    section_separator: str
+    start: int
+    end: int
+    # the matched text followed by the characters shown with it in the search results
+    context: str
+
+
+def iter_notes_file_paths(folder_path: str) -> Iterator[str]:
+    """
+    paths of the notes files in the folder tree, the hidden files and directories like the journals
+    and section indexes of the notes files are skipped, a bundle directory is a notes file itself
+    """
+    for dir_path, dir_names, file_names in os.walk(folder_path):
+        for dir_name in sorted(dir_names):
+            dir_names.remove(dir_name)
+            if dir_name.startswith("."):
+                continue
+            if dir_name.endswith(BUNDLE_STORAGE_DIR_EXTENSION) and is_bundle(
+                dir_path=os.path.join(dir_path, dir_name)
+            ):
+                yield os.path.join(dir_path, dir_name)
+            else:
+                dir_names.append(dir_name)
+
+        for file_name in sorted(file_names):
+            if (
+                not file_name.startswith(".")
+                and os.path.splitext(file_name)[1] in FOLDER_SEARCH_FILE_EXTENSIONS
+            ):
+                yield os.path.join(dir_path, file_name)
+
+
+class FolderSearch:
+    """
+    The `FolderSearch` class searches all the notes files in a folder tree on a pool of threads,
+    the files are parsed read only by `File` and searched by `Search` with the options of the searched `Search`.
+    The sections of the searched files are kept in the persistent `FullTextIndex` of the controller,
+    so of the files not changed since they were indexed only the sections the index finds the pattern in are read.
+    """
+
+    def __init__(self, controller, defaults, thread_count: Optional[int] = None):
+        self._controller = controller
+        self.defaults = defaults
+
+        self._thread_count = thread_count or FOLDER_SEARCH_THREAD_COUNT
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+        # the cached hits are shared by the threads
+        self._lock = Lock()
+        # file path -> (modification time, size) of the file, search key, hits of the last search of the file
+        self._file_hits: Dict[
+            str, Tuple[Tuple[int, int], tuple, List[FolderSearchHit]]
+        ] = dict()
+        # file path -> (modification time, size) of the file found not to be a notes file
+        self._not_notes_file_stat_keys: Dict[str, Tuple[int, int]] = dict()
+
+        # set to stop the running search
+        self._cancel_event: Optional[Event] = None
+
+    @property
+    def _full_text_index(self):
+        return self._controller.full_text_index
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self._thread_count)
+        return self._thread_pool
+
+    def _get_full_text_index_query(self, pattern: str, search_key: tuple) -> Optional[str]:
+        """
+        query of the sections the pattern can occur in, None when the index cannot narrow the sections,
+        only literal patterns searched without the fuzzy search are looked up
+        """
+        options = dict(zip(FOLDER_SEARCH_OPTIONS, search_key[1:]))
+        if options["search_fuzzy"]:
+            return None
+        if options["search_multiple"]:
+            return get_full_text_index_query(
+                patterns=get_multiple_patterns(
+                    pattern=pattern,
+                    case_sensitive_search=options["search_case_sensitive"],
+                )
+            )
+        if options["search_regex"] and not is_literal_pattern(pattern=pattern):
+            return None
+        return get_full_text_index_query(patterns=[pattern])
+
+    def _index_file(self, file_path: str, file_stat_key: Tuple[int, int], sections) -> None:
+        try:
+            self._full_text_index.index_file(
+                file_path=file_path, file_stat_key=file_stat_key, sections=sections
+            )
+        except sqlite3.Error:
+            # the file gets indexed again when searched next time
+            pass
+
+    def _search_file(
+        self,
+        file_path: str,
+        pattern: str,
+        search_key: tuple,
+        indexed_file_stat_keys: Dict[str, Tuple[int, int]],
+        candidate_sections: Optional[Dict[str, Set[str]]],
+        cancel_event: Event,
+    ) -> List[FolderSearchHit]:
+        if cancel_event.is_set():
+            return []
+
+        try:
+            file_stat_key = get_file_stat_key(file_path=file_path)
+        except OSError:
+            return []
+
+        with self._lock:
+            if self._not_notes_file_stat_keys.get(file_path) == file_stat_key:
+                return []
+            if self._file_hits.get(file_path, (None, None))[:2] == (
+                file_stat_key,
+                search_key,
+            ):
+                return self._file_hits[file_path][2]
+
+        # the sections of an indexed file not changed since are narrowed by the index
+        indexed = indexed_file_stat_keys.get(file_path) == file_stat_key
+        candidate_section_separators = None
+        if indexed and candidate_sections is not None:
+            candidate_section_separators = candidate_sections.get(file_path, set())
+            if not candidate_section_separators:
+                with self._lock:
+                    self._file_hits[file_path] = (file_stat_key, search_key, [])
+                return []
+
+        search = Search(defaults=self.defaults)
+        for option, value in zip(FOLDER_SEARCH_OPTIONS, search_key[1:]):
+            setattr(search, option, value)
+
+        try:
+            file = File(
+                file_path=file_path,
+                controller=self._controller,
+                defaults=self.defaults,
+                read_only=True,
+            )
+        except (OSError, ValueError, sqlite3.Error):
+            with self._lock:
+                self._not_notes_file_stat_keys[file_path] = file_stat_key
+            # indexed without sections, so the index rules any pattern out of the file
+            self._index_file(file_path=file_path, file_stat_key=file_stat_key, sections=())
+            return []
+
+        try:
+            if candidate_section_separators is None:
+                search.search_all_sections = True
+                found_occurrences = search.iter_found_occurrences(
+                    pattern=pattern, file=file, current_section=None
+                )
+            else:
+                search.search_all_sections = False
+                found_occurrences = (
+                    found_occurrence
+                    for section_separator in file.section_separators
+                    if section_separator in candidate_section_separators
+                    for found_occurrence in search.iter_found_occurrences(
+                        pattern=pattern, file=file, current_section=section_separator
+                    )
+                )
+
+            hits = []
+            for section_separator, start, end in found_occurrences:
+                section_content = file.get_section_content(
+                    section_separator=section_separator
+                )
+                hits.append(
+                    FolderSearchHit(
+                        file_path=file_path,
+                        section_separator=section_separator,
+                        start=start,
+                        end=end,
+                        context=section_content[
+                            start : end + SEARCH_LIST_ITEM_MATCHED_EXTRA_CHAR_COUNT
+                        ],
+                    )
+                )
+
+            if not indexed:
+                self._index_file(
+                    file_path=file_path,
+                    file_stat_key=file_stat_key,
+                    sections=(
+                        (
+                            section_separator,
+                            file.get_section_content(section_separator=section_separator),
+                        )
+                        for section_separator in file.section_separators
+                    ),
+                )
+        finally:
+            file.close()
+
+        with self._lock:
+            self._file_hits[file_path] = (file_stat_key, search_key, hits)
+
+        return hits
+
+    def iter_found_hits(
+        self, pattern: str, folder_path: str, search: Search, block: bool = True
+    ) -> Iterator[Optional[FolderSearchHit]]:
+        """
+        the hits of the pattern in the notes files of the folder as the files get searched,
+        the files are searched with the options of the search, a search started cancels the running one,
+        without blocking None is yielded whenever no hits are ready yet, an invalid regex raises right away
+        """
+        search_key = (pattern,) + tuple(
+            getattr(search, option) for option in FOLDER_SEARCH_OPTIONS
+        )
+        if search.search_regex and not (search.search_fuzzy or search.search_multiple):
+            get_search_regex(
+                pattern=pattern,
+                case_sensitive_search=search.search_case_sensitive,
+                full_words_search=search.search_full_words,
+                regex_search=True,
+            )
+
+        self.cancel()
+        self._cancel_event = Event()
+
+        return self._iter_found_hits(
+            pattern=pattern,
+            folder_path=os.path.abspath(folder_path),
+            search_key=search_key,
+            block=block,
+            cancel_event=self._cancel_event,
+        )
+
+    def _iter_found_hits(
+        self,
+        pattern: str,
+        folder_path: str,
+        search_key: tuple,
+        block: bool,
+        cancel_event: Event,
+    ) -> Iterator[Optional[FolderSearchHit]]:
+        # the indexed files are listed before the index is queried, so a file indexed in between
+        # is not taken for an indexed file missing the pattern
+        query = self._get_full_text_index_query(pattern=pattern, search_key=search_key)
+        indexed_file_stat_keys = dict()
+        candidate_sections = None
+        try:
+            indexed_file_stat_keys = self._full_text_index.get_file_stat_keys(
+                folder_path=folder_path
+            )
+            if query is not None:
+                candidate_sections = self._full_text_index.get_candidate_sections(
+                    query=query, folder_path=folder_path
+                )
+        except sqlite3.Error:
+            # the files are searched without the index when it cannot be used
+            candidate_sections = None
+
+        file_paths = iter_notes_file_paths(folder_path=folder_path)
+        searched_file_paths = set()
+        pending_futures = set()
+
+        try:
+            while True:
+                if cancel_event.is_set():
+                    return
+
+                while (
+                    len(pending_futures)
+                    < self._thread_count * FOLDER_SEARCH_PENDING_FILE_COUNT_PER_THREAD
+                ):
+                    file_path = next(file_paths, None)
+                    if file_path is None:
+                        break
+                    searched_file_paths.add(file_path)
+                    pending_futures.add(
+                        self._get_thread_pool().submit(
+                            self._search_file,
+                            file_path,
+                            pattern,
+                            search_key,
+                            indexed_file_stat_keys,
+                            candidate_sections,
+                            cancel_event,
+                        )
+                    )
+
+                if not pending_futures:
+                    break
+
+                done_futures, pending_futures = wait(
+                    pending_futures,
+                    timeout=None if block else 0,
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done_futures:
+                    yield None
+                    continue
+
+                for future in done_futures:
+                    for hit in future.result():
+                        if cancel_event.is_set():
+                            return
+                        yield hit
+
+            # the files removed from the folder are not kept in the index
+            with self._lock:
+                known_file_paths = (
+                    set(self._file_hits)
+                    | set(self._not_notes_file_stat_keys)
+                    | set(indexed_file_stat_keys)
+                )
+            self._forget_files(
+                file_paths=[
+                    file_path
+                    for file_path in known_file_paths
+                    if file_path not in searched_file_paths
+                    and file_path.startswith(os.path.join(folder_path, ""))
+                ]
+            )
+        finally:
+            cancel_event.set()
+            for future in pending_futures:
+                future.cancel()
+
+    def _forget_files(self, file_paths: List[str]) -> None:
+        try:
+            self._full_text_index.forget_files(file_paths=file_paths)
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            for file_path in file_paths:
+                self._file_hits.pop(file_path, None)
+                self._not_notes_file_stat_keys.pop(file_path, None)
+
+    def cancel(self) -> None:
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def close(self) -> None:
+        self.cancel()
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(cancel_futures=True)
+            self._thread_pool = None
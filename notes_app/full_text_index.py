@@ -0,0 +1,362 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import zlib
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from notes_app.search_index import normalize_text
+
+# substrings of at least the trigram length are looked up in the index
+FULL_TEXT_INDEX_TRIGRAM_LENGTH = 3
+
+# the directory of the indexes in the user cache directory
+FULL_TEXT_INDEX_CACHE_DIR_NAME = "notes_app"
+
+# the index written with another version normalized the texts differently, so it gets dropped
+FULL_TEXT_INDEX_VERSION = 2
+
+# the indexed texts are normalized the same way as the searched texts, so the tokenizer does not fold them again
+_CREATE_TABLES_SQL = (
+    """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    file_path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+)
+""",
+    """
+CREATE TABLE IF NOT EXISTS sections (
+    section_id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    section_separator TEXT NOT NULL,
+    content BLOB NOT NULL,
+    UNIQUE (file_id, section_separator)
+)
+""",
+    """
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_text USING fts5(
+    content, content='', tokenize='trigram case_sensitive 1'
+)
+""",
+)
+
+_SELECT_CANDIDATE_SECTIONS_SQL = """
+SELECT files.file_path, sections.section_separator
+FROM sections_text
+JOIN sections ON sections.section_id = sections_text.rowid
+JOIN files ON files.file_id = sections.file_id
+WHERE sections_text MATCH ? AND substr(files.file_path, 1, ?) = ?
+"""
+
+
+def get_file_stat_key(file_path: str) -> Tuple[int, int]:
+    """
+    (modification time, size) of the file, for a bundle directory the latest modification time
+    and the total size of the directory and the files in it
+    """
+    file_stat = os.stat(file_path)
+    if not os.path.isdir(file_path):
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    mtime, size = file_stat.st_mtime_ns, 0
+    with os.scandir(file_path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                entry_stat = entry.stat()
+                mtime = max(mtime, entry_stat.st_mtime_ns)
+                size += entry_stat.st_size
+    return mtime, size
+
+
+def get_full_text_index_dir_path() -> str:
+    """
+    the directory of the indexes in the user cache directory, local to the machine,
+    so that a live index is never synced along with the notes
+    """
+    if os.name == "nt":
+        cache_dir_path = os.environ.get("LOCALAPPDATA") or os.path.expanduser(
+            os.path.join("~", "AppData", "Local")
+        )
+    elif sys.platform == "darwin":
+        cache_dir_path = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+    else:
+        cache_dir_path = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(
+            os.path.join("~", ".cache")
+        )
+    return os.path.join(cache_dir_path, FULL_TEXT_INDEX_CACHE_DIR_NAME)
+
+
+def get_full_text_index_file_path(
+    file_path: str, index_file_name: str, index_dir_path: Optional[str] = None
+) -> str:
+    """
+    the index of the folder of the notes file, the folder searched for the notes files,
+    named after the folder path in the index directory, the user cache directory unless given
+    """
+    folder_path = os.path.dirname(os.path.abspath(file_path))
+    folder_key = hashlib.sha1(folder_path.encode("utf8")).hexdigest()[:16]
+    index_file_stem, index_file_extension = os.path.splitext(index_file_name)
+    return os.path.join(
+        index_dir_path or get_full_text_index_dir_path(),
+        f"{index_file_stem}_{folder_key}{index_file_extension}",
+    )
+
+
+def get_full_text_index_query(patterns: List[str]) -> Optional[str]:
+    """
+    query of the sections containing any of the patterns,
+    None when a pattern is too short to be looked up in the index
+    """
+    if not patterns:
+        return None
+
+    phrases = []
+    for pattern in patterns:
+        pattern = normalize_text(text=pattern)
+        if len(pattern) < FULL_TEXT_INDEX_TRIGRAM_LENGTH:
+            return None
+        phrases.append('"{}"'.format(pattern.replace('"', '""')))
+    return " OR ".join(phrases)
+
+
+def _compress_content(content: str) -> bytes:
+    return zlib.compress(content.encode("utf8"))
+
+
+def _decompress_content(content_data: bytes) -> str:
+    return zlib.decompress(content_data).decode("utf8")
+
+
+class FullTextIndex:
+    """
+    The `FullTextIndex` class keeps a persistent SQLite FTS5 trigram index of the sections of the notes files,
+    so the sections containing a pattern are found without reading the files.
+    Every file is indexed with its (modification time, size), the index of a file is valid only while these match.
+    The index keeps no text to be searched, only the compressed normalized sections needed to delete their entries.
+    """
+
+    def __init__(self, index_file_path: str):
+        self._index_file_path = index_file_path
+        self._connection: Optional[sqlite3.Connection] = None
+        # the connection is shared by the threads searching the files
+        self._lock = Lock()
+
+    @property
+    def index_file_path(self) -> str:
+        return self._index_file_path
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            index_dir_path = os.path.dirname(self._index_file_path)
+            if index_dir_path:
+                os.makedirs(index_dir_path, exist_ok=True)
+            self._connection = sqlite3.connect(
+                self._index_file_path, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+            if version != FULL_TEXT_INDEX_VERSION:
+                with self._connection:
+                    for table_name in ("sections_text", "sections", "files"):
+                        self._connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+                    self._connection.execute(
+                        f"PRAGMA user_version = {FULL_TEXT_INDEX_VERSION}"
+                    )
+            for create_table_sql in _CREATE_TABLES_SQL:
+                self._connection.execute(create_table_sql)
+        return self._connection
+
+    def _get_file_id(self, file_path: str) -> Optional[int]:
+        row = (
+            self._get_connection()
+            .execute("SELECT file_id FROM files WHERE file_path = ?", (file_path,))
+            .fetchone()
+        )
+        return None if row is None else row[0]
+
+    def _delete_sections(self, section_rows: Iterable[Tuple[int, bytes]]) -> None:
+        """
+        delete the sections given as (section id, compressed content) rows,
+        a contentless FTS5 table gets an entry deleted by the text it was indexed from
+        """
+        connection = self._get_connection()
+        for section_id, content_data in section_rows:
+            connection.execute(
+                "INSERT INTO sections_text (sections_text, rowid, content) VALUES ('delete', ?, ?)",
+                (section_id, _decompress_content(content_data=content_data)),
+            )
+            connection.execute("DELETE FROM sections WHERE section_id = ?", (section_id,))
+
+    def _delete_file(self, file_path: str) -> None:
+        connection = self._get_connection()
+        file_id = self._get_file_id(file_path=file_path)
+        if file_id is None:
+            return
+        self._delete_sections(
+            section_rows=connection.execute(
+                "SELECT section_id, content FROM sections WHERE file_id = ?", (file_id,)
+            ).fetchall()
+        )
+        connection.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+
+    def _save_section(
+        self, file_id: int, section_separator: str, section_content: str
+    ) -> None:
+        connection = self._get_connection()
+        content = normalize_text(text=section_content)
+        content_data = _compress_content(content=content)
+
+        row = connection.execute(
+            "SELECT section_id, content FROM sections WHERE file_id = ? AND section_separator = ?",
+            (file_id, section_separator),
+        ).fetchone()
+        if row is not None:
+            if row[1] == content_data:
+                return
+            self._delete_sections(section_rows=[row])
+
+        section_id = connection.execute(
+            "INSERT INTO sections (file_id, section_separator, content) VALUES (?, ?, ?)",
+            (file_id, section_separator, content_data),
+        ).lastrowid
+        connection.execute(
+            "INSERT INTO sections_text (rowid, content) VALUES (?, ?)",
+            (section_id, content),
+        )
+
+    def get_file_stat_key(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        (modification time, size) of the file when it was indexed, None for a file not indexed
+        """
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT mtime_ns, size FROM files WHERE file_path = ?", (file_path,)
+                )
+                .fetchone()
+            )
+        return None if row is None else tuple(row)
+
+    def index_file(
+        self,
+        file_path: str,
+        file_stat_key: Tuple[int, int],
+        sections: Iterable[Tuple[str, str]],
+    ) -> None:
+        """
+        index all the sections of the file given as section separator and section content pairs
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                self._delete_file(file_path=file_path)
+                file_id = connection.execute(
+                    "INSERT INTO files (file_path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (file_path, *file_stat_key),
+                ).lastrowid
+                for section_separator, section_content in sections:
+                    self._save_section(
+                        file_id=file_id,
+                        section_separator=section_separator,
+                        section_content=section_content,
+                    )
+
+    def update_file(
+        self,
+        file_path: str,
+        previous_file_stat_key: Optional[Tuple[int, int]],
+        file_stat_key: Tuple[int, int],
+        section_separators: List[str],
+        changed_sections: Iterable[Tuple[str, str]],
+    ) -> None:
+        """
+        update the index of a saved file with the changed sections and the sections deleted,
+        the file is indexed incrementally only when its index matched the file before the save,
+        otherwise the file is dropped from the index to get indexed again when searched,
+        the index not created yet by a search is not created by a save
+        """
+        with self._lock:
+            if self._connection is None and not os.path.exists(self._index_file_path):
+                return
+            connection = self._get_connection()
+            with connection:
+                row = connection.execute(
+                    "SELECT file_id, mtime_ns, size FROM files WHERE file_path = ?",
+                    (file_path,),
+                ).fetchone()
+                if row is None:
+                    return
+                file_id, *indexed_file_stat_key = row
+                if previous_file_stat_key is None or tuple(
+                    indexed_file_stat_key
+                ) != tuple(previous_file_stat_key):
+                    self._delete_file(file_path=file_path)
+                    return
+
+                section_separators = set(section_separators)
+                self._delete_sections(
+                    section_rows=[
+                        (section_id, content_data)
+                        for section_id, section_separator, content_data in connection.execute(
+                            "SELECT section_id, section_separator, content FROM sections WHERE file_id = ?",
+                            (file_id,),
+                        ).fetchall()
+                        if section_separator not in section_separators
+                    ]
+                )
+                for section_separator, section_content in changed_sections:
+                    self._save_section(
+                        file_id=file_id,
+                        section_separator=section_separator,
+                        section_content=section_content,
+                    )
+                connection.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE file_id = ?",
+                    (*file_stat_key, file_id),
+                )
+
+    def forget_files(self, file_paths: Iterable[str]) -> None:
+        with self._lock:
+            with self._get_connection():
+                for file_path in file_paths:
+                    self._delete_file(file_path=file_path)
+
+    def get_file_stat_keys(self, folder_path: str) -> Dict[str, Tuple[int, int]]:
+        """
+        file path -> (modification time, size) of the indexed files in the folder tree
+        """
+        folder_path = os.path.join(folder_path, "")
+        with self._lock:
+            return {
+                file_path: (mtime, size)
+                for file_path, mtime, size in self._get_connection().execute(
+                    "SELECT file_path, mtime_ns, size FROM files WHERE substr(file_path, 1, ?) = ?",
+                    (len(folder_path), folder_path),
+                )
+            }
+
+    def get_candidate_sections(
+        self, query: str, folder_path: str
+    ) -> Dict[str, Set[str]]:
+        """
+        file path -> section separators of the indexed sections matching the query in the folder tree
+        """
+        folder_path = os.path.join(folder_path, "")
+        candidate_sections = dict()
+        with self._lock:
+            for file_path, section_separator in self._get_connection().execute(
+                _SELECT_CANDIDATE_SECTIONS_SQL, (query, len(folder_path), folder_path)
+            ):
+                candidate_sections.setdefault(file_path, set()).add(section_separator)
+        return candidate_sections
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,196 @@
+import struct
+import zlib
+from os import path, remove, replace, stat_result
+from typing import List, NamedTuple, Optional, Tuple
+
+JOURNAL_FILE_NAME_TEMPLATE = ".{file_name}.journal"
+JOURNAL_STALE_FILE_NAME_TEMPLATE = "{journal_file_path}.stale"
+JOURNAL_FILE_MAGIC = b"NJRN"
+JOURNAL_FILE_VERSION = 1
+JOURNAL_FILE_ENCODING = "utf8"
+
+JOURNAL_RECORD_TYPE_REPLACE = 1
+JOURNAL_RECORD_TYPE_DELETE = 2
+
+# magic, version, journaled file st_mtime_ns, journaled file size
+_HEADER_STRUCT = struct.Struct("<4sHqQ")
+# record type, section separator length, replaced range start, replaced range end, text length
+_RECORD_STRUCT = struct.Struct("<BHQQQ")
+# crc32 of the record header, section separator and text
+_RECORD_CRC_STRUCT = struct.Struct("<I")
+
+
+class JournalRecord(NamedTuple):
+    record_type: int
+    section_separator: str
+    start: int = 0
+    end: int = 0
+    text: str = ""
+
+
+def get_journal_file_path(file_path: str) -> str:
+    dir_path, file_name = path.split(file_path)
+    return path.join(dir_path, JOURNAL_FILE_NAME_TEMPLATE.format(file_name=file_name))
+
+
+def get_journal_header_data(file_stat: stat_result) -> bytes:
+    return _HEADER_STRUCT.pack(
+        JOURNAL_FILE_MAGIC,
+        JOURNAL_FILE_VERSION,
+        file_stat.st_mtime_ns,
+        file_stat.st_size,
+    )
+
+
+def get_journal_record_data(journal_record: JournalRecord) -> bytes:
+    section_separator_data = journal_record.section_separator.encode(
+        JOURNAL_FILE_ENCODING
+    )
+    text_data = journal_record.text.encode(JOURNAL_FILE_ENCODING)
+
+    record_data = b"".join(
+        (
+            _RECORD_STRUCT.pack(
+                journal_record.record_type,
+                len(section_separator_data),
+                journal_record.start,
+                journal_record.end,
+                len(text_data),
+            ),
+            section_separator_data,
+            text_data,
+        )
+    )
+    return record_data + _RECORD_CRC_STRUCT.pack(zlib.crc32(record_data))
+
+
+def _get_common_prefix_length(a: str, b: str) -> int:
+    """
+    length of the common prefix found by bisecting on slice comparisons,
+    so that long strings are compared in C instead of character by character
+    """
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _get_common_suffix_length(a: str, b: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def get_replaced_range(before: str, after: str) -> Tuple[int, int, str]:
+    """
+    the range of before replaced by the returned text to get after,
+    only the part between the common prefix and the common suffix is replaced
+    """
+    prefix_length = _get_common_prefix_length(a=before, b=after)
+    suffix_length = _get_common_suffix_length(
+        a=before, b=after, limit=min(len(before), len(after)) - prefix_length
+    )
+    return (
+        prefix_length,
+        len(before) - suffix_length,
+        after[prefix_length : len(after) - suffix_length],
+    )
+
+
+def read_journal(
+    file_path: str, file_stat: stat_result, read_only: bool = False
+) -> Optional[Tuple[List[JournalRecord], int]]:
+    """
+    read the journal records to be replayed over the file and the journal size,
+    a record torn by an interrupted write is cut off the journal, None is returned when there is no journal,
+    a journal of a file changed since the journal was started cannot be replayed so it gets moved aside,
+    read only the journal is left as it is
+    """
+    journal_file_path = get_journal_file_path(file_path=file_path)
+
+    try:
+        with open(journal_file_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    try:
+        magic, version, mtime_ns, size = _HEADER_STRUCT.unpack_from(data)
+    except struct.error:
+        magic, version, mtime_ns, size = None, None, None, None
+
+    if (
+        magic != JOURNAL_FILE_MAGIC
+        or version != JOURNAL_FILE_VERSION
+        or mtime_ns != file_stat.st_mtime_ns
+        or size != file_stat.st_size
+    ):
+        if not read_only:
+            replace(
+                journal_file_path,
+                JOURNAL_STALE_FILE_NAME_TEMPLATE.format(
+                    journal_file_path=journal_file_path
+                ),
+            )
+        return None
+
+    journal_records = []
+    position = _HEADER_STRUCT.size
+
+    while position < len(data):
+        try:
+            (
+                record_type,
+                section_separator_length,
+                start,
+                end,
+                text_length,
+            ) = _RECORD_STRUCT.unpack_from(data, position)
+            record_end = (
+                position
+                + _RECORD_STRUCT.size
+                + section_separator_length
+                + text_length
+            )
+            (record_crc,) = _RECORD_CRC_STRUCT.unpack_from(data, record_end)
+        except struct.error:
+            break
+
+        if zlib.crc32(data[position:record_end]) != record_crc:
+            break
+
+        section_separator_start = position + _RECORD_STRUCT.size
+        text_start = section_separator_start + section_separator_length
+        journal_records.append(
+            JournalRecord(
+                record_type=record_type,
+                section_separator=data[section_separator_start:text_start].decode(
+                    JOURNAL_FILE_ENCODING
+                ),
+                start=start,
+                end=end,
+                text=data[text_start:record_end].decode(JOURNAL_FILE_ENCODING),
+            )
+        )
+        position = record_end + _RECORD_CRC_STRUCT.size
+
+    if position != len(data) and not read_only:
+        with open(journal_file_path, "r+b") as f:
+            f.truncate(position)
+
+    return journal_records, position
+
+
+def remove_journal(file_path: str) -> None:
+    journal_file_path = get_journal_file_path(file_path=file_path)
+    if path.exists(journal_file_path):
+        remove(journal_file_path)
@@ -0,0 +1,78 @@
+from array import array
+from bisect import bisect_left
+from typing import Callable, Sequence, Tuple
+
+
+class LineIndex:
+    """
+    The `LineIndex` class keeps the end offsets of the lines of a text in an array,
+    so the line of a text offset is found by a binary search instead of walking the lines.
+    A change of the lines drops only the offsets from the first changed line on,
+    these are computed again only as far as the offsets looked up need them.
+    """
+
+    def __init__(
+        self,
+        get_lines: Callable[[], Sequence[str]],
+        get_lines_flags: Callable[[], Sequence[int]],
+        line_break_flag: int,
+    ):
+        # the lines are read when needed, the line flags tell the lines following a line break
+        self._get_lines = get_lines
+        self._get_lines_flags = get_lines_flags
+        self._line_break_flag = line_break_flag
+
+        # the offset in the text of the end of every line, known up to the first changed line
+        self._line_ends = array("q")
+
+    def invalidate(self, line: int = 0) -> None:
+        """
+        drop the offsets of the lines from the line on
+        """
+        del self._line_ends[max(line, 0) :]
+
+    def _extend(self, index: int = None, line: int = None) -> None:
+        """
+        compute the offsets of the following lines until the index or the line is covered
+        """
+        lines = self._get_lines()
+        lines_flags = self._get_lines_flags()
+        line_ends = self._line_ends
+        line_break_flag = self._line_break_flag
+
+        end = line_ends[-1] if line_ends else 0
+        for line_number in range(len(line_ends), len(lines)):
+            if line_ends and (
+                (index is not None and end >= index)
+                or (line is not None and line_number > line)
+            ):
+                return
+            end += len(lines[line_number])
+            if lines_flags[line_number] & line_break_flag:
+                end += 1
+            line_ends.append(end)
+
+    def get_line_and_column(self, index: int) -> Tuple[int, int]:
+        """
+        (line, column) of the text offset, an offset past the end of the text is at the end of the last line
+        """
+        lines = self._get_lines()
+        if index <= 0 or not lines:
+            return 0, 0
+
+        line_ends = self._line_ends
+        if not line_ends or line_ends[-1] < index:
+            self._extend(index=index)
+        index = min(index, line_ends[-1])
+
+        line = bisect_left(line_ends, index)
+        return line, index - (line_ends[line] - len(lines[line]))
+
+    def get_index(self, line: int, column: int) -> int:
+        """
+        text offset of the line and column, IndexError is raised for a line past the last one
+        """
+        lines = self._get_lines()
+        if len(self._line_ends) <= line:
+            self._extend(line=line)
+        return self._line_ends[line] - len(lines[line]) + column
@@ -35,6 +35,10 @@ class NotesApp(MDApp):
     def _on_request_close(self, *source, **args):
         if self.controller.view.is_unsaved_change:
             self.controller.view.save_current_section_to_file()
+        self.controller.view.compact_file()
+        self.controller.view.search.close()
+        self.controller.view.folder_search.close()
+        self.controller.full_text_index.close()
 
     def build(self):
         self.theme_cls.primary_palette = "DeepPurple"
@@ -7,9 +7,13 @@
 # inheriting which, the `notify_model_is_changed` method must be overridden.
 import json
 import time
-from os import linesep, path
+from os import linesep, path, scandir
+from typing import List
+
+from notes_app.journal import get_journal_file_path
 
 GENERAL_DATE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SQLITE_WAL_FILE_PATH_TEMPLATE = "{file_path}-wal"
 
 
 def format_local_epoch(format: str, epoch_time: int) -> str:
@@ -28,11 +32,51 @@ def get_current_epoch() -> int:
 
 def get_file_updated_timestamp_as_epoch(file_path: str) -> int:
     """
-    get file updated timestamp as epoch
+    get file updated timestamp as epoch,
+    for a directory the latest updated timestamp of the directory and the files in it
     """
+    if path.isdir(file_path):
+        with scandir(file_path) as entries:
+            return int(
+                max(
+                    [path.getmtime(file_path)]
+                    + [entry.stat().st_mtime for entry in entries if entry.is_file()]
+                )
+            )
     return int(path.getmtime(file_path))
 
 
+def get_file_size(file_path: str) -> int:
+    """
+    get file size, for a directory the total size of the files in it
+    """
+    if path.isdir(file_path):
+        with scandir(file_path) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.is_file())
+    return path.getsize(file_path)
+
+
+def get_side_file_paths(file_path: str) -> List[str]:
+    """
+    get the paths of the files the changes get saved to before they reach the file,
+    the journal of a text file and the write-ahead log of a SQLite database
+    """
+    return [
+        get_journal_file_path(file_path=file_path),
+        SQLITE_WAL_FILE_PATH_TEMPLATE.format(file_path=file_path),
+    ]
+
+
+def get_side_file_sizes(file_path: str) -> List[int]:
+    """
+    get the sizes of the side files of the file, 0 for a side file not existing
+    """
+    return [
+        path.getsize(side_file_path) if path.isfile(side_file_path) else 0
+        for side_file_path in get_side_file_paths(file_path=file_path)
+    ]
+
+
 class NotesModel:
     """
     The NotesModel class is a data model implementation. The model stores
@@ -50,6 +94,9 @@ class NotesModel:
         self._file_path = self.store.get("_file_path")["value"]
         self._file_size = self.store.get("_file_size")["value"]
         self._last_updated_on = self.store.get("_last_updated_on")["value"]
+        # the side file sizes as of the last update, a side file appended to by another instance
+        # within the same second as the last update is told apart by its size only
+        self._side_file_sizes = get_side_file_sizes(file_path=self._file_path)
 
         self.observers = []
 
@@ -110,10 +157,25 @@ class NotesModel:
 
     @property
     def external_update(self):
+        """
+        whether the file or its side files got updated since the last update,
+        e.g. another instance saving a SQLite database only writes to its write-ahead log
+        """
+        if self.last_updated_on <= 0:
+            return False
+
+        for side_file_path, side_file_size in zip(
+            get_side_file_paths(file_path=self.file_path), self._side_file_sizes
+        ):
+            if path.isfile(side_file_path) and (
+                get_file_updated_timestamp_as_epoch(side_file_path)
+                > self.last_updated_on
+                or get_file_size(side_file_path) > side_file_size
+            ):
+                return True
+
         return (
-            get_file_updated_timestamp_as_epoch(self.file_path)
-            > self.last_updated_on
-            > 0
+            get_file_updated_timestamp_as_epoch(self.file_path) > self.last_updated_on
         )
 
     def add_observer(self, observer):
@@ -130,7 +192,8 @@ class NotesModel:
         """
         update file-path related file attributes and notify observers
         """
-        self._file_size = path.getsize(self.file_path)
+        self._file_size = get_file_size(self.file_path)
+        self._side_file_sizes = get_side_file_sizes(file_path=self.file_path)
         self._last_updated_on = get_current_epoch()
 
         self.notify_observers()
@@ -0,0 +1,236 @@
+import os
+import sys
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from notes_app.search import iter_occurrences
+
+SEARCH_PARALLEL_MINIMAL_TASK_CHAR_COUNT = 256 * 1024
+SEARCH_PARALLEL_TASK_COUNT_PER_PROCESS = 4
+SEARCH_PARALLEL_ENCODING = "utf8"
+
+# (shared memory name, data start, data end) and the section content last decoded in the worker process,
+# so that the chunks of a section split among the tasks a worker runs get the section decoded once
+_decoded_section: Tuple[Optional[Tuple[str, int, int]], str] = (None, "")
+
+
+def is_parallel_search_available() -> bool:
+    """
+    the worker processes are forked, as a spawned process would import the app main module
+    and open another app window, the parallel search is not available where forking is not safe
+    """
+    return sys.platform.startswith("linux") and (os.cpu_count() or 1) > 1
+
+
+class SearchChunk(NamedTuple):
+    # the range of the encoded section content in the shared memory
+    data_start: int
+    data_end: int
+    # the range of the section content the occurrences are searched to start in
+    start: int
+    end: int
+
+
+def _search_chunks(
+    shared_memory_name: str, chunks: List[SearchChunk], search_kwargs: dict
+) -> List[List[Tuple[int, int]]]:
+    """
+    (start, end) of the occurrences starting in every chunk, run in a worker process,
+    the whole section content is decoded so the occurrences see the same context as in the serial search,
+    the last decoded section is kept for the next tasks of the worker
+    """
+    global _decoded_section
+
+    shared_data = shared_memory.SharedMemory(name=shared_memory_name)
+    try:
+        result = []
+
+        for chunk in chunks:
+            section_key = (shared_memory_name, chunk.data_start, chunk.data_end)
+            if _decoded_section[0] != section_key:
+                # the previous section is released before the next one gets decoded
+                _decoded_section = (None, "")
+                _decoded_section = (
+                    section_key,
+                    str(
+                        shared_data.buf[chunk.data_start : chunk.data_end],
+                        SEARCH_PARALLEL_ENCODING,
+                    ),
+                )
+            text = _decoded_section[1]
+
+            result.append(
+                list(
+                    iter_occurrences(
+                        text=text, start=chunk.start, end=chunk.end, **search_kwargs
+                    )
+                )
+            )
+
+        return result
+    finally:
+        shared_data.close()
+
+
+def _resume_chunk_occurrences(
+    text: str,
+    start: int,
+    chunk: SearchChunk,
+    chunk_occurrences: List[Tuple[int, int]],
+    search_kwargs: dict,
+) -> List[Tuple[int, int]]:
+    """
+    the occurrences of a chunk after an occurrence of the previous chunk continued into the chunk,
+    the search resumes at the end of that occurrence like the serial search
+    until it gets back in step with the chunk occurrences
+    """
+    occurrences = []
+
+    for occurrence in iter_occurrences(
+        text=text, start=start, end=chunk.end, **search_kwargs
+    ):
+        index = bisect_left(chunk_occurrences, occurrence)
+        if index < len(chunk_occurrences) and chunk_occurrences[index] == occurrence:
+            return occurrences + chunk_occurrences[index:]
+        occurrences.append(occurrence)
+
+    return occurrences
+
+
+class ParallelSearch:
+    """
+    The `ParallelSearch` class searches the sections on a pool of worker processes,
+    the section contents are passed to the workers in a shared memory block,
+    sections larger than a task are split into chunks searched separately.
+    """
+
+    def __init__(self, process_count: Optional[int] = None):
+        self._process_count = process_count or os.cpu_count() or 1
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self._process_count, mp_context=get_context("fork")
+            )
+        return self._process_pool
+
+    def _get_tasks(
+        self, texts: List[str], data_offsets: List[int]
+    ) -> List[List[Tuple[int, SearchChunk]]]:
+        """
+        the sections split into tasks of similar size, every task a list of (section index, chunk)
+        """
+        task_char_count = max(
+            sum(len(text) for text in texts)
+            // (self._process_count * SEARCH_PARALLEL_TASK_COUNT_PER_PROCESS),
+            SEARCH_PARALLEL_MINIMAL_TASK_CHAR_COUNT,
+        )
+
+        tasks, task, task_size = [], [], 0
+        for index, text in enumerate(texts):
+            data_start, data_end = data_offsets[index], data_offsets[index + 1]
+
+            for start in range(0, max(len(text), 1), task_char_count):
+                task.append(
+                    (
+                        index,
+                        SearchChunk(
+                            data_start=data_start,
+                            data_end=data_end,
+                            start=start,
+                            end=min(start + task_char_count, len(text)),
+                        ),
+                    )
+                )
+                task_size += min(task_char_count, len(text) - start)
+                if task_size >= task_char_count:
+                    tasks.append(task)
+                    task, task_size = [], 0
+
+        if task:
+            tasks.append(task)
+        return tasks
+
+    def search(
+        self,
+        pattern: str,
+        texts: Dict[str, str],
+        case_sensitive_search: bool,
+        full_words_search: bool,
+        regex_search: bool,
+    ) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        the same {section separator: [(start, end)]} as searching the sections one after another
+        """
+        search_kwargs = dict(
+            pattern=pattern,
+            case_sensitive_search=case_sensitive_search,
+            full_words_search=full_words_search,
+            regex_search=regex_search,
+        )
+        section_separators = list(texts)
+        section_texts = list(texts.values())
+
+        data = [text.encode(SEARCH_PARALLEL_ENCODING) for text in section_texts]
+        data_offsets = [0]
+        for section_data in data:
+            data_offsets.append(data_offsets[-1] + len(section_data))
+
+        shared_data = shared_memory.SharedMemory(
+            create=True, size=max(data_offsets[-1], 1)
+        )
+        try:
+            for index, section_data in enumerate(data):
+                shared_data.buf[data_offsets[index] : data_offsets[index + 1]] = section_data
+            del data
+
+            tasks = self._get_tasks(texts=section_texts, data_offsets=data_offsets)
+            futures = [
+                self._get_process_pool().submit(
+                    _search_chunks,
+                    shared_data.name,
+                    [chunk for _, chunk in task],
+                    search_kwargs,
+                )
+                for task in tasks
+            ]
+
+            found_occurrences = dict()
+            occurrence_end = 0
+            for task, future in zip(tasks, futures):
+                for (index, chunk), chunk_occurrences in zip(task, future.result()):
+                    if chunk.start == 0:
+                        occurrence_end = 0
+                    elif chunk_occurrences and chunk_occurrences[0][0] < occurrence_end:
+                        chunk_occurrences = _resume_chunk_occurrences(
+                            text=section_texts[index],
+                            start=occurrence_end,
+                            chunk=chunk,
+                            chunk_occurrences=chunk_occurrences,
+                            search_kwargs=search_kwargs,
+                        )
+
+                    if chunk_occurrences:
+                        found_occurrences.setdefault(
+                            section_separators[index], []
+                        ).extend(chunk_occurrences)
+                        occurrence_end = max(occurrence_end, chunk_occurrences[-1][1])
+
+            return found_occurrences
+        finally:
+            shared_data.close()
+            shared_data.unlink()
+
+    def close(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+
+def get_parallel_search(defaults) -> Optional[ParallelSearch]:
+    if defaults.DEFAULT_SEARCH_PARALLEL_MODE and is_parallel_search_available():
+        return ParallelSearch()
+    return None
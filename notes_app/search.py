@@ -1,8 +1,33 @@
 import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from notes_app.aho_corasick import get_aho_corasick_automaton
+from notes_app.search_index import (
+    SEARCH_INDEX_WORD_REGEX,
+    get_fuzzy_max_distance,
+    is_literal_pattern,
+    normalize_text,
+)
 
 SEARCH_MINIMAL_CHAR_COUNT = 2
 
+SEARCH_REGEX_CACHE_SIZE = 128
+
+# the separator of the patterns searched for at once by the multiple patterns search
+SEARCH_MULTIPLE_PATTERNS_SEPARATOR = ","
+
+_WORD_CHAR_REGEX = re.compile(r"\w")
+
+# the all-sections search runs on the parallel search only for sections of this size in total
+SEARCH_PARALLEL_MINIMAL_CHAR_COUNT = 4 * 1024 * 1024
+
 SEARCH_LIST_ITEM_MATCHED_EXTRA_CHAR_COUNT = 30
+# search results shown right away, the others are added in batches taking at most the duration in seconds
+SEARCH_LIST_PAGE_ITEM_COUNT = 100
+SEARCH_LIST_BATCH_DURATION = 0.01
+# seconds the search string has to stay unchanged before the live search runs
+SEARCH_LIVE_DEBOUNCE_DURATION = 0.3
 SEARCH_LIST_ITEM_SECTION_DISPLAY_VALUE = "section "
 SEARCH_LIST_ITEM_POSITION_DISPLAY_VALUE = "position "
 
@@ -20,39 +45,295 @@ def validate_search_input(input_string):
     return True
 
 
-def _basic_search_function(pattern, text, case_sensitive_search):
-    if case_sensitive_search:
-        pass
+@lru_cache(maxsize=SEARCH_REGEX_CACHE_SIZE)
+def get_compiled_regex(pattern: str, flags: int = 0):
+    return re.compile(pattern, flags)
+
+
+def _iter_regex_occurrences(
+    regex, text: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) of the matches starting between start and end, a match can continue past end,
+    empty matches of patterns like "a*" are not occurrences
+    """
+    if end is None:
+        end = len(text)
+    for m in regex.finditer(text, start):
+        if m.start() >= end:
+            break
+        if m.end() > m.start():
+            yield m.start(), m.end()
+
+
+def _iter_found_occurrences(
+    pattern: str, text: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    if end is None:
+        end = len(text)
+    find = text.find
+    position = find(pattern, start)
+    while position != -1 and position < end:
+        yield position, position + len(pattern)
+        position = find(pattern, position + len(pattern))
+
+
+def _iter_casefolded_occurrences(
+    pattern: str,
+    text: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    casefolded_text: Optional[str] = None,
+) -> Iterator[Tuple[int, int]]:
+    """
+    case-insensitive literal search of the casefolded pattern in the casefolded text,
+    only the searched range is casefolded when the casefolded text is not given,
+    when casefolding changed the text length and so the positions, the text is searched by the case-insensitive regex
+    """
+    if end is None:
+        end = len(text)
+    casefolded_pattern = pattern.casefold()
+
+    if casefolded_text is None:
+        text_start = start
+        text = text[start : end + len(casefolded_pattern)]
+        casefolded_text = text.casefold()
     else:
-        pattern = pattern.lower()
-        text = text.lower()
-    return [m.start() for m in re.finditer(pattern, text)]
+        text_start = 0
 
+    if len(casefolded_text) != len(text):
+        yield from (
+            (text_start + s, text_start + e)
+            for s, e in _iter_regex_occurrences(
+                regex=get_compiled_regex(re.escape(pattern), re.IGNORECASE),
+                text=text,
+                start=start - text_start,
+                end=end - text_start,
+            )
+        )
+        return
 
-def _full_words_search_function(pattern, text, case_sensitive_search):
-    pattern = r"\b" + pattern + r"\b"
-    if case_sensitive_search:
-        regex = re.compile(pattern)
-    else:
-        regex = re.compile(pattern, re.IGNORECASE)
-    return [m.start() for m in regex.finditer(text)]
+    for s, e in _iter_found_occurrences(
+        pattern=casefolded_pattern,
+        text=casefolded_text,
+        start=start - text_start,
+        end=end - text_start,
+    ):
+        yield text_start + s, text_start + e
 
 
-def search_function(pattern, text, case_sensitive_search, full_words_search):
+def get_search_regex(
+    pattern, case_sensitive_search, full_words_search, regex_search=False
+):
+    """
+    the compiled regex of the search, None for the literal search
+    """
     if full_words_search:
-        return _full_words_search_function(
-            pattern=pattern, text=text, case_sensitive_search=case_sensitive_search
+        if not regex_search:
+            pattern = re.escape(pattern)
+        # unlike \b the lookarounds also delimit patterns starting or ending with a non-word character
+        pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+    elif not regex_search:
+        return None
+
+    return get_compiled_regex(pattern, 0 if case_sensitive_search else re.IGNORECASE)
+
+
+def iter_occurrences(
+    pattern,
+    text,
+    case_sensitive_search,
+    full_words_search,
+    regex_search=False,
+    casefolded_text=None,
+    start=0,
+    end=None,
+) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) of the occurrences of the pattern starting between start and end of the text,
+    the occurrences do not overlap as the search resumes at the end of the last occurrence
+    """
+    regex = get_search_regex(
+        pattern=pattern,
+        case_sensitive_search=case_sensitive_search,
+        full_words_search=full_words_search,
+        regex_search=regex_search,
+    )
+    if regex is not None:
+        return _iter_regex_occurrences(regex=regex, text=text, start=start, end=end)
+    if case_sensitive_search:
+        return _iter_found_occurrences(pattern=pattern, text=text, start=start, end=end)
+    return _iter_casefolded_occurrences(
+        pattern=pattern,
+        text=text,
+        start=start,
+        end=end,
+        casefolded_text=casefolded_text,
+    )
+
+
+def get_occurrence_end(
+    pattern, text, casefolded_text, start, case_sensitive_search
+) -> Optional[int]:
+    """
+    end of the literal occurrence of the pattern at start of the text matched the same way as by iter_occurrences,
+    None when the pattern does not occur there, the casefolded text is used by the case-insensitive search only
+    """
+    if case_sensitive_search:
+        return start + len(pattern) if text.startswith(pattern, start) else None
+
+    if len(casefolded_text) == len(text):
+        casefolded_pattern = pattern.casefold()
+        if casefolded_text.startswith(casefolded_pattern, start):
+            return start + len(casefolded_pattern)
+        return None
+
+    m = get_compiled_regex(re.escape(pattern), re.IGNORECASE).match(text, start)
+    return m.end() if m else None
+
+
+def is_self_overlapping(pattern: str) -> bool:
+    """
+    whether the occurrences of the pattern can overlap, when a proper prefix of the pattern is also its suffix
+    """
+    return any(pattern.endswith(pattern[:length]) for length in range(1, len(pattern)))
+
+
+def _basic_search_function(
+    pattern, text, case_sensitive_search, casefolded_text=None
+):
+    return [
+        start
+        for start, _ in iter_occurrences(
+            pattern=pattern,
+            text=text,
+            case_sensitive_search=case_sensitive_search,
+            full_words_search=False,
+            casefolded_text=casefolded_text,
         )
-    return _basic_search_function(
-        pattern=pattern, text=text, case_sensitive_search=case_sensitive_search
+    ]
+
+
+def _regex_search_function(pattern, text, case_sensitive_search):
+    return [
+        start
+        for start, _ in iter_occurrences(
+            pattern=pattern,
+            text=text,
+            case_sensitive_search=case_sensitive_search,
+            full_words_search=False,
+            regex_search=True,
+        )
+    ]
+
+
+def _full_words_search_function(
+    pattern, text, case_sensitive_search, regex_search=False
+):
+    return [
+        start
+        for start, _ in iter_occurrences(
+            pattern=pattern,
+            text=text,
+            case_sensitive_search=case_sensitive_search,
+            full_words_search=True,
+            regex_search=regex_search,
+        )
+    ]
+
+
+def search_function(
+    pattern,
+    text,
+    case_sensitive_search,
+    full_words_search,
+    regex_search=False,
+    casefolded_text=None,
+):
+    return [
+        start
+        for start, _ in iter_occurrences(
+            pattern=pattern,
+            text=text,
+            case_sensitive_search=case_sensitive_search,
+            full_words_search=full_words_search,
+            regex_search=regex_search,
+            casefolded_text=casefolded_text,
+        )
+    ]
+
+
+def get_multiple_patterns(pattern: str, case_sensitive_search: bool) -> List[str]:
+    """
+    the patterns separated in the pattern without the surrounding whitespace, each pattern once
+    """
+    patterns = dict()
+    for separated_pattern in pattern.split(SEARCH_MULTIPLE_PATTERNS_SEPARATOR):
+        separated_pattern = separated_pattern.strip()
+        if separated_pattern:
+            patterns.setdefault(
+                separated_pattern
+                if case_sensitive_search
+                else separated_pattern.casefold(),
+                separated_pattern,
+            )
+    return list(patterns.values())
+
+
+def is_full_word_occurrence(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not _WORD_CHAR_REGEX.match(text, start - 1)) and (
+        end == len(text) or not _WORD_CHAR_REGEX.match(text, end)
     )
 
 
+def get_fuzzy_search_regex(pattern: str, fuzzy_words: List[Dict[str, int]]):
+    """
+    the compiled regex matching the pattern with every word replaced by any of its fuzzy words,
+    every word is matched as a full word and captured by a group so the distance of a match can be told
+    """
+    regex_parts = []
+    last_end = 0
+    for index, m in enumerate(SEARCH_INDEX_WORD_REGEX.finditer(pattern)):
+        words_regex = "|".join(
+            re.escape(word) for word in sorted(fuzzy_words[index], key=len, reverse=True)
+        )
+        regex_parts.append(re.escape(pattern[last_end : m.start()]))
+        regex_parts.append(rf"(?<!\w)({words_regex})(?!\w)")
+        last_end = m.end()
+    regex_parts.append(re.escape(pattern[last_end:]))
+
+    return get_compiled_regex("".join(regex_parts), re.IGNORECASE)
+
+
+class LastSearch(NamedTuple):
+    pattern: str
+    # the file, its version and the search options the occurrences were found with
+    search_key: tuple
+    found_occurrences: Dict[str, List[Tuple[int, int]]]
+
+
 class Search:
-    def __init__(self, defaults):
+    def __init__(self, defaults, parallel_search=None):
         self._search_case_sensitive = defaults.DEFAULT_VALUE_SEARCH_CASE_SENSITIVE
         self._search_all_sections = defaults.DEFAULT_VALUE_SEARCH_ALL_SECTIONS
         self._search_full_words = defaults.DEFAULT_VALUE_SEARCH_FULL_WORDS
+        self._search_regex = defaults.DEFAULT_VALUE_SEARCH_REGEX
+        self._search_live = defaults.DEFAULT_VALUE_SEARCH_LIVE
+        self._search_fuzzy = defaults.DEFAULT_VALUE_SEARCH_FUZZY
+        self._search_multiple = defaults.DEFAULT_VALUE_SEARCH_MULTIPLE
+        # searching the notes files in the folder of the file is up to the FolderSearch
+        self._search_folder = defaults.DEFAULT_VALUE_SEARCH_FOLDER
+
+        # the occurrences of the last search consumed to the end,
+        # a search for a pattern extending the last one checks only these occurrences
+        self._last_search: Optional[LastSearch] = None
+
+        # section separator -> (hash, length, casefolded content) of the section content last searched,
+        # so the case-insensitive literal search casefolds only the changed sections again
+        self._casefolded_texts: Dict[str, Tuple[int, int, str]] = dict()
+
+        # the ParallelSearch searching all the sections of large files on worker processes, if any
+        self._parallel_search = parallel_search
 
     @property
     def search_case_sensitive(self):
@@ -78,28 +359,421 @@ class Search:
     def search_full_words(self, value):
         self._search_full_words = value
 
-    def search_for_occurrences(self, pattern, file, current_section):
+    @property
+    def search_regex(self):
+        return self._search_regex
+
+    @search_regex.setter
+    def search_regex(self, value):
+        self._search_regex = value
+
+    @property
+    def search_live(self):
+        return self._search_live
+
+    @search_live.setter
+    def search_live(self, value):
+        self._search_live = value
+
+    @property
+    def search_fuzzy(self):
+        return self._search_fuzzy
+
+    @search_fuzzy.setter
+    def search_fuzzy(self, value):
+        self._search_fuzzy = value
+
+    @property
+    def search_multiple(self):
+        return self._search_multiple
+
+    @search_multiple.setter
+    def search_multiple(self, value):
+        self._search_multiple = value
+
+    @property
+    def search_folder(self):
+        return self._search_folder
+
+    @search_folder.setter
+    def search_folder(self, value):
+        self._search_folder = value
+
+    def _get_casefolded_text(self, section_separator: str, text: str) -> str:
+        casefolded_text = self._casefolded_texts.get(section_separator)
+        if (
+            casefolded_text is None
+            or casefolded_text[0] != hash(text)
+            or casefolded_text[1] != len(text)
+        ):
+            casefolded_text = (hash(text), len(text), text.casefold())
+            self._casefolded_texts[section_separator] = casefolded_text
+        return casefolded_text[2]
+
+    def _get_search_key(self, file, current_section) -> tuple:
+        return (
+            file,
+            file.version,
+            None if self.search_all_sections else current_section,
+            self.search_case_sensitive,
+            self.search_full_words,
+            self.search_regex,
+            self.search_fuzzy,
+            self.search_multiple,
+        )
+
+    def _is_narrowing(self, pattern, search_key) -> bool:
+        """
+        whether every occurrence of the pattern starts at an occurrence of the last searched pattern,
+        so only those need to be checked, true for a literal pattern extending the last one
+        unless the occurrences of the last one could overlap and so some were skipped
+        """
+        if (
+            self._last_search is None
+            or self._last_search.search_key != search_key
+            or self.search_full_words
+            or self.search_regex
+            or self.search_fuzzy
+            or self.search_multiple
+        ):
+            return False
+
+        last_pattern = self._last_search.pattern
+        if not self.search_case_sensitive:
+            pattern, last_pattern = pattern.casefold(), last_pattern.casefold()
+        return pattern.startswith(last_pattern) and not is_self_overlapping(
+            pattern=last_pattern
+        )
+
+    def _iter_narrowed_occurrences(
+        self, pattern, file, last_found_occurrences
+    ) -> Iterator[Tuple[str, int, int]]:
+        for section_separator, occurrences in last_found_occurrences.items():
+            text = file.get_section_content(section_separator=section_separator)
+            casefolded_text = (
+                None
+                if self.search_case_sensitive
+                else self._get_casefolded_text(
+                    section_separator=section_separator, text=text
+                )
+            )
+
+            occurrence_end = 0
+            for start, _ in occurrences:
+                # the occurrences of the pattern do not overlap, like in the search from scratch
+                if start < occurrence_end:
+                    continue
+                end = get_occurrence_end(
+                    pattern=pattern,
+                    text=text,
+                    casefolded_text=casefolded_text,
+                    start=start,
+                    case_sensitive_search=self.search_case_sensitive,
+                )
+                if end is not None:
+                    yield section_separator, start, end
+                    occurrence_end = end
+
+    def iter_found_occurrences(
+        self, pattern, file, current_section
+    ) -> Iterator[Tuple[str, int, int]]:
+        """
+        (section separator, start, end) of the occurrences section by section, found as consumed,
+        so the first occurrences can be shown before the other sections are searched
+        """
+        search_key = self._get_search_key(file=file, current_section=current_section)
+
+        if self.search_multiple:
+            pattern_occurrences = self._iter_multiple_pattern_occurrences(
+                pattern=pattern, file=file, current_section=current_section
+            )
+            occurrences = (
+                (section_separator, start, end)
+                for _, section_separator, start, end in pattern_occurrences
+            )
+        elif self.search_fuzzy and SEARCH_INDEX_WORD_REGEX.search(pattern):
+            occurrences = self._iter_fuzzy_occurrences(
+                pattern=pattern, file=file, current_section=current_section
+            )
+        elif self._is_narrowing(pattern=pattern, search_key=search_key):
+            occurrences = self._iter_narrowed_occurrences(
+                pattern=pattern,
+                file=file,
+                last_found_occurrences=self._last_search.found_occurrences,
+            )
+        else:
+            occurrences = self._iter_searched_occurrences(
+                pattern=pattern, file=file, current_section=current_section
+            )
+        # the occurrences are kept for the next search only when all of them were consumed
+        self._last_search = None
+
         found_occurrences = dict()
+        for section_separator, start, end in occurrences:
+            found_occurrences.setdefault(section_separator, []).append((start, end))
+            yield section_separator, start, end
+
+        self._last_search = LastSearch(
+            pattern=pattern,
+            search_key=search_key,
+            found_occurrences=found_occurrences,
+        )
 
+    def _iter_searched_occurrences(
+        self, pattern, file, current_section
+    ) -> Iterator[Tuple[str, int, int]]:
         if self.search_all_sections:
             sections_separators_to_search_in = file.section_separators_sorted
+            for section_separator in self._casefolded_texts.keys() - set(
+                sections_separators_to_search_in
+            ):
+                del self._casefolded_texts[section_separator]
+
+            if not self.search_regex or is_literal_pattern(pattern=pattern):
+                # a literal pattern can only occur in the sections containing all of its words
+                sections_separators_to_search_in = file.search_index.get_candidate_section_separators(
+                    pattern=pattern, section_separators=sections_separators_to_search_in
+                )
         else:
             sections_separators_to_search_in = [current_section]
 
+        if self.search_all_sections and self._parallel_search is not None:
+            texts = {
+                section_separator: file.get_section_content(
+                    section_separator=section_separator
+                )
+                for section_separator in sections_separators_to_search_in
+            }
+            if (
+                sum(len(text) for text in texts.values())
+                >= SEARCH_PARALLEL_MINIMAL_CHAR_COUNT
+            ):
+                found_occurrences = self._parallel_search.search(
+                    pattern=pattern,
+                    texts=texts,
+                    case_sensitive_search=self.search_case_sensitive,
+                    full_words_search=self.search_full_words,
+                    regex_search=self.search_regex,
+                )
+                for section_separator, occurrences in found_occurrences.items():
+                    for start, end in occurrences:
+                        yield section_separator, start, end
+                return
+
         for section_separator in sections_separators_to_search_in:
             text = file.get_section_content(section_separator=section_separator)
 
-            search_result = search_function(
+            if (
+                self.search_case_sensitive
+                or self.search_full_words
+                or self.search_regex
+            ):
+                casefolded_text = None
+            else:
+                casefolded_text = self._get_casefolded_text(
+                    section_separator=section_separator, text=text
+                )
+
+            for start, end in iter_occurrences(
                 pattern=pattern,
                 text=text,
                 case_sensitive_search=self.search_case_sensitive,
                 full_words_search=self.search_full_words,
+                regex_search=self.search_regex,
+                casefolded_text=casefolded_text,
+            ):
+                yield section_separator, start, end
+
+    def _iter_fuzzy_occurrences(
+        self, pattern, file, current_section
+    ) -> Iterator[Tuple[str, int, int]]:
+        """
+        the occurrences of the pattern with every word misspelled up to its fuzzy distance,
+        found by the search index words close enough to the pattern words, always case-insensitive,
+        ranked by the sum of the edit distances of the words, the closest occurrences first
+        """
+        if self.search_all_sections:
+            sections_separators_to_search_in = file.section_separators_sorted
+        else:
+            sections_separators_to_search_in = [current_section]
+
+        fuzzy_words = []
+        for m in SEARCH_INDEX_WORD_REGEX.finditer(pattern):
+            word = normalize_text(m.group())
+            words = file.search_index.get_fuzzy_words(
+                word=word,
+                max_distance=get_fuzzy_max_distance(word=word),
+                section_separators=sections_separators_to_search_in,
             )
-            if search_result:
-                found_occurrences[section_separator] = search_result
+            if not words:
+                return
+            fuzzy_words.append(words)
+
+        regex = get_fuzzy_search_regex(pattern=pattern, fuzzy_words=fuzzy_words)
+        # an occurrence starts the length of the pattern part before the first word
+        # ahead of an occurrence of a fuzzy word of the first word
+        first_word_offset = SEARCH_INDEX_WORD_REGEX.search(pattern).start()
+
+        ranked_occurrences = []
+        for section_index, section_separator in enumerate(
+            file.search_index.get_fuzzy_candidate_section_separators(
+                fuzzy_words=fuzzy_words,
+                section_separators=sections_separators_to_search_in,
+            )
+        ):
+            text = file.get_section_content(section_separator=section_separator)
+            casefolded_text = self._get_casefolded_text(
+                section_separator=section_separator, text=text
+            )
+
+            if len(casefolded_text) == len(text):
+                # the fuzzy words of the section are found by the fast literal search in the casefolded text,
+                # the regex only checks the whole occurrence at every found position
+                starts = sorted(
+                    start - first_word_offset
+                    for word in fuzzy_words[0].keys()
+                    & file.search_index.get_section_words(
+                        section_separator=section_separator
+                    )
+                    for start, _ in _iter_found_occurrences(
+                        pattern=word, text=casefolded_text
+                    )
+                    if start >= first_word_offset
+                )
+                matches = (regex.match(casefolded_text, start) for start in starts)
+            else:
+                matches = regex.finditer(text)
+
+            occurrence_end = 0
+            for m in matches:
+                if m is None or m.start() < occurrence_end:
+                    continue
+                distance = sum(
+                    words.get(normalize_text(m.group(index + 1)), 0)
+                    for index, words in enumerate(fuzzy_words)
+                )
+                ranked_occurrences.append(
+                    (distance, section_index, m.start(), m.end(), section_separator)
+                )
+                occurrence_end = m.end()
+
+        ranked_occurrences.sort()
+        for _, _, start, end, section_separator in ranked_occurrences:
+            yield section_separator, start, end
+
+    def iter_found_pattern_occurrences(
+        self, pattern, file, current_section
+    ) -> Iterator[Tuple[str, str, int, int]]:
+        """
+        (matched pattern, section separator, start, end) of the occurrences,
+        the occurrences of the multiple patterns search grouped by the pattern in the order of the patterns
+        """
+        if self.search_multiple:
+            # no occurrences are kept for narrowing the next search
+            self._last_search = None
+            yield from self._iter_multiple_pattern_occurrences(
+                pattern=pattern, file=file, current_section=current_section
+            )
+            return
+
+        for section_separator, start, end in self.iter_found_occurrences(
+            pattern=pattern, file=file, current_section=current_section
+        ):
+            yield pattern, section_separator, start, end
+
+    def _iter_multiple_pattern_occurrences(
+        self, pattern, file, current_section
+    ) -> Iterator[Tuple[str, str, int, int]]:
+        """
+        the occurrences of any of the literal patterns separated in the pattern,
+        found by the Aho-Corasick automaton of the patterns in a single pass over every section,
+        the occurrences of a pattern do not overlap, like in the search of the single pattern
+        """
+        patterns = get_multiple_patterns(
+            pattern=pattern, case_sensitive_search=self.search_case_sensitive
+        )
+        if not patterns:
+            return
+
+        if self.search_all_sections:
+            sections_separators_to_search_in = file.section_separators_sorted
+            candidate_section_separators = set()
+            for separated_pattern in patterns:
+                candidate_section_separators.update(
+                    file.search_index.get_candidate_section_separators(
+                        pattern=separated_pattern,
+                        section_separators=sections_separators_to_search_in,
+                    )
+                )
+            sections_separators_to_search_in = [
+                section_separator
+                for section_separator in sections_separators_to_search_in
+                if section_separator in candidate_section_separators
+            ]
+        else:
+            sections_separators_to_search_in = [current_section]
+
+        automaton = get_aho_corasick_automaton(
+            patterns=tuple(
+                patterns
+                if self.search_case_sensitive
+                else [separated_pattern.casefold() for separated_pattern in patterns]
+            )
+        )
+
+        found_occurrences = [[] for _ in patterns]
+        for section_separator in sections_separators_to_search_in:
+            text = file.get_section_content(section_separator=section_separator)
+
+            positions = None
+            if self.search_case_sensitive:
+                searched_text = text
+            else:
+                searched_text = self._get_casefolded_text(
+                    section_separator=section_separator, text=text
+                )
+                if len(searched_text) != len(text):
+                    # casefolding changed the text length, the positions are mapped back to the text
+                    positions = [
+                        position
+                        for position, char in enumerate(text)
+                        for _ in char.casefold()
+                    ]
+
+            occurrence_ends = [0] * len(patterns)
+            for pattern_index, start, end in automaton.iter_occurrences(
+                text=searched_text
+            ):
+                if positions is not None:
+                    start, end = positions[start], positions[end - 1] + 1
+                if start < occurrence_ends[pattern_index] or (
+                    self.search_full_words
+                    and not is_full_word_occurrence(text=text, start=start, end=end)
+                ):
+                    continue
+                found_occurrences[pattern_index].append(
+                    (section_separator, start, end)
+                )
+                occurrence_ends[pattern_index] = end
+
+        for separated_pattern, occurrences in zip(patterns, found_occurrences):
+            for section_separator, start, end in occurrences:
+                yield separated_pattern, section_separator, start, end
+
+    def search_for_occurrences(self, pattern, file, current_section):
+        found_occurrences = dict()
+
+        for section_separator, start, _ in self.iter_found_occurrences(
+            pattern=pattern, file=file, current_section=current_section
+        ):
+            found_occurrences.setdefault(section_separator, []).append(start)
 
         return found_occurrences
 
+    def close(self):
+        if self._parallel_search is not None:
+            self._parallel_search.close()
+
 
 def transform_position_text_placeholder_to_position(
     position_text_placeholder: str = None,
@@ -0,0 +1,285 @@
+import re
+from collections import Counter
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+
+SEARCH_INDEX_WORD_REGEX = re.compile(r"\w+")
+
+# a word is padded so its first and last characters are part of as many trigrams as the others,
+# the padding character is never part of a word
+SEARCH_INDEX_TRIGRAM_PADDING = "\n"
+
+# characters the regex IGNORECASE matching treats as equal to ASCII letters, but casefold keeps apart
+_NORMALIZE_TRANSLATION_TABLE = {ord("\u0131"): "i", ord("\u0307"): None}
+
+REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def normalize_text(text: str) -> str:
+    """
+    casefold the text the same way for the indexed sections and the searched patterns,
+    any case-insensitive occurrence of a pattern in a text is also an occurrence
+    of the normalized pattern in the normalized text
+    """
+    return text.casefold().translate(_NORMALIZE_TRANSLATION_TABLE)
+
+
+def is_literal_pattern(pattern: str) -> bool:
+    return not REGEX_SPECIAL_CHARS.intersection(pattern)
+
+
+def get_trigrams(word: str) -> Set[str]:
+    padded_word = f"{SEARCH_INDEX_TRIGRAM_PADDING}{word}{SEARCH_INDEX_TRIGRAM_PADDING}"
+    return {padded_word[i : i + 3] for i in range(len(padded_word) - 2)}
+
+
+def get_fuzzy_max_distance(word: str) -> int:
+    """
+    edit distance a word is still matched by, at most 2 edits and few enough for every word
+    within the distance to share a trigram with the word, so no typo is tolerated in the shortest words
+    """
+    return min((len(word) - 1) // 3, 2)
+
+
+def get_edit_distance(pattern: str, text: str, max_distance: int) -> Optional[int]:
+    """
+    Levenshtein distance of the pattern and the text computed by the bit-parallel algorithm of Myers,
+    a column of the distance matrix is kept as bits of the vertical deltas, one bit per pattern character,
+    None when the distance is larger than max_distance
+    """
+    if abs(len(pattern) - len(text)) > max_distance:
+        return None
+    if not pattern:
+        return len(text)
+
+    peq = dict()
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | 1 << i
+
+    mask = (1 << len(pattern)) - 1
+    last_bit = 1 << (len(pattern) - 1)
+    pv, mv = mask, 0
+    distance = len(pattern)
+
+    for j, char in enumerate(text):
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+
+        if ph & last_bit:
+            distance += 1
+        elif mh & last_bit:
+            distance -= 1
+        # every remaining text character lowers the distance by one at most
+        if distance - (len(text) - j - 1) > max_distance:
+            return None
+
+        # the first row of the matrix grows by one every column
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+    return distance if distance <= max_distance else None
+
+
+class SearchIndex:
+    """
+    inverted index of the normalized words of the sections narrowing the sections to search in,
+    a changed section gets unindexed right away and indexed again when it is searched next time
+    """
+
+    def __init__(self, get_section_content: Callable[..., str]):
+        self._get_section_content = get_section_content
+
+        self._words_by_section_separator: Dict[str, FrozenSet[str]] = dict()
+
+        # all the words ever indexed, the words of the unindexed sections are kept
+        # as they only widen the words a pattern token can be part of
+        self._vocabulary: Set[str] = set()
+        # the vocabulary words joined by line breaks, so a pattern token is looked up
+        # in the vocabulary with a single regex scan
+        self._vocabulary_data: Optional[str] = None
+
+        # trigram -> vocabulary words and word length -> vocabulary words for the fuzzy search,
+        # built when first needed and kept up to date with the vocabulary afterwards
+        self._vocabulary_words_by_trigram: Optional[Dict[str, Set[str]]] = None
+        self._vocabulary_words_by_length: Optional[Dict[int, Set[str]]] = None
+
+    def _index_section(self, section_separator: str) -> None:
+        words = frozenset(
+            SEARCH_INDEX_WORD_REGEX.findall(
+                normalize_text(
+                    self._get_section_content(section_separator=section_separator)
+                )
+            )
+        )
+        self._words_by_section_separator[section_separator] = words
+
+        new_words = words - self._vocabulary
+        if new_words:
+            self._vocabulary |= new_words
+            self._vocabulary_data = None
+            if self._vocabulary_words_by_trigram is not None:
+                self._index_fuzzy_words(words=new_words)
+
+    def index_sections(self, section_separators: List[str]) -> None:
+        for section_separator in section_separators:
+            if section_separator not in self._words_by_section_separator:
+                self._index_section(section_separator=section_separator)
+
+    def _index_fuzzy_words(self, words: Iterable[str]) -> None:
+        for word in words:
+            for trigram in get_trigrams(word):
+                self._vocabulary_words_by_trigram.setdefault(trigram, set()).add(word)
+            self._vocabulary_words_by_length.setdefault(len(word), set()).add(word)
+
+    def invalidate_section(self, section_separator: str) -> None:
+        self._words_by_section_separator.pop(section_separator, None)
+
+    def rename_section(
+        self, old_section_separator: str, new_section_separator: str
+    ) -> None:
+        words = self._words_by_section_separator.pop(old_section_separator, None)
+        if words is None:
+            self.invalidate_section(section_separator=new_section_separator)
+        else:
+            self._words_by_section_separator[new_section_separator] = words
+
+    def clear(self) -> None:
+        self._words_by_section_separator = dict()
+        self._vocabulary = set()
+        self._vocabulary_data = None
+        self._vocabulary_words_by_trigram = None
+        self._vocabulary_words_by_length = None
+
+    def _get_vocabulary_words(
+        self, token: str, left_open: bool, right_open: bool
+    ) -> Set[str]:
+        """
+        vocabulary words the pattern token can be part of, a token open on a side
+        can continue in the word past the token on that side
+        """
+        if self._vocabulary_data is None:
+            self._vocabulary_data = "\n".join(self._vocabulary)
+
+        word_regex = "{left}{token}{right}".format(
+            left=".*" if left_open else "",
+            token=re.escape(token),
+            right=".*" if right_open else "",
+        )
+        return set(
+            re.findall(f"^{word_regex}$", self._vocabulary_data, flags=re.MULTILINE)
+        )
+
+    def get_candidate_section_separators(
+        self, pattern: str, section_separators: List[str]
+    ) -> List[str]:
+        """
+        the sections possibly containing the literal pattern in the order of section_separators,
+        the sections are filtered by the words of the pattern, so a pattern without any word
+        has all the sections as candidates
+        """
+        self.index_sections(section_separators=section_separators)
+
+        normalized_pattern = normalize_text(pattern)
+        candidate_section_separators = list(section_separators)
+
+        for match in SEARCH_INDEX_WORD_REGEX.finditer(normalized_pattern):
+            token = match.group()
+            left_open = match.start() == 0
+            right_open = match.end() == len(normalized_pattern)
+
+            if not left_open and not right_open:
+                candidate_section_separators = [
+                    section_separator
+                    for section_separator in candidate_section_separators
+                    if token in self._words_by_section_separator[section_separator]
+                ]
+            else:
+                words = self._get_vocabulary_words(
+                    token=token, left_open=left_open, right_open=right_open
+                )
+                candidate_section_separators = [
+                    section_separator
+                    for section_separator in candidate_section_separators
+                    if not words.isdisjoint(
+                        self._words_by_section_separator[section_separator]
+                    )
+                ]
+
+            if not candidate_section_separators:
+                break
+
+        return candidate_section_separators
+
+    def get_fuzzy_words(
+        self, word: str, max_distance: int, section_separators: List[str]
+    ) -> Dict[str, int]:
+        """
+        {vocabulary word: edit distance} of the normalized words within max_distance of the normalized word,
+        a word within the distance shares at least all but 3 trigrams per edit with the word,
+        so only the words sharing that many trigrams are compared, or the words of a close length
+        when any word could be within the distance
+        """
+        self.index_sections(section_separators=section_separators)
+        if self._vocabulary_words_by_trigram is None:
+            self._vocabulary_words_by_trigram, self._vocabulary_words_by_length = (
+                dict(),
+                dict(),
+            )
+            self._index_fuzzy_words(words=self._vocabulary)
+
+        # the padded word has as many trigrams as characters, unless some trigrams repeat
+        trigrams = get_trigrams(word)
+        minimal_shared_trigram_count = len(trigrams) - 3 * max_distance
+
+        if minimal_shared_trigram_count > 0:
+            shared_trigram_counts = Counter()
+            for trigram in trigrams:
+                shared_trigram_counts.update(
+                    self._vocabulary_words_by_trigram.get(trigram, ())
+                )
+            candidate_words = [
+                candidate_word
+                for candidate_word, count in shared_trigram_counts.items()
+                if count >= minimal_shared_trigram_count
+            ]
+        else:
+            candidate_words = [
+                candidate_word
+                for length in range(len(word) - max_distance, len(word) + max_distance + 1)
+                for candidate_word in self._vocabulary_words_by_length.get(length, ())
+            ]
+
+        fuzzy_words = dict()
+        for candidate_word in candidate_words:
+            distance = get_edit_distance(
+                pattern=word, text=candidate_word, max_distance=max_distance
+            )
+            if distance is not None:
+                fuzzy_words[candidate_word] = distance
+        return fuzzy_words
+
+    def get_section_words(self, section_separator: str) -> FrozenSet[str]:
+        self.index_sections(section_separators=[section_separator])
+        return self._words_by_section_separator[section_separator]
+
+    def get_fuzzy_candidate_section_separators(
+        self, fuzzy_words: List[Dict[str, int]], section_separators: List[str]
+    ) -> List[str]:
+        """
+        the sections containing some of the fuzzy words of every pattern word in the order of section_separators
+        """
+        self.index_sections(section_separators=section_separators)
+        return [
+            section_separator
+            for section_separator in section_separators
+            if all(
+                not self._words_by_section_separator[section_separator].isdisjoint(
+                    words
+                )
+                for words in fuzzy_words
+            )
+        ]
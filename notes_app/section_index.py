@@ -0,0 +1,124 @@
+import struct
+import zlib
+from os import path, remove, replace, stat_result
+from typing import Dict, Optional, Tuple
+
+SECTION_INDEX_FILE_NAME_TEMPLATE = ".{file_name}.sections"
+SECTION_INDEX_FILE_MAGIC = b"NSIX"
+SECTION_INDEX_FILE_VERSION = 1
+SECTION_INDEX_FILE_ENCODING = "utf8"
+
+# magic, version, indexed file st_mtime_ns, indexed file size, sections count
+_HEADER_STRUCT = struct.Struct("<4sHqQI")
+# section separator length followed by the section separator bytes
+_SECTION_SEPARATOR_LENGTH_STRUCT = struct.Struct("<H")
+# section content start offset, section content end offset, section content hash
+_SECTION_STRUCT = struct.Struct("<QQI")
+
+
+def get_section_index_file_path(file_path: str) -> str:
+    dir_path, file_name = path.split(file_path)
+    return path.join(
+        dir_path, SECTION_INDEX_FILE_NAME_TEMPLATE.format(file_name=file_name)
+    )
+
+
+def get_section_content_hash(section_content_data) -> int:
+    """
+    cheap hash of the raw section content bytes
+    """
+    return zlib.crc32(section_content_data)
+
+
+def read_section_index(
+    file_path: str, file_stat: stat_result
+) -> Optional[Tuple[Dict[str, Tuple[int, int]], Dict[str, int]]]:
+    """
+    read the section offsets and section content hashes from the section index file,
+    None is returned when the index file is missing, unreadable or the file changed since it was indexed
+    """
+    try:
+        with open(get_section_index_file_path(file_path=file_path), "rb") as f:
+            data = f.read()
+
+        magic, version, mtime_ns, size, sections_count = _HEADER_STRUCT.unpack_from(
+            data
+        )
+        if (
+            magic != SECTION_INDEX_FILE_MAGIC
+            or version != SECTION_INDEX_FILE_VERSION
+            or mtime_ns != file_stat.st_mtime_ns
+            or size != file_stat.st_size
+        ):
+            return None
+
+        section_offsets = dict()
+        section_hashes = dict()
+        position = _HEADER_STRUCT.size
+
+        for _ in range(sections_count):
+            (section_separator_length,) = _SECTION_SEPARATOR_LENGTH_STRUCT.unpack_from(
+                data, position
+            )
+            position += _SECTION_SEPARATOR_LENGTH_STRUCT.size
+
+            section_separator = data[
+                position : position + section_separator_length
+            ].decode(SECTION_INDEX_FILE_ENCODING)
+            position += section_separator_length
+
+            start, end, section_hash = _SECTION_STRUCT.unpack_from(data, position)
+            position += _SECTION_STRUCT.size
+
+            if not start <= end <= size:
+                return None
+
+            section_offsets[section_separator] = (start, end)
+            section_hashes[section_separator] = section_hash
+
+    except (OSError, ValueError, struct.error):
+        return None
+
+    return section_offsets, section_hashes
+
+
+def write_section_index(
+    file_path: str,
+    file_stat: stat_result,
+    section_offsets: Dict[str, Tuple[int, int]],
+    section_hashes: Dict[str, int],
+) -> None:
+    """
+    write the section offsets and section content hashes to the section index file,
+    the index is only a cache so failing to write it is not an error
+    """
+    chunks = [
+        _HEADER_STRUCT.pack(
+            SECTION_INDEX_FILE_MAGIC,
+            SECTION_INDEX_FILE_VERSION,
+            file_stat.st_mtime_ns,
+            file_stat.st_size,
+            len(section_offsets),
+        )
+    ]
+
+    for section_separator, (start, end) in section_offsets.items():
+        section_separator_data = section_separator.encode(SECTION_INDEX_FILE_ENCODING)
+        chunks.append(
+            _SECTION_SEPARATOR_LENGTH_STRUCT.pack(len(section_separator_data))
+        )
+        chunks.append(section_separator_data)
+        chunks.append(
+            _SECTION_STRUCT.pack(start, end, section_hashes[section_separator])
+        )
+
+    section_index_file_path = get_section_index_file_path(file_path=file_path)
+    temp_section_index_file_path = f"{section_index_file_path}.tmp"
+
+    try:
+        with open(temp_section_index_file_path, "wb") as f:
+            f.writelines(chunks)
+        replace(temp_section_index_file_path, section_index_file_path)
+    except OSError:
+        if path.exists(temp_section_index_file_path):
+            remove(temp_section_index_file_path)
@@ -0,0 +1,214 @@
+import json
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from notes_app.storage.notes_storage import Storage
+
+BUNDLE_STORAGE_DIR_EXTENSION = ".notes"
+BUNDLE_MANIFEST_FILE_NAME = "manifest.json"
+BUNDLE_MANIFEST_VERSION = 1
+BUNDLE_SECTION_FILE_EXTENSION = ".txt"
+BUNDLE_FILE_ENCODING = "utf8"
+
+_SECTION_FILE_NAME_INVALID_CHARS_REGEX = re.compile(r"[^A-Za-z0-9 _-]+")
+
+
+def is_bundle(dir_path: str) -> bool:
+    return os.path.isfile(os.path.join(dir_path, BUNDLE_MANIFEST_FILE_NAME))
+
+
+def _write_file_atomically(file_path: str, data: str, fsync: bool) -> None:
+    """
+    write the data to a temporary file next to the file and replace the file with it,
+    so that a file is never left partially written for git, rsync or another reader
+    """
+    dir_path, file_name = os.path.split(file_path)
+    fd, temp_file_path = tempfile.mkstemp(
+        prefix=f".{file_name}.", suffix=".tmp", dir=dir_path
+    )
+    try:
+        with open(fd, "w", encoding=BUNDLE_FILE_ENCODING) as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_file_path, file_path)
+    except Exception:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+
+class BundleStorage(Storage):
+    """
+    The `BundleStorage` class keeps every section as a text file in a bundle directory
+    with a manifest keeping the order of the sections and their file names,
+    so saving a changed section rewrites only the section file.
+    """
+
+    def __init__(self, dir_path: str, section_name_regex: str, fsync: bool = True):
+        self._dir_path = dir_path
+        self._section_name_regex = re.compile(section_name_regex)
+        self._fsync = fsync
+
+        # section separator -> section file name, in the order of the sections,
+        # read from the manifest when first needed
+        self._manifest: Optional[Dict[str, str]] = None
+
+        # file name -> (modification time, size) of the bundle files when the manifest was read or saved,
+        # so that the bundle saved by another instance meanwhile is told apart
+        self._dir_snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+
+    def _get_dir_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        dir_snapshot = dict()
+        try:
+            with os.scandir(self._dir_path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        entry_stat = entry.stat()
+                        dir_snapshot[entry.name] = (
+                            entry_stat.st_mtime_ns,
+                            entry_stat.st_size,
+                        )
+        except FileNotFoundError:
+            pass
+        return dir_snapshot
+
+    def is_changed(self) -> bool:
+        if self._dir_snapshot is None:
+            return True
+        return self._get_dir_snapshot() != self._dir_snapshot
+
+    def _get_manifest(self) -> Dict[str, str]:
+        if self._manifest is None:
+            self._dir_snapshot = self._get_dir_snapshot()
+            try:
+                with open(
+                    os.path.join(self._dir_path, BUNDLE_MANIFEST_FILE_NAME),
+                    "r",
+                    encoding=BUNDLE_FILE_ENCODING,
+                ) as f:
+                    manifest_data = json.load(f)
+            except FileNotFoundError:
+                manifest_data = {"sections": []}
+
+            self._manifest = {
+                section["section_separator"]: section["file_name"]
+                for section in manifest_data["sections"]
+            }
+        return self._manifest
+
+    def _write_manifest(self, manifest: Dict[str, str]) -> None:
+        manifest_data = {
+            "version": BUNDLE_MANIFEST_VERSION,
+            "sections": [
+                {"section_separator": section_separator, "file_name": file_name}
+                for section_separator, file_name in manifest.items()
+            ],
+        }
+        _write_file_atomically(
+            file_path=os.path.join(self._dir_path, BUNDLE_MANIFEST_FILE_NAME),
+            data=json.dumps(manifest_data, indent=2, ensure_ascii=False),
+            fsync=self._fsync,
+        )
+
+    def _get_section_file_name(self, section_separator: str, file_names: set) -> str:
+        """
+        file name readable as the section name, file names differing only in case are avoided
+        for case-insensitive file systems and files not belonging to any section are never overwritten
+        """
+        match = self._section_name_regex.search(section_separator)
+        section_name = match.group(1) if match else section_separator
+        file_name_stem = (
+            _SECTION_FILE_NAME_INVALID_CHARS_REGEX.sub("_", section_name).strip()
+            or "section"
+        )
+
+        file_name = f"{file_name_stem}{BUNDLE_SECTION_FILE_EXTENSION}"
+        suffix = 1
+        while (
+            file_name.lower() in file_names
+            or file_name.lower() == BUNDLE_MANIFEST_FILE_NAME
+            or os.path.exists(os.path.join(self._dir_path, file_name))
+        ):
+            suffix += 1
+            file_name = f"{file_name_stem} {suffix}{BUNDLE_SECTION_FILE_EXTENSION}"
+        return file_name
+
+    def _get_section_file_path(self, section_separator: str) -> str:
+        return os.path.join(self._dir_path, self._get_manifest()[section_separator])
+
+    def read_section_separators(self) -> List[str]:
+        return list(self._get_manifest())
+
+    def read_section_content(self, section_separator: str) -> str:
+        with open(
+            self._get_section_file_path(section_separator=section_separator),
+            "r",
+            encoding=BUNDLE_FILE_ENCODING,
+        ) as f:
+            return f.read()
+
+    def save_sections(
+        self,
+        section_separators: List[str],
+        changed_sections: Iterable[Tuple[str, str]],
+        deleted_section_separators: Iterable[str] = (),
+    ) -> None:
+        os.makedirs(self._dir_path, exist_ok=True)
+
+        # the manifest is read again, so the sections saved by another instance meanwhile are kept
+        self._manifest = None
+        manifest = self._get_manifest()
+        # the file names of the deleted sections are not reused, their files get removed below
+        file_names = {file_name.lower() for file_name in manifest.values()}
+
+        saved_manifest = dict()
+        for section_separator in section_separators:
+            if section_separator not in manifest:
+                saved_manifest[section_separator] = self._get_section_file_name(
+                    section_separator=section_separator, file_names=file_names
+                )
+                file_names.add(saved_manifest[section_separator].lower())
+            else:
+                saved_manifest[section_separator] = manifest[section_separator]
+
+        deleted_section_separators = set(deleted_section_separators)
+        for section_separator, file_name in manifest.items():
+            if (
+                section_separator not in saved_manifest
+                and section_separator not in deleted_section_separators
+            ):
+                saved_manifest[section_separator] = file_name
+
+        # the section files get written before the manifest referencing them
+        # and removed only after the manifest stopped referencing them,
+        # so the bundle stays consistent when interrupted
+        for section_separator, section_content in changed_sections:
+            _write_file_atomically(
+                file_path=os.path.join(
+                    self._dir_path, saved_manifest[section_separator]
+                ),
+                data=section_content,
+                fsync=self._fsync,
+            )
+
+        if list(saved_manifest.items()) != list(manifest.items()) or not os.path.exists(
+            os.path.join(self._dir_path, BUNDLE_MANIFEST_FILE_NAME)
+        ):
+            self._write_manifest(manifest=saved_manifest)
+        self._manifest = saved_manifest
+
+        for section_separator, file_name in manifest.items():
+            if section_separator not in saved_manifest:
+                file_path = os.path.join(self._dir_path, file_name)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+        self._dir_snapshot = self._get_dir_snapshot()
+
+    def close(self) -> None:
+        self._manifest = None
+        self._dir_snapshot = None
@@ -0,0 +1,44 @@
+from typing import Iterable, List, Tuple
+
+
+class Storage:
+    """
+    Abstract superclass for all storages keeping the sections apart
+    instead of in a single text file.
+    """
+
+    def read_section_separators(self) -> List[str]:
+        """
+        The section separators in the order of the sections.
+        """
+        raise NotImplementedError
+
+    def read_section_content(self, section_separator: str) -> str:
+        """
+        The section content, KeyError is raised when there is no such section.
+        """
+        raise NotImplementedError
+
+    def save_sections(
+        self,
+        section_separators: List[str],
+        changed_sections: Iterable[Tuple[str, str]],
+        deleted_section_separators: Iterable[str] = (),
+    ) -> None:
+        """
+        Save the changed sections as section separator and section content pairs
+        and the order of the sections, only the deleted sections get deleted,
+        the sections saved by another instance and not in section_separators are kept.
+        """
+        raise NotImplementedError
+
+    def is_changed(self) -> bool:
+        """
+        Whether another instance saved the storage since it was opened or last saved.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Release the storage, it gets opened again when accessed.
+        """
@@ -0,0 +1,209 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from notes_app.model.notes_model import SQLITE_WAL_FILE_PATH_TEMPLATE, get_current_epoch
+from notes_app.storage.notes_storage import Storage
+
+SQLITE_STORAGE_FILE_EXTENSION = ".sqlite"
+
+SQLITE_SYNCHRONOUS_FULL = "FULL"
+SQLITE_SYNCHRONOUS_NORMAL = "NORMAL"
+SQLITE_SYNCHRONOUS_OFF = "OFF"
+
+# the columns the sections are read from, a database without them is not a notes file
+SQLITE_SECTIONS_TABLE_READ_COLUMNS = {"section_separator", "position", "content"}
+
+_CREATE_SECTIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS sections (
+    section_separator TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_on INTEGER NOT NULL
+)
+"""
+
+_UPSERT_SECTION_SQL = """
+INSERT INTO sections (section_separator, position, content, updated_on)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (section_separator) DO UPDATE SET
+    position = excluded.position,
+    content = excluded.content,
+    version = version + 1,
+    updated_on = excluded.updated_on
+"""
+
+
+def _get_section_positions(
+    section_separators: List[str], saved_section_positions: Dict[str, int]
+) -> List[int]:
+    """
+    strictly increasing positions of the sections keeping the saved positions where the order allows,
+    so that moving or adding a section does not mean updating the positions of every section
+    """
+    section_positions = []
+    position = -1
+
+    for section_separator in section_separators:
+        saved_position = saved_section_positions.get(section_separator)
+        if saved_position is not None and saved_position > position:
+            position = saved_position
+        else:
+            position += 1
+        section_positions.append(position)
+
+    return section_positions
+
+
+class SqliteStorage(Storage):
+    """
+    The `SqliteStorage` class keeps every section as a row of a SQLite database
+    in the WAL journal mode, so saving a changed section is a single row update.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        synchronous: str = SQLITE_SYNCHRONOUS_NORMAL,
+        read_only: bool = False,
+    ):
+        self._file_path = file_path
+        self._synchronous = synchronous
+        # a read only storage never writes the database, nor creates the sections table in it
+        self._read_only = read_only
+        self._connection: Optional[sqlite3.Connection] = None
+        # the data version of the connection changes with every commit of another connection,
+        # the commits of another instance go to the write-ahead log and leave the file untouched
+        self._data_version: Optional[int] = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self._read_only:
+                self._connection = self._get_read_only_connection()
+            else:
+                self._connection = sqlite3.connect(self._file_path)
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(f"PRAGMA synchronous={self._synchronous}")
+                self._connection.execute(_CREATE_SECTIONS_TABLE_SQL)
+            self._data_version = self._get_data_version()
+        return self._connection
+
+    def _get_read_only_connection(self) -> sqlite3.Connection:
+        """
+        connection opened in the read only mode, a database without the write-ahead log is opened
+        as immutable since opening it would create the log files next to it otherwise,
+        a database without the sections table raises ValueError
+        """
+        uri = f"{Path(self._file_path).absolute().as_uri()}?mode=ro"
+        if not os.path.exists(
+            SQLITE_WAL_FILE_PATH_TEMPLATE.format(file_path=self._file_path)
+        ):
+            uri = f"{uri}&immutable=1"
+
+        connection = sqlite3.connect(uri, uri=True)
+        try:
+            column_names = {
+                column_name
+                for _, column_name, *_ in connection.execute(
+                    "PRAGMA table_info(sections)"
+                )
+            }
+        except sqlite3.Error:
+            connection.close()
+            raise
+        if not SQLITE_SECTIONS_TABLE_READ_COLUMNS <= column_names:
+            connection.close()
+            raise ValueError("No sections table in file found")
+        return connection
+
+    def _get_data_version(self) -> int:
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_changed(self) -> bool:
+        if self._connection is None:
+            return True
+        return self._get_data_version() != self._data_version
+
+    def read_section_separators(self) -> List[str]:
+        return [
+            section_separator
+            for (section_separator,) in self._get_connection().execute(
+                "SELECT section_separator FROM sections ORDER BY position, rowid"
+            )
+        ]
+
+    def read_section_content(self, section_separator: str) -> str:
+        row = (
+            self._get_connection()
+            .execute(
+                "SELECT content FROM sections WHERE section_separator = ?",
+                (section_separator,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            raise KeyError(section_separator)
+        return row[0]
+
+    def save_sections(
+        self,
+        section_separators: List[str],
+        changed_sections: Iterable[Tuple[str, str]],
+        deleted_section_separators: Iterable[str] = (),
+    ) -> None:
+        connection = self._get_connection()
+
+        with connection:
+            saved_section_positions = dict(
+                connection.execute("SELECT section_separator, position FROM sections")
+            )
+
+            connection.executemany(
+                "DELETE FROM sections WHERE section_separator = ?",
+                (
+                    (section_separator,)
+                    for section_separator in deleted_section_separators
+                ),
+            )
+
+            section_positions = dict(
+                zip(
+                    section_separators,
+                    _get_section_positions(
+                        section_separators=section_separators,
+                        saved_section_positions=saved_section_positions,
+                    ),
+                )
+            )
+            updated_on = get_current_epoch()
+            changed_section_separators = set()
+
+            for section_separator, section_content in changed_sections:
+                changed_section_separators.add(section_separator)
+                connection.execute(
+                    _UPSERT_SECTION_SQL,
+                    (
+                        section_separator,
+                        section_positions[section_separator],
+                        section_content,
+                        updated_on,
+                    ),
+                )
+
+            # the moved sections not changed otherwise get only their position updated
+            connection.executemany(
+                "UPDATE sections SET position = ? WHERE section_separator = ?",
+                (
+                    (position, section_separator)
+                    for section_separator, position in section_positions.items()
+                    if section_separator not in changed_section_separators
+                    and saved_section_positions.get(section_separator) != position
+                ),
+            )
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
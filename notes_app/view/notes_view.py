@@ -2,14 +2,19 @@ import os
 import re
 import webbrowser
 from enum import Enum
+from functools import partial
+from itertools import islice
 from os import path, linesep
 from os.path import exists
+from time import perf_counter
 
+from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.lang import Builder
 from kivy.metrics import dp
-from kivy.properties import ObjectProperty, StringProperty
-from kivy.uix.scrollview import ScrollView
+from kivy.properties import NumericProperty, ObjectProperty, StringProperty
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivymd.theming import ThemableBehavior
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.dialog import MDDialog
@@ -29,7 +34,6 @@ from kivy.base import EventLoop
 from kivy.uix.textinput import FL_IS_LINEBREAK
 
 from notes_app import __version__
-from notes_app.diff import merge_strings
 from notes_app.observer.notes_observer import Observer
 
 from notes_app.color import (
@@ -38,6 +42,7 @@ from notes_app.color import (
     AVAILABLE_COLORS,
     AVAILABLE_SNACK_BAR_COLORS,
 )
+from notes_app.folder_search import FolderSearch
 from notes_app.file import (
     get_validated_file_path,
     File,
@@ -47,11 +52,16 @@ from notes_app.file import (
     SECTION_FILE_NAME_MINIMAL_CHAR_COUNT,
 )
 from notes_app.font import get_next_font, AVAILABLE_FONTS
+from notes_app.line_index import LineIndex
 from notes_app.mark import get_marked_text
+from notes_app.parallel_search import get_parallel_search
 from notes_app.search import (
     Search,
     validate_search_input,
     SEARCH_LIST_ITEM_MATCHED_EXTRA_CHAR_COUNT,
+    SEARCH_LIST_PAGE_ITEM_COUNT,
+    SEARCH_LIST_BATCH_DURATION,
+    SEARCH_LIVE_DEBOUNCE_DURATION,
     SEARCH_LIST_ITEM_MATCHED_HIGHLIGHT_COLOR,
     SEARCH_LIST_ITEM_MATCHED_HIGHLIGHT_STYLE,
     transform_section_text_placeholder_to_section_name,
@@ -59,6 +69,8 @@ from notes_app.search import (
     transform_position_text_placeholder_to_position,
     transform_position_to_position_text_placeholder,
 )
+from notes_app.storage.bundle_storage import BUNDLE_STORAGE_DIR_EXTENSION
+from notes_app.storage.sqlite_storage import SQLITE_STORAGE_FILE_EXTENSION
 
 APP_TITLE = "Notes"
 APP_METADATA_ROWS = [
@@ -67,9 +79,59 @@ APP_METADATA_ROWS = [
     f"version {__version__}",
 ]
 EXTERNAL_REPOSITORY_URL = "https://www.github.com/datahappy1/notes_app/"
+TEXT_STORAGE_FILE_EXTENSION = ".txt"
 
 
 class CustomTextInput(TextInput):
+    def __init__(self, **kwargs):
+        # the cursor is turned into the text index and back on every key press,
+        # TextInput walks all the lines before the cursor for that, the line index is searched instead
+        self._line_index = LineIndex(
+            get_lines=lambda: self._lines,
+            get_lines_flags=lambda: self._lines_flags,
+            line_break_flag=FL_IS_LINEBREAK,
+        )
+        # the first line changed by the running change of the lines, all of them when not known
+        self._first_changed_line = 0
+        super().__init__(**kwargs)
+
+    def on__lines(self, instance, value):
+        self._line_index.invalidate(line=self._first_changed_line)
+
+    def _set_line_text(self, line_num, text):
+        self._first_changed_line = line_num
+        try:
+            super()._set_line_text(line_num, text)
+        finally:
+            self._first_changed_line = 0
+
+    def _delete_line(self, idx):
+        self._first_changed_line = idx
+        try:
+            super()._delete_line(idx)
+        finally:
+            self._first_changed_line = 0
+
+    def _insert_lines(self, start, *args):
+        self._first_changed_line = start
+        try:
+            super()._insert_lines(start, *args)
+        finally:
+            self._first_changed_line = 0
+
+    def cursor_index(self, cursor=None):
+        if not cursor:
+            cursor = self.cursor
+        col, row = cursor
+        try:
+            return self._line_index.get_index(line=row, column=col)
+        except IndexError:
+            return 0
+
+    def get_cursor_from_index(self, index):
+        row, col = self._line_index.get_line_and_column(index=index)
+        return col, row
+
     # overriding TextInput.insert_text() with added extra condition and (len(_lines_flags) - 1 >= row + 1)
     # to handle a edge case when external update adds multiple line breaks and results in uncaught index error
     def insert_text(self, substring, from_undo=False):
@@ -211,15 +273,37 @@ class SearchDialogContent(MDBoxLayout):
     search_string_placeholder = StringProperty(None)
     search_results_message = StringProperty(None)
     execute_search = ObjectProperty(None)
+    execute_live_search = ObjectProperty(None)
+    get_search_result_texts = ObjectProperty(None)
+    execute_goto_search_result = ObjectProperty(None)
     cancel = ObjectProperty(None)
 
 
-class ScrollableLabel(ScrollView):
-    pass
+class SearchResultsList(RecycleView):
+    get_item_texts = ObjectProperty(None)
+    execute_goto_item = ObjectProperty(None)
 
 
-class CustomListItem(ThreeLineListItem):
-    pass
+class CustomListItem(RecycleDataViewBehavior, ThreeLineListItem):
+    # the notes file of a folder search result, empty for a search result of the open file
+    file_path = StringProperty("")
+    section_separator = StringProperty(None)
+    position_start = NumericProperty(0)
+    position_end = NumericProperty(0)
+
+    search_results_list = ObjectProperty(None)
+
+    def refresh_view_attrs(self, rv, index, data):
+        # the texts with the matched string are built only for the items shown,
+        # the file path of a reused item is reset for a search result of the open file
+        data = {"file_path": "", **data}
+        self.search_results_list = rv
+        return super().refresh_view_attrs(
+            rv, index, dict(data, **rv.get_item_texts(**data))
+        )
+
+    def on_release(self):
+        self.search_results_list.execute_goto_item(self)
 
 
 class CustomSnackbar(BaseSnackbar):
@@ -231,6 +315,9 @@ class MenuStorageItems(Enum):
     ChooseFile = "Choose storage file"
     ShowFileInfo = "Show storage file info"
     Save = "Save storage file"
+    ImportToSqliteFile = "Import to SQLite storage file"
+    ImportToBundleDir = "Import to bundle storage directory"
+    ExportToTextFile = "Export to text storage file"
 
 
 class MenuSettingsItems(Enum):
@@ -268,9 +355,19 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
         self.file_manager = None
 
         self.last_searched_string = str()
+        # the scheduled event adding the search results found after the first page
+        self.search_results_event = None
+        # the scheduled event running the live search once the search string stops changing
+        self.live_search_event = None
         self.auto_save_text_input_change_counter = 0
 
-        self.search = Search(defaults=self.defaults)
+        self.search = Search(
+            defaults=self.defaults,
+            parallel_search=get_parallel_search(defaults=self.defaults),
+        )
+        self.folder_search = FolderSearch(
+            controller=self.controller, defaults=self.defaults
+        )
         self.set_properties_from_settings()
 
         self.file = File(
@@ -385,6 +482,21 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             self.press_menu_item_show_file_metadata()
         elif text_item == MenuStorageItems.Save.value:
             self.press_menu_item_save_file()
+        elif text_item == MenuStorageItems.ImportToSqliteFile.value:
+            self.press_menu_item_convert_file(
+                file_extension=SQLITE_STORAGE_FILE_EXTENSION,
+                convert=self.controller.import_file_data,
+            )
+        elif text_item == MenuStorageItems.ImportToBundleDir.value:
+            self.press_menu_item_convert_file(
+                file_extension=BUNDLE_STORAGE_DIR_EXTENSION,
+                convert=self.controller.import_file_data,
+            )
+        elif text_item == MenuStorageItems.ExportToTextFile.value:
+            self.press_menu_item_convert_file(
+                file_extension=TEXT_STORAGE_FILE_EXTENSION,
+                convert=self.controller.export_file_data,
+            )
 
         self.menu_storage.dismiss()
 
@@ -472,6 +584,7 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             self.show_error_bar(error_message=f"Cannot open the file {file_path}")
             return
 
+        self.compact_file()
         self.controller.set_file_path(validated_file_path)
 
         try:
@@ -491,6 +604,12 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             self.press_add_section()
 
     def execute_goto_search_result(self, custom_list_item):
+        if custom_list_item.file_path and path.abspath(
+            custom_list_item.file_path
+        ) != path.abspath(self.model.file_path):
+            # a folder search result in another notes file
+            self.execute_open_file(file_path=custom_list_item.file_path)
+
         section_name = transform_section_text_placeholder_to_section_name(
             section_text_placeholder=custom_list_item.secondary_text
         )
@@ -504,9 +623,7 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             position_text_placeholder=custom_list_item.tertiary_text
         )
 
-        self.text_section_view.select_text(
-            position, position + len(self.last_searched_string)
-        )
+        self.text_section_view.select_text(position, custom_list_item.position_end)
 
         cursor_position = self.text_section_view.get_cursor_from_index(position)
         self.text_section_view.cursor = cursor_position
@@ -520,6 +637,16 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             return self.search.search_all_sections
         elif switch_id == "search_full_words_switch":
             return self.search.search_full_words
+        elif switch_id == "search_regex_switch":
+            return self.search.search_regex
+        elif switch_id == "search_live_switch":
+            return self.search.search_live
+        elif switch_id == "search_fuzzy_switch":
+            return self.search.search_fuzzy
+        elif switch_id == "search_multiple_switch":
+            return self.search.search_multiple
+        elif switch_id == "search_folder_switch":
+            return self.search.search_folder
 
     def search_switch_callback(self, switch_id, state, *args):
         if switch_id == "search_case_sensitive_switch":
@@ -528,71 +655,240 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             self.search.search_all_sections = state
         elif switch_id == "search_full_words_switch":
             self.search.search_full_words = state
+        elif switch_id == "search_regex_switch":
+            self.search.search_regex = state
+        elif switch_id == "search_live_switch":
+            self.search.search_live = state
+        elif switch_id == "search_fuzzy_switch":
+            self.search.search_fuzzy = state
+        elif switch_id == "search_multiple_switch":
+            self.search.search_multiple = state
+        elif switch_id == "search_folder_switch":
+            self.search.search_folder = state
+
+    def get_search_result_data(
+        self, pattern, section_separator, position_start, position_end
+    ):
+        search_result_data = dict(
+            section_separator=section_separator,
+            position_start=position_start,
+            position_end=position_end,
+        )
+        # the results of the multiple patterns search are tagged by the pattern they matched
+        if self.search.search_multiple:
+            search_result_data.update(pattern=pattern)
+        return search_result_data
+
+    def get_folder_search_result_data(self, folder_search_hit):
+        return dict(
+            file_path=folder_search_hit.file_path,
+            section_separator=folder_search_hit.section_separator,
+            position_start=folder_search_hit.start,
+            position_end=folder_search_hit.end,
+            context=folder_search_hit.context,
+        )
 
-    def execute_search(self, *args):
-        if not validate_search_input(input_string=args[0]):
-            self.dialog.content_cls.search_results_message = "Invalid search"
-            return
+    def get_search_result_texts(
+        self,
+        section_separator,
+        position_start,
+        position_end,
+        pattern=None,
+        file_path="",
+        context=None,
+    ):
+        # a folder search result carries the text around the matched string from its notes file
+        if context is None:
+            context = self.file.get_section_content(section_separator)[
+                position_start : position_end + SEARCH_LIST_ITEM_MATCHED_EXTRA_CHAR_COUNT
+            ]
 
-        self.last_searched_string = args[0]
+        found_string_marked = get_marked_text(
+            text=context[: position_end - position_start],
+            highlight_style=SEARCH_LIST_ITEM_MATCHED_HIGHLIGHT_STYLE,
+            highlight_color=SEARCH_LIST_ITEM_MATCHED_HIGHLIGHT_COLOR,
+        )
+
+        found_string_extra_chars = context[position_end - position_start :]
 
-        self.dialog.content_cls.results_list.clear_widgets()
+        section_name = transform_section_separator_to_section_name(
+            defaults=self.defaults, section_separator=section_separator
+        )
 
-        found_occurrences = self.search.search_for_occurrences(
-            pattern=self.last_searched_string,
-            file=self.file,
-            current_section=self.current_section,
+        if pattern:
+            tag = f"{pattern}: "
+        elif file_path:
+            tag = f"{path.basename(file_path)}: "
+        else:
+            tag = ""
+
+        return dict(
+            text=f"{tag}{found_string_marked}{found_string_extra_chars}...",
+            secondary_text=transform_section_name_to_section_text_placeholder(
+                section_name=section_name
+            ),
+            tertiary_text=transform_position_to_position_text_placeholder(
+                position_start=position_start
+            ),
         )
 
-        if not found_occurrences:
+    def set_search_results_message(self, found_occurrences_count, counting=False):
+        if counting:
+            self.dialog.content_cls.search_results_message = (
+                f"Matches on {found_occurrences_count} positions found so far"
+            )
+        elif not found_occurrences_count:
             self.dialog.content_cls.search_results_message = "No match found"
+        else:
+            self.dialog.content_cls.search_results_message = (
+                f"Matches on {found_occurrences_count} positions found"
+                if found_occurrences_count > 1
+                else f"Match on {found_occurrences_count} position found"
+            )
+
+    def cancel_search(self):
+        if self.search_results_event is not None:
+            self.search_results_event.cancel()
+            self.search_results_event = None
+        self.folder_search.cancel()
+
+    def cancel_live_search(self):
+        if self.live_search_event is not None:
+            self.live_search_event.cancel()
+            self.live_search_event = None
+
+    def execute_live_search(self, search_string):
+        """
+        search as the search string is typed, once it stops changing for the debounce duration
+        """
+        self.cancel_live_search()
+
+        if not self.search.search_live or not validate_search_input(
+            input_string=search_string
+        ):
             return
 
-        found_occurrences_count = 0
+        self.live_search_event = Clock.schedule_once(
+            partial(self.run_live_search, search_string),
+            SEARCH_LIVE_DEBOUNCE_DURATION,
+        )
+
+    def run_live_search(self, search_string, *args):
+        self.live_search_event = None
+        self.execute_search(search_string)
+
+    def iter_folder_search_results(self, pattern):
+        """
+        data of the search results in the notes files of the folder of the open file,
+        None whenever no search results are ready yet as the files are searched in the background
+        """
+        folder_search_hits = self.folder_search.iter_found_hits(
+            pattern=pattern,
+            folder_path=path.dirname(path.abspath(self.model.file_path)),
+            search=self.search,
+            block=False,
+        )
+        return (
+            None
+            if folder_search_hit is None
+            else self.get_folder_search_result_data(folder_search_hit=folder_search_hit)
+            for folder_search_hit in folder_search_hits
+        )
+
+    def add_search_results(self, found_search_results, *args):
+        """
+        add the search results found within the batch duration, called every frame
+        until all the search results are added, so the app stays responsive while counting
+        """
+        results_list = self.dialog.content_cls.results_list
+
+        batch_end = perf_counter() + SEARCH_LIST_BATCH_DURATION
+        data = []
+        counting = False
+        for search_result_data in found_search_results:
+            if search_result_data is None:
+                # no more folder search results are ready in this frame
+                counting = True
+                break
+            data.append(search_result_data)
+            if perf_counter() > batch_end:
+                counting = True
+                break
+
+        results_list.data.extend(data)
+        self.set_search_results_message(
+            found_occurrences_count=len(results_list.data), counting=counting
+        )
 
-        for (
-            section_file_separator,
-            section_found_occurrences,
-        ) in found_occurrences.items():
-            found_occurrences_count += len(section_found_occurrences)
-            text_data = self.file.get_section_content(section_file_separator)
+        if not counting:
+            self.search_results_event = None
+            return False
 
-            for position_start in section_found_occurrences:
-                position_end = position_start + len(self.last_searched_string)
+    def execute_search(self, *args):
+        self.cancel_live_search()
+        self.cancel_search()
 
-                found_string = text_data[position_start:position_end]
-                found_string_marked = get_marked_text(
-                    text=found_string,
-                    highlight_style=SEARCH_LIST_ITEM_MATCHED_HIGHLIGHT_STYLE,
-                    highlight_color=SEARCH_LIST_ITEM_MATCHED_HIGHLIGHT_COLOR,
-                )
+        if not validate_search_input(input_string=args[0]):
+            self.dialog.content_cls.search_results_message = "Invalid search"
+            return
 
-                found_string_extra_chars = text_data[
-                    position_end : position_end
-                    + SEARCH_LIST_ITEM_MATCHED_EXTRA_CHAR_COUNT
-                ]
+        self.last_searched_string = args[0]
 
-                section_name = transform_section_separator_to_section_name(
-                    defaults=self.defaults, section_separator=section_file_separator
-                )
+        results_list = self.dialog.content_cls.results_list
+        results_list.data = []
 
-                self.dialog.content_cls.results_list.add_widget(
-                    CustomListItem(
-                        text=f"{found_string_marked}{found_string_extra_chars}...",
-                        secondary_text=transform_section_name_to_section_text_placeholder(
-                            section_name=section_name
-                        ),
-                        tertiary_text=transform_position_to_position_text_placeholder(
-                            position_start=position_start
-                        ),
-                        on_release=self.execute_goto_search_result,
+        try:
+            if self.search.search_folder:
+                found_search_results = self.iter_folder_search_results(
+                    pattern=self.last_searched_string
+                )
+            else:
+                found_search_results = (
+                    self.get_search_result_data(
+                        pattern=pattern,
+                        section_separator=section_separator,
+                        position_start=position_start,
+                        position_end=position_end,
+                    )
+                    for pattern, section_separator, position_start, position_end in (
+                        self.search.iter_found_pattern_occurrences(
+                            pattern=self.last_searched_string,
+                            file=self.file,
+                            current_section=self.current_section,
+                        )
                     )
                 )
+                results_list.data = list(
+                    islice(found_search_results, SEARCH_LIST_PAGE_ITEM_COUNT)
+                )
+        except re.error:
+            self.dialog.content_cls.search_results_message = "Invalid search pattern"
+            return
+
+        if self.search.search_folder:
+            # all the search results are added as the files of the folder get searched
+            self.set_search_results_message(found_occurrences_count=0, counting=True)
+            self.search_results_event = Clock.schedule_interval(
+                partial(self.add_search_results, found_search_results), 0
+            )
+            return
+
+        if not results_list.data:
+            self.dialog.content_cls.search_results_message = "No match found"
+            return
+
+        if len(results_list.data) < SEARCH_LIST_PAGE_ITEM_COUNT:
+            self.set_search_results_message(
+                found_occurrences_count=len(results_list.data)
+            )
+            return
 
-        self.dialog.content_cls.search_results_message = (
-            f"Matches on {found_occurrences_count} positions found"
-            if found_occurrences_count > 1
-            else f"Match on {found_occurrences_count} position found"
+        # the first page is shown right away, the other search results are added in the background
+        self.set_search_results_message(
+            found_occurrences_count=len(results_list.data), counting=True
+        )
+        self.search_results_event = Clock.schedule_interval(
+            partial(self.add_search_results, found_search_results), 0
         )
 
     def execute_add_section(self, *args):
@@ -672,36 +968,28 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
         return webbrowser.open(EXTERNAL_REPOSITORY_URL)
 
     def cancel_dialog(self, *args):
+        self.cancel_live_search()
+        self.cancel_search()
         self.dialog.dismiss()
         self.dialog = MDDialog()
 
     def save_current_section_to_file(self):
-        merged_current_section_text_data = None
-
         try:
             if self.model.external_update:
-                self.file.reload()
+                # the current section changes are merged together with the changes to the other sections
+                self.file.set_section_content(
+                    section_separator=self.text_section_view.section_file_separator,
+                    section_content=self.text_section_view.text,
+                )
+                self.file.merge_external_update()
                 try:
-                    current_section_text_before = self.file.get_section_content(
+                    merged_current_section_text_data = self.file.get_section_content(
                         section_separator=self.text_section_view.section_file_separator
                     )
-                # KeyError raised if the current section was removed or renamed by a external update
+                # KeyError raised if the current section without changes was removed or renamed by a external update
                 except KeyError:
-                    # merge_strings prioritizes current_section_text_after over current_section_text_before
-                    # so empty string placeholder is set to current_section_text_before
-                    current_section_text_before = ""
-                    # self.file.reload() will remove the current section separator from self.file.section_separators
-                    # in case it was deleted or renamed so the current section identifier is added back
-                    self.file.set_section_content(
-                        section_separator=self.text_section_view.section_file_separator,
-                        section_content=SECTION_FILE_NEW_SECTION_PLACEHOLDER,
-                    )
-
-                current_section_text_after = self.text_section_view.text
-
-                merged_current_section_text_data = merge_strings(
-                    before=current_section_text_before, after=current_section_text_after
-                )
+                    # the current section is kept, so the current section identifier is added back
+                    merged_current_section_text_data = self.text_section_view.text
 
                 self.text_section_view.text = merged_current_section_text_data
                 # un-focus the TextInput so that the cursor is not offset by the external update
@@ -713,13 +1001,10 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
 
             self.file.set_section_content(
                 section_separator=self.text_section_view.section_file_separator,
-                section_content=merged_current_section_text_data
-                or self.text_section_view.text,
+                section_content=self.text_section_view.text,
             )
 
-            raw_text_data = self.file.transform_data_by_sections_to_raw_data_content()
-
-            self.controller.save_file_data(data=raw_text_data)
+            self.file.save()
 
         except Exception as exc:
             self.show_error_bar(
@@ -727,9 +1012,39 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             )
             return
 
+    def compact_file(self):
+        try:
+            self.file.compact()
+        except Exception as exc:
+            self.show_error_bar(
+                error_message=f"Error while compacting file journal, the journal is kept, details: {exc}"
+            )
+
     def press_menu_item_save_file(self, *args):
         self.save_current_section_to_file()
 
+    def press_menu_item_convert_file(self, file_extension, convert):
+        """
+        save all sections to a new file of the other storage kind next to the current file
+        and open the new file
+        """
+        file_path = f"{path.splitext(self.model.file_path)[0]}{file_extension}"
+        if exists(file_path):
+            self.show_error_bar(error_message=f"File {file_path} already exists")
+            return
+
+        self.save_current_section_to_file()
+
+        try:
+            convert(file=self.file, file_path=file_path)
+        except Exception as exc:
+            self.show_error_bar(
+                error_message=f"Error while converting file, details: {exc}"
+            )
+            return
+
+        self.execute_open_file(file_path=file_path)
+
     def press_menu_item_show_file_metadata(self, *args):
         content = ShowFileMetadataDialogContent(
             show_file_metadata_label=self.model.formatted, cancel=self.cancel_dialog
@@ -759,6 +1074,9 @@ class NotesView(MDBoxLayout, MDScreen, Observer):
             search_string_placeholder=self.last_searched_string,
             search_results_message="",
             execute_search=self.execute_search,
+            execute_live_search=self.execute_live_search,
+            get_search_result_texts=self.get_search_result_texts,
+            execute_goto_search_result=self.execute_goto_search_result,
             cancel=self.cancel_dialog,
         )
 
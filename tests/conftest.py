@@ -1,5 +1,6 @@
 import json
 import os
+import shutil
 from os import getcwd
 
 import pytest
@@ -10,6 +11,8 @@ from notes_app.defaults import Defaults
 from notes_app.controller.notes_controller import NotesController
 from notes_app.model.notes_model import NotesModel
 from notes_app.file import File
+from notes_app.journal import JOURNAL_STALE_FILE_NAME_TEMPLATE, get_journal_file_path
+from notes_app.section_index import get_section_index_file_path
 from notes_app.settings import Settings
 
 TEST_OVERRIDE_DEFAULT_NOTES_FILE_NAME = "my_first_file.txt"
@@ -18,15 +21,21 @@ TEST_OVERRIDE_DEFAULT_NOTES_FILE_PATH = f"{TEST_OVERRIDE_DEFAULT_NOTES_FILE_DIR_
 TEST_OVERRIDE_DEFAULT_NOTES_FILE_CONTENT = """<section=first> Quod equidem non reprehendo
 <section=second> Quis istum dolorem timet"""
 
+SQLITE_FILE_PATH = f"{TEST_OVERRIDE_DEFAULT_NOTES_FILE_DIR_PATH}/my_first_file.sqlite"
+BUNDLE_DIR_PATH = f"{TEST_OVERRIDE_DEFAULT_NOTES_FILE_DIR_PATH}/my_first_file.notes"
+
 EMPTY_FILE_NAME = "empty.txt"
 EMPTY_FILE_PATH = f"{TEST_OVERRIDE_DEFAULT_NOTES_FILE_DIR_PATH}/{EMPTY_FILE_NAME}"
 EMPTY_FILE_CONTENT = """"""
 
 DUMP_FILES_PATH = f"{TEST_OVERRIDE_DEFAULT_NOTES_FILE_DIR_PATH}/"
 
+FULL_TEXT_INDEX_DIR_PATH = f"{TEST_OVERRIDE_DEFAULT_NOTES_FILE_DIR_PATH}/.notes_index"
+
 defaults = Defaults()
 defaults.DEFAULT_NOTES_FILE_NAME = TEST_OVERRIDE_DEFAULT_NOTES_FILE_PATH
 defaults.DEFAULT_NOTES_FILE_CONTENT = TEST_OVERRIDE_DEFAULT_NOTES_FILE_CONTENT
+defaults.DEFAULT_FULL_TEXT_INDEX_DIR_PATH = FULL_TEXT_INDEX_DIR_PATH
 
 
 def create_settings_file():
@@ -81,6 +90,31 @@ def delete_default_notes_file():
     if os.path.exists(defaults.DEFAULT_NOTES_FILE_NAME):
         os.remove(defaults.DEFAULT_NOTES_FILE_NAME)
 
+    section_index_file_path = get_section_index_file_path(
+        file_path=defaults.DEFAULT_NOTES_FILE_NAME
+    )
+    if os.path.exists(section_index_file_path):
+        os.remove(section_index_file_path)
+
+    journal_file_path = get_journal_file_path(file_path=defaults.DEFAULT_NOTES_FILE_NAME)
+    for fp in (
+        journal_file_path,
+        JOURNAL_STALE_FILE_NAME_TEMPLATE.format(journal_file_path=journal_file_path),
+    ):
+        if os.path.exists(fp):
+            os.remove(fp)
+
+
+def delete_sqlite_notes_file():
+    for fp in (SQLITE_FILE_PATH, f"{SQLITE_FILE_PATH}-wal", f"{SQLITE_FILE_PATH}-shm"):
+        if os.path.exists(fp):
+            os.remove(fp)
+
+
+def delete_bundle_notes_dir():
+    if os.path.exists(BUNDLE_DIR_PATH):
+        shutil.rmtree(BUNDLE_DIR_PATH)
+
 
 def create_default_notes_empty_file():
     with open(file=EMPTY_FILE_PATH, mode="w", encoding="utf8") as notes_file:
@@ -98,6 +132,11 @@ def delete_dump_files():
             os.remove(file)
 
 
+def delete_full_text_index_files():
+    if os.path.exists(FULL_TEXT_INDEX_DIR_PATH):
+        shutil.rmtree(FULL_TEXT_INDEX_DIR_PATH)
+
+
 @pytest.fixture(autouse=True)
 def get_default_test_files_state():
     create_settings_file()
@@ -108,8 +147,11 @@ def get_default_test_files_state():
     delete_settings_file()
     delete_model_file()
     delete_default_notes_file()
+    delete_sqlite_notes_file()
+    delete_bundle_notes_dir()
     delete_default_notes_empty_file()
     delete_dump_files()
+    delete_full_text_index_files()
 
 
 @pytest.fixture
@@ -138,6 +180,54 @@ def get_file():
     return file
 
 
+@pytest.fixture()
+def get_mmap_file(get_file, monkeypatch):
+    monkeypatch.setattr(defaults, "DEFAULT_FILE_MMAP_READ_MODE", True)
+
+    file = File(
+        file_path=defaults.DEFAULT_NOTES_FILE_NAME,
+        controller=get_file._controller,
+        defaults=defaults,
+    )
+    yield file
+    file.close()
+
+
+@pytest.fixture()
+def get_journal_file(get_file, monkeypatch):
+    monkeypatch.setattr(defaults, "DEFAULT_FILE_JOURNAL_MODE", True)
+
+    return File(
+        file_path=defaults.DEFAULT_NOTES_FILE_NAME,
+        controller=get_file._controller,
+        defaults=defaults,
+    )
+
+
+@pytest.fixture()
+def get_sqlite_file(get_file):
+    get_file._controller.import_file_data(file=get_file, file_path=SQLITE_FILE_PATH)
+
+    file = File(
+        file_path=SQLITE_FILE_PATH,
+        controller=get_file._controller,
+        defaults=defaults,
+    )
+    yield file
+    file.close()
+
+
+@pytest.fixture()
+def get_bundle_file(get_file):
+    get_file._controller.import_file_data(file=get_file, file_path=BUNDLE_DIR_PATH)
+
+    return File(
+        file_path=BUNDLE_DIR_PATH,
+        controller=get_file._controller,
+        defaults=defaults,
+    )
+
+
 @pytest.fixture(autouse=True)
 def get_settings():
     return Settings(store=JsonStore, defaults=defaults)
@@ -0,0 +1,36 @@
+import pytest
+
+from notes_app.aho_corasick import AhoCorasickAutomaton, get_aho_corasick_automaton
+
+
+@pytest.mark.parametrize(
+    "patterns, text, occurrences",
+    [
+        (
+            ("he", "she", "his", "hers"),
+            "ushers",
+            [(1, 1, 4), (0, 2, 4), (3, 2, 6)],
+        ),
+        (("aa",), "aaaa", [(0, 0, 2), (0, 1, 3), (0, 2, 4)]),
+        (
+            ("a", "ab", "bab"),
+            "xxabab",
+            [(0, 2, 3), (1, 2, 4), (0, 4, 5), (2, 3, 6), (1, 4, 6)],
+        ),
+        (("quod", "non"), "Quod equidem non reprehendo", [(1, 13, 16)]),
+        (("ticket-12", "ticket-123"), "see ticket-123.", [(0, 4, 13), (1, 4, 14)]),
+        (("[a]", "^"), "x[a]^", [(0, 1, 4), (1, 4, 5)]),
+        (("quod",), "", []),
+        ((), "quod", []),
+        (("",), "quod", []),
+    ],
+)
+def test_iter_occurrences(patterns, text, occurrences):
+    automaton = AhoCorasickAutomaton(patterns=patterns)
+    assert list(automaton.iter_occurrences(text=text)) == occurrences
+
+
+def test_get_aho_corasick_automaton():
+    automaton = get_aho_corasick_automaton(patterns=("quod", "quis"))
+    assert get_aho_corasick_automaton(patterns=("quod", "quis")) is automaton
+    assert get_aho_corasick_automaton(patterns=("quis", "quod")) is not automaton
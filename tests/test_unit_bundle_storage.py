@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+from os import getcwd, listdir
+
+import pytest
+
+from notes_app.defaults import Defaults
+from notes_app.storage.bundle_storage import (
+    BUNDLE_MANIFEST_FILE_NAME,
+    BundleStorage,
+    is_bundle,
+)
+
+defaults = Defaults()
+
+
+@pytest.fixture
+def get_bundle_storage():
+    dir_path = f"{getcwd()}/storage.notes"
+    storage = BundleStorage(
+        dir_path=dir_path,
+        section_name_regex=defaults.DEFAULT_SECTION_FILE_SEPARATOR_GROUP_SUBSTR_REGEX,
+    )
+    storage.save_sections(
+        section_separators=["<section=first> ", "<section=second> "],
+        changed_sections=[
+            ("<section=first> ", "Quod equidem non reprehendo\n"),
+            ("<section=second> ", "Quis istum dolorem timet"),
+        ],
+    )
+    yield storage
+    shutil.rmtree(dir_path, ignore_errors=True)
+
+
+def read_manifest(storage):
+    with open(
+        os.path.join(storage._dir_path, BUNDLE_MANIFEST_FILE_NAME), encoding="utf8"
+    ) as f:
+        return json.load(f)
+
+
+def test_is_bundle(get_bundle_storage):
+    assert is_bundle(dir_path=get_bundle_storage._dir_path) is True
+    assert is_bundle(dir_path=getcwd()) is False
+
+
+class TestBundleStorage:
+    def test_read_section_separators(self, get_bundle_storage):
+        assert get_bundle_storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+        assert read_manifest(storage=get_bundle_storage) == {
+            "version": 1,
+            "sections": [
+                {"section_separator": "<section=first> ", "file_name": "first.txt"},
+                {"section_separator": "<section=second> ", "file_name": "second.txt"},
+            ],
+        }
+
+    def test_read_section_content(self, get_bundle_storage):
+        assert (
+            get_bundle_storage.read_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo\n"
+        )
+
+        with pytest.raises(KeyError):
+            get_bundle_storage.read_section_content(section_separator="<section=a> ")
+
+    def test_save_sections(self, get_bundle_storage, monkeypatch):
+        manifest_mtime_ns = os.stat(
+            os.path.join(get_bundle_storage._dir_path, BUNDLE_MANIFEST_FILE_NAME)
+        ).st_mtime_ns
+
+        assert (
+            get_bundle_storage.save_sections(
+                section_separators=["<section=first> ", "<section=second> "],
+                changed_sections=[("<section=second> ", "edited")],
+            )
+            is None
+        )
+
+        assert (
+            os.stat(
+                os.path.join(get_bundle_storage._dir_path, BUNDLE_MANIFEST_FILE_NAME)
+            ).st_mtime_ns
+            == manifest_mtime_ns
+        )
+
+        get_bundle_storage.close()
+        assert (
+            get_bundle_storage.read_section_content(section_separator="<section=second> ")
+            == "edited"
+        )
+
+    def test_save_sections_rename(self, get_bundle_storage):
+        with open(
+            os.path.join(get_bundle_storage._dir_path, "a.txt"), "w", encoding="utf8"
+        ) as f:
+            f.write("not a section")
+
+        get_bundle_storage.save_sections(
+            section_separators=["<section=second> ", "<section=a> ", "<section=First> "],
+            changed_sections=[
+                ("<section=a> ", "some content"),
+                ("<section=First> ", "Quod equidem non reprehendo\n"),
+            ],
+            deleted_section_separators=["<section=first> "],
+        )
+
+        assert read_manifest(storage=get_bundle_storage)["sections"] == [
+            {"section_separator": "<section=second> ", "file_name": "second.txt"},
+            {"section_separator": "<section=a> ", "file_name": "a 2.txt"},
+            {"section_separator": "<section=First> ", "file_name": "First 2.txt"},
+        ]
+        assert sorted(listdir(get_bundle_storage._dir_path)) == [
+            "First 2.txt",
+            "a 2.txt",
+            "a.txt",
+            BUNDLE_MANIFEST_FILE_NAME,
+            "second.txt",
+        ]
+
+    def test_save_sections_other_instance(self, get_bundle_storage):
+        get_bundle_storage.read_section_separators()
+        assert get_bundle_storage.is_changed() is False
+
+        storage = BundleStorage(
+            dir_path=get_bundle_storage._dir_path,
+            section_name_regex=get_bundle_storage._section_name_regex.pattern,
+        )
+        storage.save_sections(
+            section_separators=["<section=first> ", "<section=second> ", "<section=b> "],
+            changed_sections=[("<section=b> ", "other instance")],
+        )
+
+        assert get_bundle_storage.is_changed() is True
+
+        # the section saved by another instance is not deleted when not listed
+        get_bundle_storage.save_sections(
+            section_separators=["<section=first> ", "<section=a> "],
+            changed_sections=[("<section=a> ", "some content")],
+            deleted_section_separators=["<section=second> "],
+        )
+        assert get_bundle_storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=a> ",
+            "<section=b> ",
+        ]
+        assert get_bundle_storage.is_changed() is False
+
+    def test_save_sections_error(self, get_bundle_storage):
+        def get_changed_sections():
+            yield "<section=a> ", "some content"
+            raise OSError
+
+        with pytest.raises(OSError):
+            get_bundle_storage.save_sections(
+                section_separators=["<section=a> "],
+                changed_sections=get_changed_sections(),
+            )
+
+        get_bundle_storage.close()
+        assert get_bundle_storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+
+    def test_close(self, get_bundle_storage):
+        assert get_bundle_storage.close() is None
+        assert get_bundle_storage._manifest is None
@@ -5,10 +5,22 @@ from datetime import datetime
 from os import path, remove, listdir, getcwd
 from os.path import exists
 
+from notes_app.controller import notes_controller
+from notes_app.controller.notes_controller import (
+    FSYNC_POLICY_ALWAYS,
+    FSYNC_POLICY_ON_CLOSE,
+    FSYNC_POLICY_NEVER,
+)
 from notes_app.defaults import Defaults
+from notes_app.file import File
+from notes_app.journal import get_journal_file_path
 from notes_app.model.notes_model import NotesModel
+from notes_app.storage.bundle_storage import BundleStorage
+from notes_app.storage.sqlite_storage import SQLITE_SYNCHRONOUS_NORMAL, SqliteStorage
 from notes_app.view.notes_view import NotesView
 
+SQLITE_FILE_PATH = f"{getcwd()}/my_first_file.sqlite"
+
 
 class TestController:
     def test_controller(self, get_app):
@@ -44,6 +56,33 @@ class TestController:
             is None
         )
 
+    def test_set_file_path_full_text_index(self, get_app, tmp_path):
+        controller = get_app.controller
+        full_text_index = controller.full_text_index
+        assert path.dirname(full_text_index.index_file_path) == (
+            controller.defaults.DEFAULT_FULL_TEXT_INDEX_DIR_PATH
+        )
+
+        # the notes file in another folder gets the index of that folder,
+        # the index is kept in the cache directory, not in the folder
+        file_path = tmp_path / "notes.txt"
+        file_path.write_text("<section=first> Quod", encoding="utf8")
+        controller.set_file_path(file_path=str(file_path))
+
+        assert controller.full_text_index is not full_text_index
+        assert controller.full_text_index.index_file_path != (
+            full_text_index.index_file_path
+        )
+        assert path.dirname(controller.full_text_index.index_file_path) == (
+            controller.defaults.DEFAULT_FULL_TEXT_INDEX_DIR_PATH
+        )
+        controller.full_text_index.index_file(
+            file_path=str(file_path), file_stat_key=(1, 2), sections=()
+        )
+        assert listdir(tmp_path) == ["notes.txt"]
+
+        controller.set_file_path(file_path=controller.defaults.DEFAULT_NOTES_FILE_NAME)
+
     def test_read_file_data(self, get_app):
         controller = get_app.controller
         assert (
@@ -52,6 +91,16 @@ class TestController:
 <section=second> Quis istum dolorem timet"""
         )
 
+    def test_read_file_data_mmap(self, get_app):
+        controller = get_app.controller
+        mapped_file_data = controller.read_file_data_mmap()
+        assert (
+            mapped_file_data[:]
+            == b"""<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet"""
+        )
+        mapped_file_data.close()
+
     def test_save_file_data(self, get_app):
         controller = get_app.controller
 
@@ -72,6 +121,33 @@ class TestController:
         assert controller.model.file_size > 0
         assert datetime.fromtimestamp(controller.model.last_updated_on) >= _epoch_before
 
+    def test_save_file_data_chunks(self, get_app):
+        controller = get_app.controller
+
+        assert controller.save_file_data(data=iter([])) is None
+        assert controller.model.file_size == 0
+
+        assert (
+            controller.save_file_data(
+                data=(
+                    chunk
+                    for chunk in [
+                        "<section=first> ",
+                        "Quod equidem non reprehendo\n",
+                        "<section=second> ",
+                        "Quis istum dolorem timet\n",
+                    ]
+                )
+            )
+            is None
+        )
+
+        with open(get_app.controller.defaults.DEFAULT_NOTES_FILE_NAME, mode="r", encoding="utf8") as f:
+            assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
+                                     '<section=second> Quis istum dolorem timet\n']
+
+        assert controller.model.file_size > 0
+
     def test_save_file_data_handle_error(self, get_app):
         # test case to cover scenario when data write fails no data is lost
         controller = get_app.controller
@@ -128,6 +204,190 @@ class TestController:
             assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
                                      '<section=second> Quis istum dolorem timet <section=third> !\n']
 
+    def test_save_file_data_atomic(self, get_app, monkeypatch):
+        controller = get_app.controller
+        monkeypatch.setattr(controller.defaults, "DEFAULT_FILE_ATOMIC_SAVE", True)
+
+        assert controller.model.file_size == 0
+
+        assert (
+            controller.save_file_data(
+                data="""<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet
+"""
+            )
+            is None
+        )
+
+        with open(get_app.controller.defaults.DEFAULT_NOTES_FILE_NAME, mode="r", encoding="utf8") as f:
+            assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
+                                     '<section=second> Quis istum dolorem timet\n']
+
+        assert controller.model.file_size > 0
+
+        # assert no temporary file is left next to the file
+        assert not [file for file in listdir(getcwd()) if file.endswith(".tmp")]
+
+    def test_save_file_data_atomic_handle_error(self, get_app, monkeypatch):
+        controller = get_app.controller
+        monkeypatch.setattr(controller.defaults, "DEFAULT_FILE_ATOMIC_SAVE", True)
+
+        # setting model file path as empty string is invalid enough to raise file write error exc
+        controller.model.file_path = ""
+
+        with pytest.raises(Exception):
+            controller.save_file_data(
+                data="""<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet <section=third> !
+"""
+            )
+
+        # assert the file is left untouched
+        with open(get_app.controller.defaults.DEFAULT_NOTES_FILE_NAME, mode="r", encoding="utf8") as f:
+            assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
+                                     '<section=second> Quis istum dolorem timet']
+
+        # assert neither dump file nor temporary file is written
+        assert not [
+            file
+            for file in listdir(getcwd())
+            if file.startswith("__dump__") or file.endswith(".tmp")
+        ]
+
+    @pytest.mark.parametrize(
+        "atomic_save, fsync_policy, fsync_call_count",
+        [
+            (False, FSYNC_POLICY_ALWAYS, 1),
+            (False, FSYNC_POLICY_ON_CLOSE, 0),
+            (False, FSYNC_POLICY_NEVER, 0),
+            (True, FSYNC_POLICY_ALWAYS, 2),
+            (True, FSYNC_POLICY_ON_CLOSE, 1),
+            (True, FSYNC_POLICY_NEVER, 0),
+        ],
+    )
+    def test_save_file_data_fsync_policy(
+        self, get_app, monkeypatch, atomic_save, fsync_policy, fsync_call_count
+    ):
+        controller = get_app.controller
+        monkeypatch.setattr(controller.defaults, "DEFAULT_FILE_ATOMIC_SAVE", atomic_save)
+        monkeypatch.setattr(controller.defaults, "DEFAULT_FILE_FSYNC_POLICY", fsync_policy)
+
+        fsync_calls = []
+        monkeypatch.setattr(notes_controller.os, "fsync", fsync_calls.append)
+
+        controller.save_file_data(data="<section=first> Quod equidem non reprehendo")
+
+        assert len(fsync_calls) == fsync_call_count
+
+    @pytest.mark.parametrize(
+        "fsync_policy, fsync_call_count",
+        [(FSYNC_POLICY_ALWAYS, 1), (FSYNC_POLICY_ON_CLOSE, 0), (FSYNC_POLICY_NEVER, 0)],
+    )
+    def test_save_file_journal_data_fsync_policy(
+        self, get_app, monkeypatch, fsync_policy, fsync_call_count
+    ):
+        controller = get_app.controller
+        monkeypatch.setattr(controller.defaults, "DEFAULT_FILE_FSYNC_POLICY", fsync_policy)
+
+        fsync_calls = []
+        monkeypatch.setattr(notes_controller.os, "fsync", fsync_calls.append)
+
+        controller.save_file_journal_data(data=b"first", new_journal=True)
+        remove(get_journal_file_path(file_path=controller.model.file_path))
+
+        assert len(fsync_calls) == fsync_call_count
+
+    def test_save_file_data_from_offset(self, get_app):
+        controller = get_app.controller
+
+        assert controller.model.file_size == 0
+
+        assert controller.save_file_data_from_offset(data=b"edited", offset=61) is None
+
+        with open(get_app.controller.defaults.DEFAULT_NOTES_FILE_NAME, mode="r", encoding="utf8") as f:
+            assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
+                                     '<section=second> edited']
+
+        assert controller.model.file_size > 0
+
+    def test_save_file_journal_data(self, get_app):
+        controller = get_app.controller
+        journal_file_path = get_journal_file_path(file_path=controller.model.file_path)
+
+        assert controller.model.file_size == 0
+
+        assert controller.save_file_journal_data(data=b"first", new_journal=True) is None
+        assert controller.save_file_journal_data(data=b"second") is None
+
+        with open(journal_file_path, mode="rb") as f:
+            assert f.read() == b"firstsecond"
+
+        # the journal started by another instance in the meantime is never overwritten
+        with pytest.raises(FileExistsError):
+            controller.save_file_journal_data(data=b"third", new_journal=True)
+
+        with open(journal_file_path, mode="rb") as f:
+            assert f.read() == b"firstsecond"
+
+        with open(get_app.controller.defaults.DEFAULT_NOTES_FILE_NAME, mode="r", encoding="utf8") as f:
+            assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
+                                     '<section=second> Quis istum dolorem timet']
+
+        assert controller.model.file_size > 0
+
+    def test_get_storage(self, get_app):
+        controller = get_app.controller
+
+        assert controller.get_storage() is None
+
+        storage = controller.get_storage(file_path=SQLITE_FILE_PATH)
+        assert isinstance(storage, SqliteStorage)
+        assert storage._synchronous == SQLITE_SYNCHRONOUS_NORMAL
+
+        storage = controller.get_storage(file_path=f"{getcwd()}/my_first_file.notes")
+        assert isinstance(storage, BundleStorage)
+        assert storage._fsync is True
+
+    def test_import_export_file_data(self, get_app, get_file):
+        controller = get_app.controller
+
+        assert controller.import_file_data(file=get_file, file_path=SQLITE_FILE_PATH) is None
+
+        storage = controller.get_storage(file_path=SQLITE_FILE_PATH)
+        assert storage.read_section_separators() == ["<section=first> ", "<section=second> "]
+        storage.close()
+
+        sqlite_file = File(file_path=SQLITE_FILE_PATH, controller=controller, defaults=controller.defaults)
+        export_file_path = f"{getcwd()}/exported.txt"
+
+        assert controller.export_file_data(file=sqlite_file, file_path=export_file_path) is None
+        sqlite_file.close()
+
+        with open(export_file_path, mode="r", encoding="utf8") as f:
+            assert f.readlines() == ['<section=first> Quod equidem non reprehendo\n',
+                                     '<section=second> Quis istum dolorem timet']
+        remove(export_file_path)
+
+    def test_save_storage_data(self, get_app, get_file):
+        controller = get_app.controller
+        controller.import_file_data(file=get_file, file_path=SQLITE_FILE_PATH)
+        storage = controller.get_storage(file_path=SQLITE_FILE_PATH)
+
+        assert controller.model.file_size == 0
+
+        assert controller.save_storage_data(
+            storage=storage,
+            section_separators=["<section=first> "],
+            changed_sections=[("<section=first> ", "edited")],
+            deleted_section_separators=["<section=second> "],
+        ) is None
+
+        assert storage.read_section_separators() == ["<section=first> "]
+        assert storage.read_section_content(section_separator="<section=first> ") == "edited"
+        storage.close()
+
+        assert controller.model.file_size > 0
+
     def test_get_screen(self, get_app):
         controller = get_app.controller
         assert isinstance(controller.get_screen(), NotesView)
@@ -1,14 +1,33 @@
 import pytest
 
 from notes_app.diff import (
+    MyersMatcher,
+    _get_common_prefix_length,
+    _get_common_suffix_length,
+    _get_unique_anchors,
+    _intern_tokens,
     _merge,
-    _replace_line_endings,
     _split,
     _join,
+    _tokenize,
     merge_strings,
+    merge_three_way,
 )
 
 
+def get_longest_common_subsequence_length(a, b):
+    lengths = [0] * (len(b) + 1)
+    for a_item in a:
+        previous_lengths, lengths = lengths, [0]
+        for j, b_item in enumerate(b):
+            lengths.append(
+                previous_lengths[j] + 1
+                if a_item == b_item
+                else max(previous_lengths[j + 1], lengths[j])
+            )
+    return lengths[-1]
+
+
 class TestDiff:
     @pytest.mark.parametrize(
         "left, right, result",
@@ -44,20 +63,6 @@ class TestDiff:
     def test__merge(self, left, right, result):
         assert [x for x in _merge(left.split(), right.split())] == result
 
-    def test__replace_line_endings(self):
-        assert (
-            _replace_line_endings(
-                input_text="ad \n na", line_ending="\n", line_ending_replacement="!@#"
-            )
-            == "ad !@# na"
-        )
-        assert (
-            _replace_line_endings(
-                input_text="ad na", line_ending="\n", line_ending_replacement="!@#"
-            )
-            == "ad na"
-        )
-
     @pytest.mark.parametrize(
         "input_text, result",
         [
@@ -66,6 +71,9 @@ class TestDiff:
                 ["this", " ", "is", " ", "some", " ", "section", ".", "yeah"],
             ),
             ("another text", ["another", " ", "text"],),
+            ("some \n section", ["some", " ", "\n", " ", "section"]),
+            ("a..b\nc", ["a", ".", "", ".", "b\nc"]),
+            ("", []),
         ],
     )
     def test__split(self, input_text, result):
@@ -76,6 +84,8 @@ class TestDiff:
         [
             (["this", "is", "some", "section.yeah"], "this is some section.yeah",),
             (["another", "text"], "another text",),
+            (["some", " ", "\n", " ", "section", ".", "yeah"], "some \n section.yeah"),
+            ([], ""),
         ],
     )
     def test__join(self, input_list, result):
@@ -108,3 +118,137 @@ class TestDiff:
     )
     def test_merge_strings(self, before, after, result):
         assert merge_strings(before, after) == result
+
+    @pytest.mark.parametrize(
+        "input_text, result",
+        [
+            ("this is some section.yeah", ["this", " ", "is", " ", "some", " ", "section", ".", "yeah"]),
+            ("a\n\nb", ["a", "\n", "\n", "b"]),
+            ("", []),
+        ],
+    )
+    def test__tokenize(self, input_text, result):
+        assert _tokenize(input_text) == result
+
+    @pytest.mark.parametrize(
+        "base, ours, theirs, result",
+        [
+            ("same", "same", "same", "same"),
+            ("base", "ours", "base", "ours"),
+            ("base", "base", "theirs", "theirs"),
+            ("base", "both", "both", "both"),
+            (
+                "Quod equidem non reprehendo",
+                "Quod equidem sed non reprehendo",
+                "Quod equidem non reprehendo timet",
+                "Quod equidem sed non reprehendo timet",
+            ),
+            # the text deleted on a single side is not brought back
+            (
+                "Quod equidem non reprehendo\nQuis istum dolorem timet",
+                "Quod equidem non reprehendo",
+                "Quod equidem sed non reprehendo\nQuis istum dolorem timet",
+                "Quod equidem sed non reprehendo",
+            ),
+            (
+                "first\nsecond\nthird",
+                "first\nthird",
+                "first\nsecond\nthird\nfourth",
+                "first\nthird\nfourth",
+            ),
+            # the same part changed differently keeps both the changes
+            ("a b c", "a X c", "a Y c", "a X Y c"),
+            ("a b c", "a X c", "a c", "a X c"),
+            ("", "test text", "test text mod", "test text mod"),
+        ],
+    )
+    def test_merge_three_way(self, base, ours, theirs, result):
+        assert merge_three_way(base=base, ours=ours, theirs=theirs) == result
+
+    @pytest.mark.parametrize(
+        "a, b",
+        [
+            ("", ""),
+            ("abc", ""),
+            ("", "abc"),
+            ("abc", "abc"),
+            ("abcabba", "cbabac"),
+            ("xaxbxcx", "xbxaxcx"),
+            ("quod equidem", "quis equidem non"),
+        ],
+    )
+    def test_myers_matcher(self, a, b):
+        matcher = MyersMatcher(a=a, b=b)
+        matching_blocks = matcher.get_matching_blocks()
+        assert matching_blocks[-1] == (len(a), len(b), 0)
+        for i, j, size in matching_blocks:
+            assert a[i : i + size] == b[j : j + size]
+
+        assert sum(
+            size for _, _, size in matching_blocks
+        ) == get_longest_common_subsequence_length(a=a, b=b)
+
+        merged = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                assert a[i1:i2] == b[j1:j2]
+            merged.append(b[j1:j2])
+        assert "".join(merged) == b
+
+    def test_myers_matcher_max_cost(self, monkeypatch):
+        monkeypatch.setattr("notes_app.diff.MYERS_MAX_COST", 1)
+        a, b = "xaxbxcxdx", "yaybycydy"
+        opcodes = MyersMatcher(a=a, b=b).get_opcodes()
+        assert "".join(b[j1:j2] for _, _, _, j1, j2 in opcodes) == b
+        assert all(
+            a[i1:i2] == b[j1:j2] for tag, i1, i2, j1, j2 in opcodes if tag == "equal"
+        )
+
+    def test_myers_matcher_unique_anchors(self):
+        a = ["some", " ", "\n", " ", "section", " ", "text"]
+        b = ["this", " ", "is", " ", "some", " ", "section", ".", "yeah"]
+        assert _get_unique_anchors(a=a, b=b) == [(0, 4), (4, 6)]
+        assert MyersMatcher(a=a, b=b).get_matching_blocks() == [
+            (0, 4, 2),
+            (4, 6, 1),
+            (7, 9, 0),
+        ]
+
+    @pytest.mark.parametrize(
+        "a, b, prefix_length, suffix_length",
+        [
+            ("", "", 0, 0),
+            ("abc", "abc", 3, 0),
+            ("abc", "xbc", 0, 2),
+            ("abcd", "abxd", 2, 1),
+            ("ab" * 100 + "x" + "cd" * 100, "ab" * 100 + "cd" * 100, 200, 200),
+            ("aaa", "aaaa", 3, 0),
+        ],
+    )
+    def test__get_common_prefix_and_suffix_length(
+        self, a, b, prefix_length, suffix_length
+    ):
+        assert _get_common_prefix_length(a=a, b=b) == prefix_length
+        assert (
+            _get_common_suffix_length(
+                a=a, b=b, max_length=min(len(a), len(b)) - prefix_length
+            )
+            == suffix_length
+        )
+
+    def test__intern_tokens(self):
+        a_ids, b_ids = _intern_tokens(
+            a=["some", " ", "section"], b=["section", " ", "text"]
+        )
+        assert a_ids.typecode == b_ids.typecode == "i"
+        assert list(a_ids) == [0, 1, 2]
+        assert list(b_ids) == [2, 1, 3]
+
+    def test_myers_matcher_common_ends(self):
+        a = ["quod", " ", "equidem", " ", "non", " ", "reprehendo"]
+        b = ["quod", " ", "equidem", " ", "sed", " ", "non", " ", "reprehendo"]
+        assert MyersMatcher(a=a, b=b).get_matching_blocks() == [
+            (0, 0, 4),
+            (4, 6, 3),
+            (7, 9, 0),
+        ]
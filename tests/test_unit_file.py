@@ -1,13 +1,19 @@
 import uuid
+from os import path, stat
 
 import pytest
 
 from notes_app.defaults import Defaults
 from notes_app.file import (
+    File,
     get_validated_file_path,
+    decode_raw_data,
     transform_section_separator_to_section_name,
     transform_section_name_to_section_separator,
 )
+from notes_app.full_text_index import get_file_stat_key, get_full_text_index_query
+from notes_app.journal import get_journal_file_path
+from notes_app.section_index import get_section_content_hash, read_section_index
 
 defaults = Defaults()
 
@@ -20,6 +26,18 @@ def test_get_validated_file_path():
     assert get_validated_file_path(file_path=file_path) is None
 
 
+@pytest.mark.parametrize(
+    "raw_data, result",
+    [
+        (b"Quod equidem", "Quod equidem"),
+        (b"Quod\r\nequidem\rnon\n", "Quod\nequidem\nnon\n"),
+        ("\u010de\u0161tina".encode("utf8"), "\u010de\u0161tina"),
+    ],
+)
+def test_decode_raw_data(raw_data, result):
+    assert decode_raw_data(raw_data=raw_data) == result
+
+
 def test_transform_section_separator_to_section_name(get_file):
     assert (
         transform_section_separator_to_section_name(
@@ -52,14 +70,122 @@ class TestFile:
             section_separator="<section=third>", section_content="test"
         )
         assert get_file._data_by_sections == {
-            "<section=first> ": "Quod equidem non reprehendo\n",
-            "<section=second> ": "Quis istum dolorem timet",
+            "<section=first> ": None,
+            "<section=second> ": None,
             "<section=third>": "test",
         }
         get_file.reload()
         assert get_file._data_by_sections == {
-            "<section=first> ": "Quod equidem non reprehendo\n",
-            "<section=second> ": "Quis istum dolorem timet",
+            "<section=first> ": None,
+            "<section=second> ": None,
+        }
+        assert (
+            get_file.get_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo\n"
+        )
+
+    def test_merge_external_update(self, get_file):
+        get_file.set_section_content(
+            section_separator="<section=first> ",
+            section_content="Quod equidem non reprehendo sed\n",
+        )
+        get_file.set_section_content(
+            section_separator="<section=third> ", section_content="local"
+        )
+
+        with open(get_file._file_path, mode="w", encoding="utf8") as f:
+            f.write(
+                "<section=first> Quod equidem non reprehendo\n"
+                "<section=second> Quis istum dolorem timet now"
+                "<section=fourth> external"
+            )
+
+        get_file.merge_external_update()
+
+        # the sections changed only externally are not read, nor merged
+        assert get_file._data_by_sections == {
+            "<section=first> ": "Quod equidem non reprehendo sed\n",
+            "<section=second> ": None,
+            "<section=fourth> ": None,
+            "<section=third> ": "local",
+        }
+        assert get_file.is_dirty
+        get_file.save()
+        assert (
+            get_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo sed
+<section=second> Quis istum dolorem timet now<section=fourth> external<section=third> local"""
+        )
+
+    def test_merge_external_update_changed_on_both_sides(self, get_file):
+        get_file.set_section_content(
+            section_separator="<section=first> ",
+            section_content="Quod non reprehendo\n",
+        )
+        get_file.set_section_content(
+            section_separator="<section=third> ", section_content="local"
+        )
+
+        with open(get_file._file_path, mode="w", encoding="utf8") as f:
+            f.write(
+                "<section=first> Quod equidem non reprehendo sed\n"
+                "<section=second> Quis istum dolorem timet"
+                "<section=third> external"
+            )
+
+        get_file.merge_external_update()
+
+        assert get_file.section_separators == [
+            "<section=first> ",
+            "<section=second> ",
+            "<section=third> ",
+        ]
+        assert (
+            get_file.get_section_content(section_separator="<section=first> ")
+            == "Quod non reprehendo sed\n"
+        )
+        assert (
+            get_file.get_section_content(section_separator="<section=third> ")
+            == "local external"
+        )
+
+    def test_merge_external_update_deleted_sections(self, get_file):
+        get_file.delete_section_content(section_separator="<section=first> ")
+        get_file.delete_section_content(section_separator="<section=second> ")
+        get_file.set_section_content(
+            section_separator="<section=third> ", section_content="local"
+        )
+
+        with open(get_file._file_path, mode="w", encoding="utf8") as f:
+            f.write(
+                "<section=first> Quod equidem non reprehendo sed\n"
+                "<section=second> Quis istum dolorem timet"
+            )
+
+        get_file.merge_external_update()
+
+        # a section deleted locally is kept only when changed externally
+        assert get_file.section_separators == ["<section=first> ", "<section=third> "]
+        assert (
+            get_file.get_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo sed\n"
+        )
+
+        # a section changed locally is kept when deleted externally
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="Quod"
+        )
+        get_file.save()
+        with open(get_file._file_path, mode="w", encoding="utf8") as f:
+            f.write("<section=third> local")
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="Quod equidem"
+        )
+        get_file.merge_external_update()
+        assert get_file._data_by_sections == {
+            "<section=third> ": None,
+            "<section=first> ": "Quod equidem",
         }
 
     def test_get_raw_data_content(self, get_file):
@@ -130,13 +256,887 @@ class TestFile:
 
     def test__transform_raw_data_content_to_data_by_sections(self, get_file):
         assert get_file._transform_raw_data_content_to_data_by_sections() == {
-            "<section=first> ": "Quod equidem non reprehendo\n",
-            "<section=second> ": "Quis istum dolorem timet",
+            "<section=first> ": (16, 44),
+            "<section=second> ": (61, 85),
         }
 
+    def test_iter_raw_data_content_chunks(self, get_file):
+        assert list(get_file.iter_raw_data_content_chunks()) == [
+            "<section=first> ",
+            "Quod equidem non reprehendo\n",
+            "<section=second> ",
+            "Quis istum dolorem timet",
+        ]
+
     def test_transform_data_by_sections_to_raw_data_content(self, get_file):
         assert (
             get_file.transform_data_by_sections_to_raw_data_content()
             == """<section=first> Quod equidem non reprehendo
 <section=second> Quis istum dolorem timet"""
         )
+
+    def test_save(self, get_file):
+        get_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+
+        assert get_file.save() is None
+        assert (
+            get_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet<section=a> some content"""
+        )
+
+    def test_save_atomic(self, get_file, monkeypatch):
+        monkeypatch.setattr(get_file.defaults, "DEFAULT_FILE_ATOMIC_SAVE", True)
+
+        get_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+
+        assert get_file.save() is None
+        assert (
+            get_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet<section=a> some content"""
+        )
+
+    def test_is_dirty(self, get_file):
+        assert get_file.is_dirty is False
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="edited"
+        )
+        assert get_file.is_dirty is True
+
+        get_file.set_section_content(
+            section_separator="<section=first> ",
+            section_content="Quod equidem non reprehendo\n",
+        )
+        assert get_file.is_dirty is False
+        assert (
+            get_file._data_by_sections["<section=first> "]
+            is get_file._saved_data_by_sections["<section=first> "]
+        )
+
+        get_file.delete_section_content(section_separator="<section=second> ")
+        assert get_file.is_dirty is True
+
+        get_file.reload()
+        assert get_file.is_dirty is False
+
+    def test_version(self, get_file):
+        version = get_file.version
+
+        get_file.get_section_content(section_separator="<section=first> ")
+        assert get_file.version == version
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="edited"
+        )
+        assert get_file.version > version
+        version = get_file.version
+
+        get_file.reload()
+        assert get_file.version > version
+
+    def test_save_full_text_index(self, get_file):
+        full_text_index = get_file._controller.full_text_index
+        file_path = path.abspath(get_file._file_path)
+
+        def get_candidate_sections(pattern):
+            return full_text_index.get_candidate_sections(
+                query=get_full_text_index_query(patterns=[pattern]),
+                folder_path=path.dirname(file_path),
+            ).get(file_path)
+
+        # a file not indexed yet is left to get indexed when searched
+        get_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+        assert get_file.save() is None
+        assert full_text_index.get_file_stat_key(file_path=file_path) is None
+
+        full_text_index.index_file(
+            file_path=file_path,
+            file_stat_key=get_file_stat_key(file_path=file_path),
+            sections=(
+                (
+                    section_separator,
+                    get_file.get_section_content(section_separator=section_separator),
+                )
+                for section_separator in get_file.section_separators
+            ),
+        )
+        assert get_candidate_sections("some content") == {"<section=a> "}
+
+        get_file.set_section_content(
+            section_separator="<section=second> ", section_content="other content"
+        )
+        get_file.delete_section_content(section_separator="<section=a> ")
+        assert get_file.save() is None
+
+        assert full_text_index.get_file_stat_key(
+            file_path=file_path
+        ) == get_file_stat_key(file_path=file_path)
+        assert get_candidate_sections("some content") is None
+        assert get_candidate_sections("other content") == {"<section=second> "}
+        assert get_candidate_sections("equidem") == {"<section=first> "}
+
+    def test_save_not_dirty(self, get_file, monkeypatch):
+        def save_file_data(*args, **kwargs):
+            raise AssertionError("no save expected")
+
+        monkeypatch.setattr(get_file._controller, "save_file_data", save_file_data)
+
+        get_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem timet",
+        )
+
+        assert get_file.save() is None
+
+    def test_save_failed(self, get_file, monkeypatch):
+        def save_file_data(*args, **kwargs):
+            raise OSError
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="edited"
+        )
+
+        with monkeypatch.context() as m:
+            m.setattr(get_file._controller, "save_file_data", save_file_data)
+            with pytest.raises(OSError):
+                get_file.save()
+
+        get_file.set_section_content(
+            section_separator="<section=first> ",
+            section_content="Quod equidem non reprehendo\n",
+        )
+        assert get_file.is_dirty is True
+
+
+class TestMmapFile:
+    def test_section_separators_sorted(self, get_mmap_file):
+        assert get_mmap_file.section_separators_sorted == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+
+    def test_section_index(self, get_mmap_file, monkeypatch):
+        assert get_mmap_file._section_hashes == {
+            "<section=first> ": get_section_content_hash(
+                section_content_data=b"Quod equidem non reprehendo\n"
+            ),
+            "<section=second> ": get_section_content_hash(
+                section_content_data=b"Quis istum dolorem timet"
+            ),
+        }
+
+        def _transform_raw_data_content_to_data_by_sections(*args):
+            raise AssertionError("file scanned despite valid section index")
+
+        monkeypatch.setattr(
+            File,
+            "_transform_raw_data_content_to_data_by_sections",
+            _transform_raw_data_content_to_data_by_sections,
+        )
+
+        get_mmap_file.reload()
+
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 44),
+            "<section=second> ": (61, 85),
+        }
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=second> ")
+            == "Quis istum dolorem timet"
+        )
+
+    def test_section_index_after_save(self, get_mmap_file):
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        get_mmap_file.save()
+
+        assert read_section_index(
+            file_path=get_mmap_file._file_path,
+            file_stat=stat(get_mmap_file._file_path),
+        ) == (
+            {"<section=first> ": (16, 44), "<section=second> ": (61, 67)},
+            {
+                "<section=first> ": get_section_content_hash(
+                    section_content_data=b"Quod equidem non reprehendo\n"
+                ),
+                "<section=second> ": get_section_content_hash(
+                    section_content_data=b"edited"
+                ),
+            },
+        )
+
+    def test_get_section_content(self, get_mmap_file):
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo\n"
+        )
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=second> ")
+            == "Quis istum dolorem timet"
+        )
+
+    def test_get_section_content_file_changed(self, get_mmap_file):
+        # the file truncated in place under the mapping by another instance
+        with open(file=get_mmap_file._file_path, mode="w", encoding="utf8") as file:
+            file.write("<section=first> Quod\n<section=a> b")
+
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=first> ")
+            == "Quod\n"
+        )
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=second> ")
+            == ""
+        )
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 21),
+            "<section=a> ": (33, 34),
+        }
+
+    def test_get_saved_section_content_file_changed(self, get_mmap_file):
+        get_mmap_file.get_section_content(section_separator="<section=first> ")
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+
+        with open(file=get_mmap_file._file_path, mode="w", encoding="utf8") as file:
+            file.write("<section=first> Quod\n<section=second> b")
+
+        # the sections read or changed keep their content as read before the change
+        assert (
+            get_mmap_file.get_saved_section_content(
+                section_separator="<section=first> "
+            )
+            == "Quod equidem non reprehendo\n"
+        )
+        assert (
+            get_mmap_file.get_saved_section_content(
+                section_separator="<section=second> "
+            )
+            == "Quis istum dolorem timet"
+        )
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo\n"
+        )
+
+    def test_merge_external_update(self, get_mmap_file):
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+
+        # the file edited in place by another instance between the load and the merge,
+        # the offsets of the sections stay the same
+        with open(file=get_mmap_file._file_path, mode="w", encoding="utf8") as file:
+            file.write(
+                "<section=first> Quod equidem non reprehendo\n"
+                "<section=second> Quid istum dolorem timet"
+            )
+
+        get_mmap_file.merge_external_update()
+
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=second> ")
+            == "Quid istum dolorem non timet"
+        )
+
+    def test_save_file_changed(self, get_mmap_file):
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+
+        with open(file=get_mmap_file._file_path, mode="w", encoding="utf8") as file:
+            file.write("<section=first> Quod\n<section=second> b")
+
+        assert get_mmap_file.save() is None
+
+        assert (
+            get_mmap_file.get_raw_data_content()
+            == """<section=first> Quod
+<section=second> edited"""
+        )
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 21),
+            "<section=second> ": (38, 44),
+        }
+
+    def test__transform_raw_data_content_to_data_by_sections(self, get_mmap_file):
+        assert get_mmap_file._transform_raw_data_content_to_data_by_sections() == {
+            "<section=first> ": (16, 44),
+            "<section=second> ": (61, 85),
+        }
+
+    def test__get_first_changed_section_index(self, get_mmap_file):
+        assert get_mmap_file._get_first_changed_section_index() == 2
+
+        get_mmap_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+        assert get_mmap_file._get_first_changed_section_index() == 2
+
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        assert get_mmap_file._get_first_changed_section_index() == 1
+
+        get_mmap_file.delete_section_content(section_separator="<section=first> ")
+        assert get_mmap_file._get_first_changed_section_index() == 0
+
+    def test_save_append_section(self, get_mmap_file):
+        get_mmap_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+
+        assert get_mmap_file.save() is None
+
+        assert (
+            get_mmap_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet<section=a> some content"""
+        )
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 44),
+            "<section=second> ": (61, 85),
+            "<section=a> ": (97, 109),
+        }
+
+    def test_save_delete_last_section(self, get_mmap_file):
+        get_mmap_file.delete_section_content(section_separator="<section=second> ")
+
+        assert get_mmap_file.save() is None
+
+        assert (
+            get_mmap_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+"""
+        )
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 44),
+        }
+
+    def test_save_atomic(self, get_mmap_file, monkeypatch):
+        monkeypatch.setattr(get_mmap_file.defaults, "DEFAULT_FILE_ATOMIC_SAVE", True)
+
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+
+        assert get_mmap_file.save() is None
+
+        assert (
+            get_mmap_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> edited"""
+        )
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 44),
+            "<section=second> ": (61, 67),
+        }
+
+    def test_save(self, get_mmap_file):
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        get_mmap_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+
+        assert get_mmap_file.save() is None
+
+        assert (
+            get_mmap_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> edited<section=a> some content"""
+        )
+        assert get_mmap_file._data_by_sections == {
+            "<section=first> ": None,
+            "<section=second> ": "edited",
+            "<section=a> ": "some content",
+        }
+        assert get_mmap_file._saved_data_by_sections == get_mmap_file._data_by_sections
+        assert get_mmap_file._section_offsets == {
+            "<section=first> ": (16, 44),
+            "<section=second> ": (61, 67),
+            "<section=a> ": (79, 91),
+        }
+        assert (
+            get_mmap_file.get_section_content(section_separator="<section=a> ")
+            == "some content"
+        )
+
+    def test_is_dirty(self, get_mmap_file):
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        assert get_mmap_file.is_dirty is True
+
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem timet",
+        )
+        assert get_mmap_file.is_dirty is False
+        assert (
+            get_mmap_file._data_by_sections["<section=second> "]
+            is get_mmap_file._saved_data_by_sections["<section=second> "]
+        )
+
+    def test_save_not_dirty(self, get_mmap_file, monkeypatch):
+        def save_file_data_from_offset(*args, **kwargs):
+            raise AssertionError("no save expected")
+
+        monkeypatch.setattr(
+            get_mmap_file._controller,
+            "save_file_data_from_offset",
+            save_file_data_from_offset,
+        )
+
+        get_mmap_file.set_section_content(
+            section_separator="<section=first> ",
+            section_content="Quod equidem non reprehendo\n",
+        )
+
+        assert get_mmap_file.save() is None
+
+    def test_save_failed(self, get_mmap_file, monkeypatch):
+        def save_file_data_from_offset(*args, **kwargs):
+            raise OSError
+
+        get_mmap_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+
+        with monkeypatch.context() as m:
+            m.setattr(
+                get_mmap_file._controller,
+                "save_file_data_from_offset",
+                save_file_data_from_offset,
+            )
+            with pytest.raises(OSError):
+                get_mmap_file.save()
+
+        assert get_mmap_file._saved_data_by_sections == {"<section=first> ": None}
+
+        assert get_mmap_file.save() is None
+        assert (
+            get_mmap_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> edited"""
+        )
+        assert get_mmap_file.is_dirty is False
+
+
+class TestJournalFile:
+    def test_save(self, get_journal_file):
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+
+        assert get_journal_file.save() is None
+
+        assert (
+            get_journal_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet"""
+        )
+        assert get_journal_file._journal_size == path.getsize(
+            get_journal_file_path(file_path=get_journal_file._file_path)
+        )
+        assert get_journal_file.is_dirty is False
+
+    def test_save_replay(self, get_journal_file):
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+        get_journal_file.save()
+
+        get_journal_file.delete_section_content(section_separator="<section=first> ")
+        get_journal_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+        get_journal_file.save()
+
+        journal_file = File(
+            file_path=get_journal_file._file_path,
+            controller=get_journal_file._controller,
+            defaults=get_journal_file.defaults,
+        )
+
+        assert journal_file.section_separators_sorted == [
+            "<section=a> ",
+            "<section=second> ",
+        ]
+        assert (
+            journal_file.transform_data_by_sections_to_raw_data_content()
+            == "<section=second> Quis istum dolorem non timet<section=a> some content"
+        )
+        assert journal_file.is_dirty is False
+
+    def test_save_two_instances(self, get_journal_file):
+        journal_file = File(
+            file_path=get_journal_file._file_path,
+            controller=get_journal_file._controller,
+            defaults=get_journal_file.defaults,
+        )
+
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+        get_journal_file.save()
+
+        # the other instance appends its changes after merging in the changes appended meanwhile
+        journal_file.set_section_content(
+            section_separator="<section=first> ", section_content="Quod equidem\n"
+        )
+        journal_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem timet now",
+        )
+        journal_file.save()
+
+        get_journal_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+        get_journal_file.save()
+
+        assert (
+            get_journal_file.transform_data_by_sections_to_raw_data_content()
+            == "<section=first> Quod equidem\n"
+            "<section=second> Quis istum dolorem non timet now"
+            "<section=a> some content"
+        )
+
+        journal_file.reload()
+        assert (
+            journal_file.transform_data_by_sections_to_raw_data_content()
+            == "<section=first> Quod equidem\n"
+            "<section=second> Quis istum dolorem non timet now"
+            "<section=a> some content"
+        )
+
+    def test_save_torn_record(self, get_journal_file):
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+        get_journal_file.save()
+
+        # a record left torn by a failed append gets cut off before the next append
+        with open(
+            get_journal_file_path(file_path=get_journal_file._file_path), mode="ab"
+        ) as f:
+            f.write(b"torn")
+
+        get_journal_file.set_section_content(
+            section_separator="<section=a> ", section_content="some content"
+        )
+        get_journal_file.save()
+
+        get_journal_file.reload()
+        assert (
+            get_journal_file.transform_data_by_sections_to_raw_data_content()
+            == "<section=first> Quod equidem non reprehendo\n"
+            "<section=second> Quis istum dolorem non timet"
+            "<section=a> some content"
+        )
+
+    def test_save_replay_moved_section(self, get_journal_file):
+        get_journal_file.rename_section(
+            old_section_separator="<section=first> ",
+            new_section_separator="<section=a> ",
+        )
+        get_journal_file.rename_section(
+            old_section_separator="<section=a> ",
+            new_section_separator="<section=first> ",
+        )
+        get_journal_file.save()
+
+        get_journal_file.reload()
+
+        assert (
+            get_journal_file.transform_data_by_sections_to_raw_data_content()
+            == """<section=second> Quis istum dolorem timet<section=first> Quod equidem non reprehendo
+"""
+        )
+
+    def test_compact(self, get_journal_file):
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        get_journal_file.save()
+
+        assert get_journal_file.compact() is None
+
+        assert (
+            get_journal_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> edited"""
+        )
+        assert get_journal_file._journal_size == 0
+        assert not path.exists(
+            get_journal_file_path(file_path=get_journal_file._file_path)
+        )
+
+    def test_compact_journal_size(self, get_journal_file, monkeypatch):
+        monkeypatch.setattr(
+            get_journal_file.defaults, "DEFAULT_FILE_JOURNAL_COMPACTION_SIZE", 0
+        )
+
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        get_journal_file.save()
+
+        assert (
+            get_journal_file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> edited"""
+        )
+        assert get_journal_file._journal_size == 0
+
+    def test_replay_not_journal_mode(self, get_journal_file, monkeypatch):
+        get_journal_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        get_journal_file.save()
+
+        monkeypatch.setattr(get_journal_file.defaults, "DEFAULT_FILE_JOURNAL_MODE", False)
+        file = File(
+            file_path=get_journal_file._file_path,
+            controller=get_journal_file._controller,
+            defaults=get_journal_file.defaults,
+        )
+
+        assert file.get_section_content(section_separator="<section=second> ") == "edited"
+        assert file.is_dirty is True
+
+        file.save()
+
+        assert (
+            file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo
+<section=second> edited"""
+        )
+        assert not path.exists(get_journal_file_path(file_path=file._file_path))
+
+    def test_compact_mmap(self, get_journal_file, monkeypatch):
+        monkeypatch.setattr(
+            get_journal_file.defaults, "DEFAULT_FILE_MMAP_READ_MODE", True
+        )
+        file = File(
+            file_path=get_journal_file._file_path,
+            controller=get_journal_file._controller,
+            defaults=get_journal_file.defaults,
+        )
+
+        file.set_section_content(
+            section_separator="<section=first> ", section_content="edited\n"
+        )
+        file.save()
+        file.compact()
+
+        assert (
+            file.get_raw_data_content()
+            == """<section=first> edited
+<section=second> Quis istum dolorem timet"""
+        )
+        assert file.get_section_content(section_separator="<section=first> ") == "edited\n"
+        file.close()
+
+
+class TestSqliteFile:
+    def test_section_separators(self, get_sqlite_file):
+        assert get_sqlite_file.section_separators == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+
+    def test_get_section_content(self, get_sqlite_file):
+        assert (
+            get_sqlite_file.get_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo\n"
+        )
+
+    def test_merge_external_update(self, get_sqlite_file):
+        get_sqlite_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+
+        # another instance saving the same section between the load and the merge
+        file = File(
+            file_path=get_sqlite_file._file_path,
+            controller=get_sqlite_file._controller,
+            defaults=get_sqlite_file.defaults,
+        )
+        file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem timet now",
+        )
+        file.save()
+        file.close()
+
+        get_sqlite_file.merge_external_update()
+
+        assert (
+            get_sqlite_file.get_section_content(section_separator="<section=second> ")
+            == "Quis istum dolorem non timet now"
+        )
+
+    def test_save_two_instances(self, get_sqlite_file):
+        sqlite_file = File(
+            file_path=get_sqlite_file._file_path,
+            controller=get_sqlite_file._controller,
+            defaults=get_sqlite_file.defaults,
+        )
+        sqlite_file.set_section_content(
+            section_separator="<section=new> ", section_content="other instance"
+        )
+        sqlite_file.save()
+
+        # the section saved by the other instance is merged in, not deleted
+        get_sqlite_file.set_section_content(
+            section_separator="<section=first> ", section_content="edited\n"
+        )
+        get_sqlite_file.save()
+
+        sqlite_file.reload()
+        assert (
+            sqlite_file.transform_data_by_sections_to_raw_data_content()
+            == "<section=first> edited\n"
+            "<section=second> Quis istum dolorem timet"
+            "<section=new> other instance"
+        )
+        sqlite_file.close()
+
+    def test_empty_storage(self, get_sqlite_file):
+        get_sqlite_file._storage.save_sections(
+            section_separators=[],
+            changed_sections=[],
+            deleted_section_separators=get_sqlite_file.section_separators,
+        )
+
+        with pytest.raises(ValueError):
+            get_sqlite_file.reload()
+
+    def test_save(self, get_sqlite_file, monkeypatch):
+        get_sqlite_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+        get_sqlite_file.rename_section(
+            old_section_separator="<section=first> ",
+            new_section_separator="<section=a> ",
+        )
+
+        saved_sections = []
+        save_sections = get_sqlite_file._storage.save_sections
+
+        def save_sections_spy(
+            section_separators, changed_sections, deleted_section_separators
+        ):
+            changed_sections = list(changed_sections)
+            saved_sections.append(changed_sections)
+            save_sections(
+                section_separators=section_separators,
+                changed_sections=changed_sections,
+                deleted_section_separators=deleted_section_separators,
+            )
+
+        monkeypatch.setattr(get_sqlite_file._storage, "save_sections", save_sections_spy)
+
+        assert get_sqlite_file.save() is None
+        assert get_sqlite_file.save() is None
+
+        assert saved_sections == [
+            [
+                ("<section=second> ", "edited"),
+                ("<section=a> ", "Quod equidem non reprehendo\n"),
+            ]
+        ]
+
+        get_sqlite_file.reload()
+
+        assert (
+            get_sqlite_file.transform_data_by_sections_to_raw_data_content()
+            == """<section=second> edited<section=a> Quod equidem non reprehendo
+"""
+        )
+        assert get_sqlite_file.is_dirty is False
+
+
+class TestBundleFile:
+    def test_get_validated_file_path(self, get_bundle_file):
+        assert (
+            get_validated_file_path(file_path=get_bundle_file._file_path)
+            == get_bundle_file._file_path
+        )
+
+    def test_get_section_content(self, get_bundle_file):
+        assert get_bundle_file.section_separators == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+        assert (
+            get_bundle_file.get_section_content(section_separator="<section=second> ")
+            == "Quis istum dolorem timet"
+        )
+
+    def test_save(self, get_bundle_file):
+        first_section_file_path = path.join(get_bundle_file._file_path, "first.txt")
+        first_section_mtime_ns = stat(first_section_file_path).st_mtime_ns
+
+        get_bundle_file.set_section_content(
+            section_separator="<section=second> ", section_content="edited"
+        )
+
+        assert get_bundle_file.save() is None
+
+        assert stat(first_section_file_path).st_mtime_ns == first_section_mtime_ns
+        with open(
+            path.join(get_bundle_file._file_path, "second.txt"), encoding="utf8"
+        ) as f:
+            assert f.read() == "edited"
+
+    def test_merge_external_update(self, get_bundle_file):
+        get_bundle_file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem non timet",
+        )
+
+        # the section file changed externally between the load and the merge
+        with open(
+            path.join(get_bundle_file._file_path, "second.txt"), "w", encoding="utf8"
+        ) as f:
+            f.write("Quis istum dolorem timet now")
+
+        get_bundle_file.merge_external_update()
+
+        assert (
+            get_bundle_file.get_section_content(section_separator="<section=second> ")
+            == "Quis istum dolorem non timet now"
+        )
+
+    def test_reload_external_update(self, get_bundle_file):
+        with open(
+            path.join(get_bundle_file._file_path, "second.txt"), "w", encoding="utf8"
+        ) as f:
+            f.write("updated externally")
+
+        get_bundle_file.reload()
+
+        assert (
+            get_bundle_file.get_section_content(section_separator="<section=second> ")
+            == "updated externally"
+        )
@@ -0,0 +1,264 @@
+import os
+import re
+import sqlite3
+
+import pytest
+
+from notes_app.defaults import Defaults
+from notes_app.folder_search import (
+    FolderSearch,
+    FolderSearchHit,
+    iter_notes_file_paths,
+)
+from notes_app.journal import get_journal_file_path
+from notes_app.search import Search
+from notes_app.storage.sqlite_storage import SqliteStorage
+
+defaults = Defaults()
+
+FIRST_FILE_CONTENT = """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet"""
+SECOND_FILE_CONTENT = """<section=third> Quod quis dolorem"""
+
+
+def write_file(file_path, content):
+    with open(file_path, mode="w", encoding="utf8") as f:
+        f.write(content)
+
+
+@pytest.fixture()
+def get_folder(tmp_path):
+    write_file(tmp_path / "first.txt", FIRST_FILE_CONTENT)
+    (tmp_path / "sub").mkdir()
+    write_file(tmp_path / "sub" / "second.txt", SECOND_FILE_CONTENT)
+    write_file(tmp_path / ".hidden.txt", FIRST_FILE_CONTENT)
+    write_file(tmp_path / "other.md", FIRST_FILE_CONTENT)
+    write_file(tmp_path / "no_section.txt", "Quod")
+    return tmp_path
+
+
+@pytest.fixture()
+def get_folder_search(get_file):
+    folder_search = FolderSearch(controller=get_file._controller, defaults=defaults)
+    yield folder_search
+    folder_search.close()
+
+
+def get_hits(folder_search, pattern, folder_path, search=None):
+    return list(
+        folder_search.iter_found_hits(
+            pattern=pattern,
+            folder_path=folder_path,
+            search=search or Search(defaults=defaults),
+        )
+    )
+
+
+def test_iter_notes_file_paths(get_folder):
+    assert list(iter_notes_file_paths(folder_path=str(get_folder))) == [
+        str(get_folder / "first.txt"),
+        str(get_folder / "no_section.txt"),
+        str(get_folder / "sub" / "second.txt"),
+    ]
+
+
+def test_iter_found_hits(get_folder, get_folder_search):
+    hits = get_hits(get_folder_search, pattern="dolorem", folder_path=get_folder)
+
+    assert sorted(hits) == [
+        FolderSearchHit(
+            file_path=str(get_folder / "first.txt"),
+            section_separator="<section=second> ",
+            start=11,
+            end=18,
+            context="dolorem timet",
+        ),
+        FolderSearchHit(
+            file_path=str(get_folder / "sub" / "second.txt"),
+            section_separator="<section=third> ",
+            start=10,
+            end=17,
+            context="dolorem",
+        ),
+    ]
+
+    assert get_hits(get_folder_search, pattern="nothing", folder_path=get_folder) == []
+
+
+def test_iter_found_hits_search_options(get_folder, get_folder_search):
+    search = Search(defaults=defaults)
+    search.search_case_sensitive = True
+    hits = get_hits(get_folder_search, "Quis", folder_path=get_folder, search=search)
+    assert [hit.file_path for hit in hits] == [str(get_folder / "first.txt")]
+
+    search.search_regex = True
+    with pytest.raises(re.error):
+        get_folder_search.iter_found_hits(
+            pattern="(", folder_path=get_folder, search=search
+        )
+
+
+def test_iter_found_hits_unchanged_files(get_folder, get_folder_search, monkeypatch):
+    hits = get_hits(get_folder_search, pattern="quod", folder_path=get_folder)
+    assert len(hits) == 2
+
+    import notes_app.folder_search
+
+    read_file_paths = []
+
+    class _File(notes_app.folder_search.File):
+        def __init__(self, file_path, **kwargs):
+            read_file_paths.append(file_path)
+            super().__init__(file_path=file_path, **kwargs)
+
+    monkeypatch.setattr(notes_app.folder_search, "File", _File)
+
+    # the hits of the same search are reused
+    assert sorted(
+        get_hits(get_folder_search, pattern="quod", folder_path=get_folder)
+    ) == sorted(hits)
+    assert read_file_paths == []
+
+    # the full text index rules the pattern out of the unchanged files
+    assert get_hits(get_folder_search, pattern="timet", folder_path=get_folder) != []
+    assert read_file_paths == [str(get_folder / "first.txt")]
+
+    # a changed file is read again
+    read_file_paths.clear()
+    write_file(get_folder / "sub" / "second.txt", SECOND_FILE_CONTENT + " timet now")
+    hits = get_hits(get_folder_search, pattern="timet", folder_path=get_folder)
+    assert len(hits) == 2
+    assert read_file_paths == [str(get_folder / "sub" / "second.txt")]
+
+
+def test_iter_found_hits_removed_files(get_folder, get_folder_search):
+    get_hits(get_folder_search, pattern="quod", folder_path=get_folder)
+    file_path = str(get_folder / "sub" / "second.txt")
+    full_text_index = get_folder_search._controller.full_text_index
+    assert full_text_index.get_file_stat_key(file_path=file_path) is not None
+
+    os.remove(file_path)
+    hits = get_hits(get_folder_search, pattern="quod", folder_path=get_folder)
+    assert [hit.file_path for hit in hits] == [str(get_folder / "first.txt")]
+    assert full_text_index.get_file_stat_key(file_path=file_path) is None
+    assert file_path not in get_folder_search._file_hits
+
+
+def test_iter_found_hits_full_text_index(get_folder, get_folder_search, monkeypatch):
+    get_hits(get_folder_search, pattern="quod", folder_path=get_folder)
+
+    import notes_app.folder_search
+
+    read_file_paths = []
+
+    class _File(notes_app.folder_search.File):
+        def __init__(self, file_path, **kwargs):
+            read_file_paths.append(file_path)
+            super().__init__(file_path=file_path, **kwargs)
+
+    monkeypatch.setattr(notes_app.folder_search, "File", _File)
+
+    # the index is kept by the controller, so a new folder search does not read the files again
+    folder_search = FolderSearch(
+        controller=get_folder_search._controller, defaults=defaults
+    )
+    try:
+        hits = get_hits(folder_search, pattern="istum dol", folder_path=get_folder)
+        assert [hit.file_path for hit in hits] == [str(get_folder / "first.txt")]
+        assert read_file_paths == [str(get_folder / "first.txt")]
+
+        # the short patterns are not looked up in the index
+        read_file_paths.clear()
+        hits = get_hits(folder_search, pattern="is", folder_path=get_folder)
+        assert len(hits) == 3
+        assert sorted(read_file_paths) == [
+            str(get_folder / "first.txt"),
+            str(get_folder / "no_section.txt"),
+            str(get_folder / "sub" / "second.txt"),
+        ]
+    finally:
+        folder_search.close()
+
+
+def test_iter_found_hits_cancel(get_folder, get_folder_search):
+    found_hits = get_folder_search.iter_found_hits(
+        pattern="quod", folder_path=get_folder, search=Search(defaults=defaults)
+    )
+    next(found_hits)
+
+    # a new search cancels the running one
+    new_found_hits = get_folder_search.iter_found_hits(
+        pattern="quod", folder_path=get_folder, search=Search(defaults=defaults)
+    )
+    assert list(found_hits) == []
+    assert len(list(new_found_hits)) == 2
+
+    found_hits = get_folder_search.iter_found_hits(
+        pattern="quod", folder_path=get_folder, search=Search(defaults=defaults)
+    )
+    get_folder_search.cancel()
+    assert list(found_hits) == []
+
+
+def test_iter_found_hits_non_blocking(get_folder, get_folder_search):
+    found_hits = get_folder_search.iter_found_hits(
+        pattern="quod",
+        folder_path=get_folder,
+        search=Search(defaults=defaults),
+        block=False,
+    )
+    hits = [hit for hit in found_hits if hit is not None]
+    assert len(hits) == 2
+
+
+def test_iter_found_hits_sqlite_files(get_folder, get_folder_search):
+    notes_file_path = str(get_folder / "notes.sqlite")
+    storage = SqliteStorage(file_path=notes_file_path)
+    storage.save_sections(
+        section_separators=["<section=first> "],
+        changed_sections=[("<section=first> ", "Quod dolorem")],
+    )
+    storage.close()
+    app_file_path = str(get_folder / "app.sqlite")
+    with sqlite3.connect(app_file_path) as connection:
+        connection.execute("CREATE TABLE settings (name TEXT)")
+    connection.close()
+    other_file_path = str(get_folder / "other.sqlite")
+    with sqlite3.connect(other_file_path) as connection:
+        connection.execute("CREATE TABLE sections (name TEXT)")
+    connection.close()
+    file_names = sorted(os.listdir(get_folder))
+    app_file_stat = os.stat(app_file_path)
+
+    hits = get_hits(get_folder_search, pattern="dolorem", folder_path=get_folder)
+
+    assert sorted(hit.file_path for hit in hits) == [
+        str(get_folder / "first.txt"),
+        notes_file_path,
+        str(get_folder / "sub" / "second.txt"),
+    ]
+    # the searched databases are not written
+    assert sorted(os.listdir(get_folder)) == file_names
+    assert os.stat(app_file_path).st_mtime_ns == app_file_stat.st_mtime_ns
+    with sqlite3.connect(app_file_path) as connection:
+        assert connection.execute("SELECT name FROM sqlite_master").fetchall() == [
+            ("settings",)
+        ]
+    connection.close()
+
+
+def test_iter_found_hits_read_only(get_folder, get_file):
+    mmap_defaults = Defaults()
+    mmap_defaults.DEFAULT_FILE_MMAP_READ_MODE = True
+    folder_search = FolderSearch(controller=get_file._controller, defaults=mmap_defaults)
+
+    journal_file_path = get_journal_file_path(file_path=str(get_folder / "first.txt"))
+    write_file(journal_file_path, "stale journal")
+    file_names = sorted(os.listdir(get_folder))
+
+    hits = get_hits(folder_search, pattern="dolorem", folder_path=get_folder)
+    folder_search.close()
+
+    assert len(hits) == 2
+    # neither the stale journal is moved aside nor the section indexes are written
+    assert sorted(os.listdir(get_folder)) == file_names
@@ -0,0 +1,260 @@
+import os
+import sys
+
+import pytest
+
+from notes_app.full_text_index import (
+    FullTextIndex,
+    get_file_stat_key,
+    get_full_text_index_file_path,
+    get_full_text_index_query,
+)
+
+
+@pytest.fixture()
+def get_full_text_index(tmp_path):
+    full_text_index = FullTextIndex(index_file_path=str(tmp_path / ".index.sqlite"))
+    yield full_text_index
+    full_text_index.close()
+
+
+def test_get_file_stat_key(tmp_path):
+    (tmp_path / "first.txt").write_text("Quod", encoding="utf8")
+    file_stat = os.stat(tmp_path / "first.txt")
+    assert get_file_stat_key(file_path=str(tmp_path / "first.txt")) == (
+        file_stat.st_mtime_ns,
+        file_stat.st_size,
+    )
+
+    (tmp_path / "bundle").mkdir()
+    (tmp_path / "bundle" / "second.txt").write_text("Quis", encoding="utf8")
+    mtime, size = get_file_stat_key(file_path=str(tmp_path / "bundle"))
+    assert mtime >= os.stat(tmp_path / "bundle" / "second.txt").st_mtime_ns
+    assert size == 4
+
+
+def test_get_full_text_index_file_path(tmp_path, monkeypatch):
+    index_file_path = get_full_text_index_file_path(
+        file_path=str(tmp_path / "first.txt"),
+        index_file_name="index.sqlite",
+        index_dir_path=str(tmp_path / "cache"),
+    )
+    assert os.path.dirname(index_file_path) == str(tmp_path / "cache")
+    assert os.path.basename(index_file_path).startswith("index_")
+    assert index_file_path.endswith(".sqlite")
+
+    # the files of a folder share the index, another folder gets another index
+    assert index_file_path == get_full_text_index_file_path(
+        file_path=str(tmp_path / "second.txt"),
+        index_file_name="index.sqlite",
+        index_dir_path=str(tmp_path / "cache"),
+    )
+    assert index_file_path != get_full_text_index_file_path(
+        file_path=str(tmp_path / "sub" / "first.txt"),
+        index_file_name="index.sqlite",
+        index_dir_path=str(tmp_path / "cache"),
+    )
+
+    if os.name == "posix" and sys.platform != "darwin":
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        assert get_full_text_index_file_path(
+            file_path=str(tmp_path / "first.txt"), index_file_name="index.sqlite"
+        ) == index_file_path.replace(
+            str(tmp_path / "cache"), str(tmp_path / "xdg" / "notes_app")
+        )
+
+
+def test_index_file_dir_created(tmp_path):
+    full_text_index = FullTextIndex(
+        index_file_path=str(tmp_path / "cache" / "index.sqlite")
+    )
+    full_text_index.index_file(
+        file_path="/notes/first.txt", file_stat_key=(1, 2), sections=()
+    )
+    assert os.path.exists(tmp_path / "cache" / "index.sqlite")
+    full_text_index.close()
+
+
+@pytest.mark.parametrize(
+    "patterns, query",
+    [
+        (["Quod"], '"quod"'),
+        (["quod", "Quis istum"], '"quod" OR "quis istum"'),
+        (['say "quod"'], '"say ""quod"""'),
+        (["\u0131xion", "I\u0307XION"], '"ixion" OR "ixion"'),
+        (["quod", "qu"], None),
+        ([], None),
+    ],
+)
+def test_get_full_text_index_query(patterns, query):
+    assert get_full_text_index_query(patterns=patterns) == query
+
+
+def test_index_file(get_full_text_index):
+    get_full_text_index.index_file(
+        file_path="/notes/first.txt",
+        file_stat_key=(1, 2),
+        sections=[
+            ("<section=first> ", "Quod equidem non reprehendo"),
+            ("<section=second> ", "Quis istum dolorem timet"),
+        ],
+    )
+    get_full_text_index.index_file(
+        file_path="/notes/sub/second.txt",
+        file_stat_key=(3, 4),
+        sections=[("<section=third> ", "Quod quis dolorem")],
+    )
+
+    assert get_full_text_index.get_file_stat_key(file_path="/notes/first.txt") == (1, 2)
+    assert get_full_text_index.get_file_stat_key(file_path="/notes/other.txt") is None
+    assert get_full_text_index.get_file_stat_keys(folder_path="/notes") == {
+        "/notes/first.txt": (1, 2),
+        "/notes/sub/second.txt": (3, 4),
+    }
+    assert get_full_text_index.get_file_stat_keys(folder_path="/notes/sub") == {
+        "/notes/sub/second.txt": (3, 4)
+    }
+
+    assert get_full_text_index.get_candidate_sections(
+        query=get_full_text_index_query(patterns=["QUIS"]), folder_path="/notes"
+    ) == {
+        "/notes/first.txt": {"<section=second> "},
+        "/notes/sub/second.txt": {"<section=third> "},
+    }
+    assert get_full_text_index.get_candidate_sections(
+        query=get_full_text_index_query(patterns=["uis istum do"]),
+        folder_path="/notes",
+    ) == {"/notes/first.txt": {"<section=second> "}}
+    assert get_full_text_index.get_candidate_sections(
+        query=get_full_text_index_query(patterns=["quis"]), folder_path="/notes/sub"
+    ) == {"/notes/sub/second.txt": {"<section=third> "}}
+    assert (
+        get_full_text_index.get_candidate_sections(
+            query=get_full_text_index_query(patterns=["nothing"]),
+            folder_path="/notes",
+        )
+        == {}
+    )
+
+    # indexing the file again replaces its sections
+    get_full_text_index.index_file(
+        file_path="/notes/first.txt",
+        file_stat_key=(5, 6),
+        sections=[("<section=first> ", "Quod equidem non reprehendo")],
+    )
+    assert get_full_text_index.get_candidate_sections(
+        query=get_full_text_index_query(patterns=["quis"]), folder_path="/notes"
+    ) == {"/notes/sub/second.txt": {"<section=third> "}}
+
+    get_full_text_index.forget_files(file_paths=["/notes/sub/second.txt"])
+    assert get_full_text_index.get_file_stat_keys(folder_path="/notes") == {
+        "/notes/first.txt": (5, 6)
+    }
+    assert (
+        get_full_text_index.get_candidate_sections(
+            query=get_full_text_index_query(patterns=["quis"]), folder_path="/notes"
+        )
+        == {}
+    )
+
+
+def test_update_file(get_full_text_index):
+    get_full_text_index.index_file(
+        file_path="/notes/first.txt",
+        file_stat_key=(1, 2),
+        sections=[
+            ("<section=first> ", "Quod equidem non reprehendo"),
+            ("<section=second> ", "Quis istum dolorem timet"),
+        ],
+    )
+
+    get_full_text_index.update_file(
+        file_path="/notes/first.txt",
+        previous_file_stat_key=(1, 2),
+        file_stat_key=(3, 4),
+        section_separators=["<section=second> ", "<section=third> "],
+        changed_sections=[
+            ("<section=second> ", "Quis istum timet"),
+            ("<section=third> ", "Quod dolorem"),
+        ],
+    )
+
+    def get_candidate_sections(pattern):
+        return get_full_text_index.get_candidate_sections(
+            query=get_full_text_index_query(patterns=[pattern]), folder_path="/notes"
+        )
+
+    assert get_full_text_index.get_file_stat_key(file_path="/notes/first.txt") == (3, 4)
+    assert get_candidate_sections("equidem") == {}
+    assert get_candidate_sections("istum") == {"/notes/first.txt": {"<section=second> "}}
+    assert get_candidate_sections("dolorem") == {
+        "/notes/first.txt": {"<section=third> "}
+    }
+
+    # the index of a file changed since it was indexed is dropped
+    get_full_text_index.update_file(
+        file_path="/notes/first.txt",
+        previous_file_stat_key=(5, 6),
+        file_stat_key=(7, 8),
+        section_separators=["<section=second> "],
+        changed_sections=[("<section=second> ", "Quis")],
+    )
+    assert get_full_text_index.get_file_stat_key(file_path="/notes/first.txt") is None
+    assert get_candidate_sections("quis") == {}
+
+    # a file not indexed is not indexed by an update
+    get_full_text_index.update_file(
+        file_path="/notes/first.txt",
+        previous_file_stat_key=None,
+        file_stat_key=(7, 8),
+        section_separators=["<section=second> "],
+        changed_sections=[("<section=second> ", "Quis")],
+    )
+    assert get_full_text_index.get_file_stat_key(file_path="/notes/first.txt") is None
+
+
+def test_get_candidate_sections_normalized(get_full_text_index):
+    # the sections a case-insensitive regex search matches in are candidates
+    get_full_text_index.index_file(
+        file_path="/notes/first.txt",
+        file_stat_key=(1, 2),
+        sections=[
+            ("<section=first> ", "Quod \u0131xion"),
+            ("<section=second> ", "Quis \u0130xion"),
+        ],
+    )
+
+    assert get_full_text_index.get_candidate_sections(
+        query=get_full_text_index_query(patterns=["IXION"]), folder_path="/notes"
+    ) == {"/notes/first.txt": {"<section=first> ", "<section=second> "}}
+
+
+def test_update_file_not_created(tmp_path):
+    full_text_index = FullTextIndex(index_file_path=str(tmp_path / ".index.sqlite"))
+
+    # a save does not create the index not created by a search
+    full_text_index.update_file(
+        file_path="/notes/first.txt",
+        previous_file_stat_key=(1, 2),
+        file_stat_key=(3, 4),
+        section_separators=["<section=first> "],
+        changed_sections=[("<section=first> ", "Quod")],
+    )
+    assert not os.path.exists(full_text_index.index_file_path)
+    full_text_index.close()
+
+
+def test_index_file_path_other_version(tmp_path):
+    full_text_index = FullTextIndex(index_file_path=str(tmp_path / ".index.sqlite"))
+    full_text_index.index_file(
+        file_path="/notes/first.txt",
+        file_stat_key=(1, 2),
+        sections=[("<section=first> ", "Quod")],
+    )
+    full_text_index._get_connection().execute("PRAGMA user_version = 1")
+    full_text_index.close()
+
+    # the index written with another version is dropped
+    full_text_index = FullTextIndex(index_file_path=str(tmp_path / ".index.sqlite"))
+    assert full_text_index.get_file_stat_key(file_path="/notes/first.txt") is None
+    full_text_index.close()
@@ -0,0 +1,177 @@
+import os
+from os import getcwd, stat
+
+import pytest
+
+from notes_app.journal import (
+    JOURNAL_RECORD_TYPE_DELETE,
+    JOURNAL_RECORD_TYPE_REPLACE,
+    JOURNAL_STALE_FILE_NAME_TEMPLATE,
+    JournalRecord,
+    get_journal_file_path,
+    get_journal_header_data,
+    get_journal_record_data,
+    get_replaced_range,
+    read_journal,
+    remove_journal,
+)
+
+JOURNAL_RECORDS = [
+    JournalRecord(
+        record_type=JOURNAL_RECORD_TYPE_REPLACE,
+        section_separator="<section=first> ",
+        start=5,
+        end=12,
+        text="čeština",
+    ),
+    JournalRecord(
+        record_type=JOURNAL_RECORD_TYPE_DELETE, section_separator="<section=second> "
+    ),
+]
+
+
+@pytest.fixture
+def get_journaled_file_path():
+    file_path = f"{getcwd()}/journaled.txt"
+    with open(file=file_path, mode="w", encoding="utf8") as f:
+        f.write(
+            """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet"""
+        )
+    journal_file_path = get_journal_file_path(file_path=file_path)
+    yield file_path
+    for fp in (
+        file_path,
+        journal_file_path,
+        JOURNAL_STALE_FILE_NAME_TEMPLATE.format(journal_file_path=journal_file_path),
+    ):
+        if os.path.exists(fp):
+            os.remove(fp)
+
+
+def write_journal(file_path, data):
+    with open(file=get_journal_file_path(file_path=file_path), mode="wb") as f:
+        f.write(data)
+
+
+def get_journal_data(file_path):
+    return get_journal_header_data(file_stat=stat(file_path)) + b"".join(
+        get_journal_record_data(journal_record=journal_record)
+        for journal_record in JOURNAL_RECORDS
+    )
+
+
+def test_get_journal_file_path():
+    assert get_journal_file_path(file_path="/tmp/notes.txt") == "/tmp/.notes.txt.journal"
+    assert get_journal_file_path(file_path="notes.txt") == ".notes.txt.journal"
+
+
+@pytest.mark.parametrize(
+    "before, after, result",
+    [
+        ("", "", (0, 0, "")),
+        ("abc", "abc", (3, 3, "")),
+        ("", "abc", (0, 0, "abc")),
+        ("abc", "", (0, 3, "")),
+        ("Quod equidem", "Quod non equidem", (5, 5, "non ")),
+        ("Quod non equidem", "Quod equidem", (5, 9, "")),
+        ("Quod equidem", "Quis equidem", (2, 4, "is")),
+        ("aaa", "aaaa", (3, 3, "a")),
+    ],
+)
+def test_get_replaced_range(before, after, result):
+    assert get_replaced_range(before=before, after=after) == result
+
+    start, end, text = result
+    assert before[:start] + text + before[end:] == after
+
+
+def test_read_journal(get_journaled_file_path):
+    file_stat = stat(get_journaled_file_path)
+
+    assert read_journal(file_path=get_journaled_file_path, file_stat=file_stat) is None
+
+    data = get_journal_data(file_path=get_journaled_file_path)
+    write_journal(file_path=get_journaled_file_path, data=data)
+
+    assert read_journal(file_path=get_journaled_file_path, file_stat=file_stat) == (
+        JOURNAL_RECORDS,
+        len(data),
+    )
+
+
+def test_read_journal_torn_record(get_journaled_file_path):
+    file_stat = stat(get_journaled_file_path)
+    data = get_journal_data(file_path=get_journaled_file_path)
+    write_journal(file_path=get_journaled_file_path, data=data[:-1])
+
+    journal_records, journal_size = read_journal(
+        file_path=get_journaled_file_path, file_stat=file_stat
+    )
+
+    assert journal_records == JOURNAL_RECORDS[:1]
+    assert journal_size == os.path.getsize(
+        get_journal_file_path(file_path=get_journaled_file_path)
+    )
+
+
+def test_read_journal_read_only(get_journaled_file_path):
+    journal_file_path = get_journal_file_path(file_path=get_journaled_file_path)
+    data = get_journal_data(file_path=get_journaled_file_path)
+    write_journal(file_path=get_journaled_file_path, data=data[:-1])
+
+    journal_records, journal_size = read_journal(
+        file_path=get_journaled_file_path,
+        file_stat=stat(get_journaled_file_path),
+        read_only=True,
+    )
+    assert journal_records == JOURNAL_RECORDS[:1]
+    assert os.path.getsize(journal_file_path) == len(data) - 1
+
+    with open(file=get_journaled_file_path, mode="a", encoding="utf8") as f:
+        f.write("!")
+
+    assert (
+        read_journal(
+            file_path=get_journaled_file_path,
+            file_stat=stat(get_journaled_file_path),
+            read_only=True,
+        )
+        is None
+    )
+    assert os.path.exists(journal_file_path)
+
+
+def test_read_journal_file_changed(get_journaled_file_path):
+    write_journal(
+        file_path=get_journaled_file_path,
+        data=get_journal_data(file_path=get_journaled_file_path),
+    )
+
+    with open(file=get_journaled_file_path, mode="a", encoding="utf8") as f:
+        f.write("!")
+
+    assert (
+        read_journal(
+            file_path=get_journaled_file_path, file_stat=stat(get_journaled_file_path)
+        )
+        is None
+    )
+
+    journal_file_path = get_journal_file_path(file_path=get_journaled_file_path)
+    assert not os.path.exists(journal_file_path)
+    assert os.path.exists(
+        JOURNAL_STALE_FILE_NAME_TEMPLATE.format(journal_file_path=journal_file_path)
+    )
+
+
+def test_remove_journal(get_journaled_file_path):
+    assert remove_journal(file_path=get_journaled_file_path) is None
+
+    write_journal(
+        file_path=get_journaled_file_path,
+        data=get_journal_data(file_path=get_journaled_file_path),
+    )
+    assert remove_journal(file_path=get_journaled_file_path) is None
+
+    assert not os.path.exists(get_journal_file_path(file_path=get_journaled_file_path))
@@ -0,0 +1,90 @@
+import pytest
+
+from notes_app.line_index import LineIndex
+
+LINE_BREAK_FLAG = 1
+
+# "Quod equidem\nnon reprehendo\n\nQuis istum" with "non reprehendo" wrapped after "non "
+LINES = ["Quod equidem", "non ", "reprehendo", "", "Quis istum"]
+LINES_FLAGS = [0, LINE_BREAK_FLAG, 0, LINE_BREAK_FLAG, LINE_BREAK_FLAG]
+
+
+@pytest.fixture()
+def get_line_index():
+    lines = list(LINES)
+    lines_flags = list(LINES_FLAGS)
+    line_index = LineIndex(
+        get_lines=lambda: lines,
+        get_lines_flags=lambda: lines_flags,
+        line_break_flag=LINE_BREAK_FLAG,
+    )
+    return line_index, lines, lines_flags
+
+
+@pytest.mark.parametrize(
+    "index, line_and_column",
+    [
+        (-1, (0, 0)),
+        (0, (0, 0)),
+        (5, (0, 5)),
+        (12, (0, 12)),
+        (13, (1, 0)),
+        (17, (1, 4)),
+        (18, (2, 1)),
+        (27, (2, 10)),
+        (28, (3, 0)),
+        (29, (4, 0)),
+        (39, (4, 10)),
+        (100, (4, 10)),
+    ],
+)
+def test_get_line_and_column(get_line_index, index, line_and_column):
+    line_index, _, _ = get_line_index
+    assert line_index.get_line_and_column(index=index) == line_and_column
+
+
+@pytest.mark.parametrize(
+    "line, column, index",
+    [(0, 0, 0), (0, 12, 12), (1, 0, 13), (2, 1, 18), (3, 0, 28), (4, 10, 39)],
+)
+def test_get_index(get_line_index, line, column, index):
+    line_index, _, _ = get_line_index
+    assert line_index.get_index(line=line, column=column) == index
+    assert line_index.get_line_and_column(index=index) == (line, column)
+
+
+def test_get_index_past_last_line(get_line_index):
+    line_index, _, _ = get_line_index
+    with pytest.raises(IndexError):
+        line_index.get_index(line=5, column=0)
+
+
+def test_line_index_lazy(get_line_index):
+    line_index, _, _ = get_line_index
+
+    assert line_index.get_line_and_column(index=5) == (0, 5)
+    assert len(line_index._line_ends) == 1
+
+    assert line_index.get_index(line=2, column=0) == 17
+    assert len(line_index._line_ends) == 3
+
+
+def test_invalidate(get_line_index):
+    line_index, lines, lines_flags = get_line_index
+    assert line_index.get_line_and_column(index=100) == (4, 10)
+
+    lines[2] = "reprehendo quod"
+    line_index.invalidate(line=2)
+    assert list(line_index._line_ends) == [12, 17]
+    assert line_index.get_line_and_column(index=33) == (3, 0)
+    assert line_index.get_line_and_column(index=100) == (4, 10)
+
+    del lines[1:]
+    del lines_flags[1:]
+    line_index.invalidate(line=1)
+    assert line_index.get_line_and_column(index=100) == (0, 12)
+
+    lines.clear()
+    lines_flags.clear()
+    line_index.invalidate()
+    assert line_index.get_line_and_column(index=5) == (0, 0)
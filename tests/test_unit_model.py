@@ -1,12 +1,15 @@
 import json
+import os
 import tempfile
 import time
 from datetime import datetime
 from os import remove
 
+from notes_app.journal import get_journal_file_path
 from notes_app.model.notes_model import (
     format_local_epoch,
     get_file_updated_timestamp_as_epoch,
+    get_file_size,
     get_current_epoch,
 )
 
@@ -30,6 +33,30 @@ def test_get_file_updated_timestamp_as_epoch():
     assert datetime.fromtimestamp(get_file_updated_timestamp_as_epoch(tf.name))
 
 
+def test_get_file_updated_timestamp_as_epoch_dir():
+    with tempfile.TemporaryDirectory() as td:
+        dir_timestamp = get_file_updated_timestamp_as_epoch(td)
+
+        fp = f"{td}/section.txt"
+        with open(fp, mode="w", encoding="utf8") as f:
+            f.write("section")
+        os.utime(fp, (dir_timestamp + 10, dir_timestamp + 10))
+
+        assert get_file_updated_timestamp_as_epoch(td) == dir_timestamp + 10
+
+
+def test_get_file_size():
+    with tempfile.TemporaryDirectory() as td:
+        assert get_file_size(td) == 0
+
+        for name in ("first.txt", "second.txt"):
+            with open(f"{td}/{name}", mode="w", encoding="utf8") as f:
+                f.write("section")
+
+        assert get_file_size(f"{td}/first.txt") == 7
+        assert get_file_size(td) == 14
+
+
 class TestModel:
     def test_model(self, get_model):
         assert get_model._file_path == get_model.defaults.DEFAULT_NOTES_FILE_NAME
@@ -84,6 +111,42 @@ class TestModel:
         get_model._last_updated_on = 0
         assert get_model.external_update is False
 
+    def test_external_update_journal(self, get_model):
+        get_model.update()
+        assert get_model.external_update is False
+
+        # the journal appended to by another instance within the same second
+        journal_file_path = get_journal_file_path(file_path=get_model.file_path)
+        with open(journal_file_path, mode="ab") as f:
+            f.write(b"record")
+        os.utime(
+            journal_file_path, (get_model.last_updated_on, get_model.last_updated_on)
+        )
+        assert get_model.external_update is True
+
+        get_model.update()
+        assert get_model._side_file_sizes == [6, 0]
+        assert get_model.external_update is False
+
+        remove(journal_file_path)
+
+    def test_external_update_sqlite_wal(self, get_model):
+        get_model.update()
+
+        # the commit of another instance to a SQLite database leaves the database file untouched
+        wal_file_path = f"{get_model.file_path}-wal"
+        with open(wal_file_path, mode="ab") as f:
+            f.write(b"frame")
+        os.utime(
+            wal_file_path, (get_model.last_updated_on, get_model.last_updated_on)
+        )
+        assert get_model.external_update is True
+
+        get_model.update()
+        assert get_model.external_update is False
+
+        remove(wal_file_path)
+
     def test_set_get_observers(self, get_model):
         observer = dict()
         get_model.add_observer(observer=observer)
@@ -0,0 +1,160 @@
+from multiprocessing import shared_memory
+
+import pytest
+
+import notes_app.parallel_search
+import notes_app.search
+from notes_app.defaults import Defaults
+from notes_app.parallel_search import (
+    ParallelSearch,
+    SearchChunk,
+    _search_chunks,
+    get_parallel_search,
+)
+from notes_app.search import Search, iter_occurrences
+
+defaults = Defaults()
+
+TEXTS = {
+    "<section=first> ": "Quod equidem non reprehendo aaaaaaa Straße STRASSE",
+    "<section=second> ": "Quis istum dolorem timet\naaa quis-quis",
+    "<section=third> ": "",
+    "<section=fourth> ": "ąęść ĄĘŚĆ quod QUOD aaaaaaaaa",
+}
+
+
+@pytest.fixture
+def get_process_parallel_search(monkeypatch):
+    # the sections get split into chunks of a few chars, so occurrences cross the chunk ends
+    monkeypatch.setattr(
+        notes_app.parallel_search, "SEARCH_PARALLEL_MINIMAL_TASK_CHAR_COUNT", 3
+    )
+    parallel_search = ParallelSearch(process_count=2)
+    yield parallel_search
+    parallel_search.close()
+
+
+@pytest.mark.parametrize(
+    "pattern, case_sensitive_search, full_words_search, regex_search",
+    [
+        ("aa", False, False, False),
+        ("aa", True, False, False),
+        ("quod", False, False, False),
+        ("QUOD", True, False, False),
+        ("strasse", False, False, False),
+        ("ĄĘ", False, False, False),
+        ("quis", False, True, False),
+        ("a{2,3}", False, False, True),
+        ("a{2,3}", False, True, True),
+        ("re.*?o", False, False, True),
+        ("m\\s+\\w+", False, False, True),
+        ("(?<=a)a", False, False, True),
+    ],
+)
+def test_search(
+    get_process_parallel_search,
+    pattern,
+    case_sensitive_search,
+    full_words_search,
+    regex_search,
+):
+    found_occurrences = dict()
+    for section_separator, text in TEXTS.items():
+        occurrences = list(
+            iter_occurrences(
+                pattern=pattern,
+                text=text,
+                case_sensitive_search=case_sensitive_search,
+                full_words_search=full_words_search,
+                regex_search=regex_search,
+            )
+        )
+        if occurrences:
+            found_occurrences[section_separator] = occurrences
+
+    assert (
+        get_process_parallel_search.search(
+            pattern=pattern,
+            texts=TEXTS,
+            case_sensitive_search=case_sensitive_search,
+            full_words_search=full_words_search,
+            regex_search=regex_search,
+        )
+        == found_occurrences
+    )
+
+
+def test_search_no_occurrences(get_process_parallel_search):
+    assert (
+        get_process_parallel_search.search(
+            pattern="nonx",
+            texts=TEXTS,
+            case_sensitive_search=False,
+            full_words_search=False,
+            regex_search=False,
+        )
+        == {}
+    )
+
+
+def test__search_chunks(monkeypatch):
+    monkeypatch.setattr(notes_app.parallel_search, "_decoded_section", (None, ""))
+    text = TEXTS["<section=fourth> "]
+    data = text.encode("utf8")
+    search_kwargs = dict(
+        pattern="quod",
+        case_sensitive_search=False,
+        full_words_search=False,
+        regex_search=False,
+    )
+
+    shared_data = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shared_data.buf[: len(data)] = data
+
+        assert _search_chunks(
+            shared_memory_name=shared_data.name,
+            chunks=[SearchChunk(data_start=0, data_end=len(data), start=0, end=12)],
+            search_kwargs=search_kwargs,
+        ) == [[(10, 14)]]
+        decoded_section = notes_app.parallel_search._decoded_section
+        assert decoded_section == ((shared_data.name, 0, len(data)), text)
+
+        # the next chunk of the section is searched in the section decoded before
+        assert _search_chunks(
+            shared_memory_name=shared_data.name,
+            chunks=[
+                SearchChunk(data_start=0, data_end=len(data), start=12, end=len(text))
+            ],
+            search_kwargs=search_kwargs,
+        ) == [[(15, 19)]]
+        assert notes_app.parallel_search._decoded_section[1] is decoded_section[1]
+    finally:
+        shared_data.close()
+        shared_data.unlink()
+
+
+def test_search_all_sections(get_process_parallel_search, get_file, monkeypatch):
+    monkeypatch.setattr(notes_app.search, "SEARCH_PARALLEL_MINIMAL_CHAR_COUNT", 0)
+
+    search = Search(defaults=defaults, parallel_search=get_process_parallel_search)
+    search.search_case_sensitive = False
+    search.search_all_sections = True
+    search.search_full_words = False
+
+    assert search.search_for_occurrences(
+        pattern="do", file=get_file, current_section="<section=first> ",
+    ) == {"<section=first> ": [25], "<section=second> ": [11]}
+
+    search.close()
+    assert get_process_parallel_search._process_pool is None
+
+
+def test_get_parallel_search(monkeypatch):
+    assert get_parallel_search(defaults=defaults) is None
+
+    monkeypatch.setattr(defaults, "DEFAULT_SEARCH_PARALLEL_MODE", True)
+    monkeypatch.setattr(
+        notes_app.parallel_search, "is_parallel_search_available", lambda: True
+    )
+    assert isinstance(get_parallel_search(defaults=defaults), ParallelSearch)
@@ -1,3 +1,5 @@
+import re
+
 import pytest
 
 from notes_app.defaults import Defaults
@@ -6,6 +8,12 @@ from notes_app.search import (
     validate_search_input,
     _basic_search_function,
     _full_words_search_function,
+    _regex_search_function,
+    get_compiled_regex,
+    get_occurrence_end,
+    get_multiple_patterns,
+    is_full_word_occurrence,
+    is_self_overlapping,
     search_function,
     Search,
     transform_position_text_placeholder_to_position,
@@ -39,6 +47,12 @@ class TestSearch:
             ("is", "this is some section.yeah", True, [2, 5]),
             ("is Some", "this is Some section.yeah", True, [5]),
             ("hIs", "this is some section.yeah", True, []),
+            ("c++", "c++ or c+", False, [0]),
+            ("(todo", "(TODO) todo", False, [0]),
+            ("aa", "aaaaa", True, [0, 2]),
+            ("STRASSE", "Straße strasse", False, [7]),
+            ("ß", "STRAßE", False, [4]),
+            ("İs", "İs is", False, [0, 3]),
         ],
     )
     def test__basic_search_function(self, pattern, text, case_sensitive, occurrences):
@@ -60,6 +74,35 @@ class TestSearch:
     ):
         assert _full_words_search_function(pattern, text, case_sensitive) == occurrences
 
+    def test__full_words_search_function_literal(self):
+        assert _full_words_search_function("c++", "c++ or c++x", False) == [0]
+        assert _full_words_search_function("is.", "this is. isa", False) == [5]
+        assert _full_words_search_function(
+            "is|isa", "this is. isa", False, regex_search=True
+        ) == [5, 9]
+
+    def test__basic_search_function_casefolded_text(self):
+        assert _basic_search_function(
+            "quod", "Quod quod", False, casefolded_text="quod quod"
+        ) == [0, 5]
+
+    @pytest.mark.parametrize(
+        "pattern, text, case_sensitive, occurrences",
+        [
+            ("is", "this is some section.yeah", False, [2, 5]),
+            ("s.", "this is some section.yeah", False, [3, 6, 8, 13]),
+            ("n\\.y|\\bso", "this is some section.yeah", False, [8, 19]),
+            ("So", "this is some section.yeah", True, []),
+            ("x*", "this is some section.yeah", False, []),
+        ],
+    )
+    def test__regex_search_function(self, pattern, text, case_sensitive, occurrences):
+        assert _regex_search_function(pattern, text, case_sensitive) == occurrences
+
+    def test_get_compiled_regex(self):
+        assert get_compiled_regex("is", 0) is get_compiled_regex("is", 0)
+        assert get_compiled_regex("is", 0) is not get_compiled_regex("is", 2)
+
     @pytest.mark.parametrize(
         "pattern, text, case_sensitive, full_words_search, occurrences",
         [
@@ -85,6 +128,66 @@ class TestSearch:
             == occurrences
         )
 
+    @pytest.mark.parametrize(
+        "pattern, text, start, case_sensitive, occurrence_end",
+        [
+            ("is", "this is", 2, True, 4),
+            ("Is", "this is", 2, True, None),
+            ("Is", "this is", 2, False, 4),
+            ("is", "this is", 3, False, None),
+            ("STRASSE", "Straße strasse", 7, False, 14),
+            ("STRASSE", "Straße strasse", 0, False, None),
+        ],
+    )
+    def test_get_occurrence_end(
+        self, pattern, text, start, case_sensitive, occurrence_end
+    ):
+        assert (
+            get_occurrence_end(
+                pattern=pattern,
+                text=text,
+                casefolded_text=text.casefold(),
+                start=start,
+                case_sensitive_search=case_sensitive,
+            )
+            == occurrence_end
+        )
+
+    @pytest.mark.parametrize(
+        "pattern, self_overlapping",
+        [("ab", False), ("aa", True), ("abca", True), ("abcab", True), ("a", False)],
+    )
+    def test_is_self_overlapping(self, pattern, self_overlapping):
+        assert is_self_overlapping(pattern=pattern) is self_overlapping
+
+    @pytest.mark.parametrize(
+        "pattern, case_sensitive, patterns",
+        [
+            ("quod, quis", True, ["quod", "quis"]),
+            ("quod,,  Quod ,", True, ["quod", "Quod"]),
+            ("quod,,  Quod ,", False, ["quod"]),
+            (" , ", False, []),
+            ("non reprehendo,quis", False, ["non reprehendo", "quis"]),
+        ],
+    )
+    def test_get_multiple_patterns(self, pattern, case_sensitive, patterns):
+        assert (
+            get_multiple_patterns(pattern=pattern, case_sensitive_search=case_sensitive)
+            == patterns
+        )
+
+    @pytest.mark.parametrize(
+        "start, end, full_word",
+        [(0, 4, True), (0, 2, False), (5, 12, True), (6, 12, False), (17, 27, True)],
+    )
+    def test_is_full_word_occurrence(self, start, end, full_word):
+        assert (
+            is_full_word_occurrence(
+                text="Quod equidem non reprehendo", start=start, end=end
+            )
+            is full_word
+        )
+
     def test_search(self):
         search = Search(defaults=defaults)
         assert (
@@ -92,6 +195,10 @@ class TestSearch:
         )
         assert search.search_all_sections == defaults.DEFAULT_VALUE_SEARCH_ALL_SECTIONS
         assert search.search_full_words == defaults.DEFAULT_VALUE_SEARCH_FULL_WORDS
+        assert search.search_regex == defaults.DEFAULT_VALUE_SEARCH_REGEX
+        assert search.search_live == defaults.DEFAULT_VALUE_SEARCH_LIVE
+        assert search.search_fuzzy == defaults.DEFAULT_VALUE_SEARCH_FUZZY
+        assert search.search_multiple == defaults.DEFAULT_VALUE_SEARCH_MULTIPLE
 
     def test_search_default(self, get_file):
         search = Search(defaults=defaults)
@@ -135,6 +242,405 @@ class TestSearch:
             pattern="do", file=get_file, current_section="<section=first> ",
         ) == {"<section=first> ": [25], "<section=second> ": [11]}
 
+    def test_search_all_sections_changed(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = False
+        search.search_all_sections = True
+        search.search_full_words = False
+
+        assert search.search_for_occurrences(
+            pattern="quis", file=get_file, current_section="<section=first> ",
+        ) == {"<section=second> ": [0]}
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="Quis et quod"
+        )
+        get_file.rename_section(
+            old_section_separator="<section=second> ",
+            new_section_separator="<section=third> ",
+        )
+        assert search.search_for_occurrences(
+            pattern="quis", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [0], "<section=third> ": [0]}
+        assert search.search_for_occurrences(
+            pattern="s et q", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [3]}
+
+        get_file.delete_section_content(section_separator="<section=third> ")
+        assert search.search_for_occurrences(
+            pattern="quis", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [0]}
+
+    def test_search_regex(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = False
+        search.search_all_sections = True
+        search.search_full_words = False
+        search.search_regex = True
+
+        assert search.search_for_occurrences(
+            pattern="qu.s|non", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [13], "<section=second> ": [0]}
+
+        with pytest.raises(re.error):
+            search.search_for_occurrences(
+                pattern="(quod", file=get_file, current_section="<section=first> ",
+            )
+
+        search.search_regex = False
+        assert search.search_for_occurrences(
+            pattern="qu.s|non", file=get_file, current_section="<section=first> ",
+        ) == {}
+
+    def test_search_casefolded_text(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = False
+        search.search_all_sections = True
+        search.search_full_words = False
+
+        assert search.search_for_occurrences(
+            pattern="QU", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [0, 6], "<section=second> ": [0]}
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="Quis"
+        )
+        get_file.delete_section_content(section_separator="<section=second> ")
+        assert search.search_for_occurrences(
+            pattern="QU", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [0]}
+        assert list(search._casefolded_texts) == ["<section=first> "]
+
+    def test_iter_found_occurrences(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = False
+        search.search_all_sections = True
+        search.search_full_words = False
+        search.search_regex = True
+
+        found_occurrences = search.iter_found_occurrences(
+            pattern="qu[a-z]+", file=get_file, current_section="<section=first> ",
+        )
+        assert next(found_occurrences) == ("<section=first> ", 0, 4)
+        assert list(found_occurrences) == [
+            ("<section=first> ", 6, 12),
+            ("<section=second> ", 0, 4),
+        ]
+
+    @pytest.mark.parametrize(
+        "pattern, all_sections, found_occurrences",
+        [
+            ("reprehnedo", True, [("<section=first> ", 17, 27)]),
+            ("REPREHENDO", True, [("<section=first> ", 17, 27)]),
+            ("equidam non", True, [("<section=first> ", 5, 16)]),
+            ("dolorum  timet", True, []),
+            ("  dolorum timet", True, []),
+            ("m dolorum timet", True, []),
+            ("istum dolorum timet", True, [("<section=second> ", 5, 24)]),
+            ("dolorem timot.", True, []),
+            (
+                "quid",
+                True,
+                [("<section=first> ", 0, 4), ("<section=second> ", 0, 4)],
+            ),
+            ("quid", False, [("<section=second> ", 0, 4)]),
+            ("qui", True, []),
+            ("sisyphos", True, []),
+        ],
+    )
+    def test_search_fuzzy(self, get_file, pattern, all_sections, found_occurrences):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = True
+        search.search_all_sections = all_sections
+        search.search_full_words = False
+        search.search_regex = True
+        search.search_fuzzy = True
+
+        assert (
+            list(
+                search.iter_found_occurrences(
+                    pattern=pattern,
+                    file=get_file,
+                    current_section="<section=second> ",
+                )
+            )
+            == found_occurrences
+        )
+
+    def test_search_fuzzy_ranking(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_all_sections = True
+        search.search_fuzzy = True
+
+        get_file.set_section_content(
+            section_separator="<section=third> ", section_content="quid est, Quis?"
+        )
+        assert list(
+            search.iter_found_occurrences(
+                pattern="quid", file=get_file, current_section="<section=first> "
+            )
+        ) == [
+            ("<section=third> ", 0, 4),
+            ("<section=first> ", 0, 4),
+            ("<section=second> ", 0, 4),
+            ("<section=third> ", 10, 14),
+        ]
+        assert (
+            search._is_narrowing(
+                pattern="quids",
+                search_key=search._get_search_key(
+                    file=get_file, current_section="<section=first> "
+                ),
+            )
+            is False
+        )
+
+    @pytest.mark.parametrize(
+        "pattern, case_sensitive, full_words, all_sections, found_occurrences",
+        [
+            (
+                "em, qu",
+                False,
+                False,
+                True,
+                [
+                    ("em", "<section=first> ", 10, 12),
+                    ("em", "<section=second> ", 16, 18),
+                    ("qu", "<section=first> ", 0, 2),
+                    ("qu", "<section=first> ", 6, 8),
+                    ("qu", "<section=second> ", 0, 2),
+                ],
+            ),
+            (
+                "Qu,non,dolor",
+                True,
+                False,
+                True,
+                [
+                    ("Qu", "<section=first> ", 0, 2),
+                    ("Qu", "<section=second> ", 0, 2),
+                    ("non", "<section=first> ", 13, 16),
+                    ("dolor", "<section=second> ", 11, 16),
+                ],
+            ),
+            (
+                "quis,dolor,non",
+                False,
+                True,
+                True,
+                [
+                    ("quis", "<section=second> ", 0, 4),
+                    ("non", "<section=first> ", 13, 16),
+                ],
+            ),
+            ("quis,dolor,non", False, True, False, [("non", "<section=first> ", 13, 16)]),
+            ("ee, rr", False, False, True, []),
+        ],
+    )
+    def test_search_multiple(
+        self,
+        get_file,
+        pattern,
+        case_sensitive,
+        full_words,
+        all_sections,
+        found_occurrences,
+    ):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = case_sensitive
+        search.search_all_sections = all_sections
+        search.search_full_words = full_words
+        search.search_regex = True
+        search.search_multiple = True
+
+        assert (
+            list(
+                search.iter_found_pattern_occurrences(
+                    pattern=pattern,
+                    file=get_file,
+                    current_section="<section=first> ",
+                )
+            )
+            == found_occurrences
+        )
+        assert list(
+            search.iter_found_occurrences(
+                pattern=pattern, file=get_file, current_section="<section=first> ",
+            )
+        ) == [occurrence[1:] for occurrence in found_occurrences]
+
+    def test_search_multiple_overlapping(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_all_sections = False
+        search.search_multiple = True
+
+        get_file.set_section_content(
+            section_separator="<section=first> ", section_content="aaaa Straße"
+        )
+        assert list(
+            search.iter_found_pattern_occurrences(
+                pattern="aa, a, strasse, SS",
+                file=get_file,
+                current_section="<section=first> ",
+            )
+        ) == [
+            ("aa", "<section=first> ", 0, 2),
+            ("aa", "<section=first> ", 2, 4),
+            ("a", "<section=first> ", 0, 1),
+            ("a", "<section=first> ", 1, 2),
+            ("a", "<section=first> ", 2, 3),
+            ("a", "<section=first> ", 3, 4),
+            ("a", "<section=first> ", 8, 9),
+            ("strasse", "<section=first> ", 5, 11),
+            ("SS", "<section=first> ", 9, 10),
+        ]
+
+    def test_search_not_multiple(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_all_sections = True
+        search.search_multiple = False
+
+        assert list(
+            search.iter_found_pattern_occurrences(
+                pattern="quod, quis",
+                file=get_file,
+                current_section="<section=first> ",
+            )
+        ) == []
+        assert list(
+            search.iter_found_pattern_occurrences(
+                pattern="qui", file=get_file, current_section="<section=first> ",
+            )
+        ) == [
+            ("qui", "<section=first> ", 6, 9),
+            ("qui", "<section=second> ", 0, 3),
+        ]
+
+    def test_search_fuzzy_without_words(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_all_sections = True
+        search.search_fuzzy = True
+
+        assert search.search_for_occurrences(
+            pattern=" ", file=get_file, current_section="<section=first> "
+        ) == {"<section=first> ": [4, 12, 16], "<section=second> ": [4, 10, 18]}
+
+    @pytest.mark.parametrize(
+        "last_pattern, pattern, case_sensitive, narrowing",
+        [
+            ("qu", "quo", False, True),
+            ("qu", "QUO", False, True),
+            ("qu", "QUO", True, False),
+            ("Qu", "Quis", True, True),
+            ("quod", "qu", False, False),
+            ("e ", "e n", False, True),
+            ("e e", "e eq", False, False),
+        ],
+    )
+    def test_search_narrowing(
+        self, get_file, monkeypatch, last_pattern, pattern, case_sensitive, narrowing
+    ):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = case_sensitive
+        search.search_all_sections = True
+        search.search_full_words = False
+        search.search_regex = False
+
+        found_occurrences = search.search_for_occurrences(
+            pattern=pattern, file=get_file, current_section="<section=first> ",
+        )
+
+        search.search_for_occurrences(
+            pattern=last_pattern, file=get_file, current_section="<section=first> ",
+        )
+        assert search._is_narrowing(
+            pattern=pattern,
+            search_key=search._get_search_key(
+                file=get_file, current_section="<section=first> "
+            ),
+        ) is narrowing
+
+        if narrowing:
+
+            def _iter_searched_occurrences(*args, **kwargs):
+                raise AssertionError("searched from scratch")
+
+            monkeypatch.setattr(
+                search, "_iter_searched_occurrences", _iter_searched_occurrences
+            )
+
+        assert (
+            search.search_for_occurrences(
+                pattern=pattern, file=get_file, current_section="<section=first> ",
+            )
+            == found_occurrences
+        )
+
+    def test_search_narrowing_invalidated(self, get_file):
+        search = Search(defaults=defaults)
+
+        search.search_case_sensitive = False
+        search.search_all_sections = True
+        search.search_full_words = False
+        search.search_regex = False
+
+        search_key = search._get_search_key(
+            file=get_file, current_section="<section=first> "
+        )
+        search.search_for_occurrences(
+            pattern="qu", file=get_file, current_section="<section=first> ",
+        )
+        assert search._is_narrowing(pattern="quo", search_key=search_key) is True
+
+        # the occurrences of a search not consumed to the end are not kept
+        found_occurrences = search.iter_found_occurrences(
+            pattern="qu", file=get_file, current_section="<section=first> ",
+        )
+        next(found_occurrences)
+        assert search._is_narrowing(pattern="quo", search_key=search_key) is False
+
+        search.search_for_occurrences(
+            pattern="qu", file=get_file, current_section="<section=first> ",
+        )
+        search.search_full_words = True
+        assert (
+            search._is_narrowing(
+                pattern="quo",
+                search_key=search._get_search_key(
+                    file=get_file, current_section="<section=first> "
+                ),
+            )
+            is False
+        )
+        search.search_full_words = False
+
+        get_file.set_section_content(
+            section_separator="<section=second> ", section_content="Quod"
+        )
+        assert (
+            search._is_narrowing(
+                pattern="quo",
+                search_key=search._get_search_key(
+                    file=get_file, current_section="<section=first> "
+                ),
+            )
+            is False
+        )
+        assert search.search_for_occurrences(
+            pattern="quo", file=get_file, current_section="<section=first> ",
+        ) == {"<section=first> ": [0], "<section=second> ": [0]}
+
     def test_search_full_words(self, get_file):
         search = Search(defaults=defaults)
 
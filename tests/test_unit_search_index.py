@@ -0,0 +1,226 @@
+import pytest
+
+from notes_app.search_index import (
+    SearchIndex,
+    get_edit_distance,
+    get_fuzzy_max_distance,
+    get_trigrams,
+    is_literal_pattern,
+    normalize_text,
+)
+
+SECTIONS = {
+    "<section=first> ": "Quod equidem non reprehendo",
+    "<section=second> ": "Quis istum dolorem timet",
+    "<section=third> ": "DIYARBAKIR ΣΊΣΥΦΟΣ straße",
+}
+
+
+@pytest.fixture
+def get_search_index():
+    sections = dict(SECTIONS)
+
+    def get_section_content(section_separator):
+        return sections[section_separator]
+
+    search_index = SearchIndex(get_section_content=get_section_content)
+    search_index.sections = sections
+    return search_index
+
+
+def test_normalize_text():
+    assert normalize_text("Quod ΣΊΣΥΦΟΣ") == "quod σίσυφοσ"
+    assert normalize_text("Straße") == "strasse"
+    assert normalize_text("DİYARBAKIR dıyarbakır") == "diyarbakir diyarbakir"
+
+
+@pytest.mark.parametrize(
+    "pattern, is_literal",
+    [("quod", True), ("non repr", True), ("qu.d", False), ("(quod)", False)],
+)
+def test_is_literal_pattern(pattern, is_literal):
+    assert is_literal_pattern(pattern=pattern) is is_literal
+
+
+@pytest.mark.parametrize(
+    "pattern, candidate_section_separators",
+    [
+        ("do", ["<section=first> ", "<section=second> "]),
+        ("quod", ["<section=first> "]),
+        ("QUI", ["<section=first> ", "<section=second> "]),
+        ("non quis", []),
+        ("em non", ["<section=first> "]),
+        ("em non rep", ["<section=first> "]),
+        ("um dol", ["<section=second> "]),
+        ("um dolorem t", ["<section=second> "]),
+        ("mdol", []),
+        ("diyarbakır", ["<section=third> "]),
+        ("σίσυφος", ["<section=third> "]),
+        ("strasse", ["<section=third> "]),
+        ("  ", ["<section=first> ", "<section=second> ", "<section=third> "]),
+    ],
+)
+def test_get_candidate_section_separators(
+    get_search_index, pattern, candidate_section_separators
+):
+    assert (
+        get_search_index.get_candidate_section_separators(
+            pattern=pattern, section_separators=sorted(SECTIONS)
+        )
+        == candidate_section_separators
+    )
+
+
+def test_get_candidate_section_separators_not_all_sections(get_search_index):
+    assert get_search_index.get_candidate_section_separators(
+        pattern="do", section_separators=["<section=second> "]
+    ) == ["<section=second> "]
+
+
+def test_invalidate_section(get_search_index):
+    section_separators = sorted(SECTIONS)
+    assert get_search_index.get_candidate_section_separators(
+        pattern="quod", section_separators=section_separators
+    ) == ["<section=first> "]
+
+    get_search_index.sections["<section=first> "] = "Quis"
+    get_search_index.sections["<section=second> "] = "Quod"
+    # the index is not updated until the changed sections get invalidated
+    assert get_search_index.get_candidate_section_separators(
+        pattern="quod", section_separators=section_separators
+    ) == ["<section=first> "]
+
+    get_search_index.invalidate_section(section_separator="<section=first> ")
+    get_search_index.invalidate_section(section_separator="<section=second> ")
+    assert get_search_index.get_candidate_section_separators(
+        pattern="quod", section_separators=section_separators
+    ) == ["<section=second> "]
+
+
+def test_rename_section(get_search_index):
+    get_search_index.get_candidate_section_separators(
+        pattern="quod", section_separators=sorted(SECTIONS)
+    )
+
+    get_search_index.sections["<section=fourth> "] = get_search_index.sections.pop(
+        "<section=first> "
+    )
+    get_search_index.rename_section(
+        old_section_separator="<section=first> ",
+        new_section_separator="<section=fourth> ",
+    )
+    assert get_search_index.get_candidate_section_separators(
+        pattern="quod", section_separators=sorted(get_search_index.sections)
+    ) == ["<section=fourth> "]
+
+
+def test_clear(get_search_index):
+    get_search_index.get_candidate_section_separators(
+        pattern="quod", section_separators=sorted(SECTIONS)
+    )
+
+    get_search_index.sections["<section=first> "] = "Quis"
+    get_search_index.clear()
+    assert (
+        get_search_index.get_candidate_section_separators(
+            pattern="quod", section_separators=sorted(SECTIONS)
+        )
+        == []
+    )
+
+
+def test_get_trigrams():
+    assert get_trigrams("quod") == {"\nqu", "quo", "uod", "od\n"}
+    assert get_trigrams("a") == {"\na\n"}
+
+
+@pytest.mark.parametrize(
+    "word, max_distance",
+    [("qu", 0), ("quo", 0), ("quod", 1), ("dolor", 1), ("dolore", 1), ("dolorem", 2)],
+)
+def test_get_fuzzy_max_distance(word, max_distance):
+    assert get_fuzzy_max_distance(word=word) == max_distance
+
+
+@pytest.mark.parametrize(
+    "pattern, text, max_distance, distance",
+    [
+        ("quod", "quod", 0, 0),
+        ("quod", "qoud", 2, 2),
+        ("quod", "quid", 1, 1),
+        ("quod", "quo", 1, 1),
+        ("quod", "quods", 1, 1),
+        ("quod", "aquod", 1, 1),
+        ("dolorem", "dolor", 1, None),
+        ("dolorem", "dolor", 2, 2),
+        ("reprehendo", "reprehnedo", 2, 2),
+        ("reprehendo", "rephrenedo", 2, None),
+        ("kitten", "sitting", 3, 3),
+        ("", "ab", 2, 2),
+    ],
+)
+def test_get_edit_distance(pattern, text, max_distance, distance):
+    assert (
+        get_edit_distance(pattern=pattern, text=text, max_distance=max_distance)
+        == distance
+    )
+
+
+def test_get_edit_distance_long_words():
+    pattern = "quod equidem non reprehendo" * 4
+    text = pattern.replace("non", "nun").replace("quod", "qod", 1)
+    assert get_edit_distance(pattern=pattern, text=text, max_distance=8) == 5
+    assert get_edit_distance(pattern=pattern, text=text, max_distance=4) is None
+
+
+@pytest.mark.parametrize(
+    "word, max_distance, fuzzy_words",
+    [
+        ("dolorum", 2, {"dolorem": 1}),
+        ("reprehnedo", 2, {"reprehendo": 2}),
+        ("quis", 0, {"quis": 0}),
+        ("quid", 1, {"quod": 1, "quis": 1}),
+        ("strase", 1, {"strasse": 1}),
+        ("sisyphos", 2, {}),
+    ],
+)
+def test_get_fuzzy_words(get_search_index, word, max_distance, fuzzy_words):
+    assert (
+        get_search_index.get_fuzzy_words(
+            word=word, max_distance=max_distance, section_separators=sorted(SECTIONS)
+        )
+        == fuzzy_words
+    )
+
+
+def test_get_fuzzy_words_vocabulary_update(get_search_index):
+    section_separators = sorted(SECTIONS)
+    assert (
+        get_search_index.get_fuzzy_words(
+            word="timot", max_distance=1, section_separators=section_separators
+        )
+        == {"timet": 1}
+    )
+
+    get_search_index.sections["<section=first> "] = "Quod timor"
+    get_search_index.invalidate_section(section_separator="<section=first> ")
+    assert get_search_index.get_fuzzy_words(
+        word="timot", max_distance=1, section_separators=section_separators
+    ) == {"timet": 1, "timor": 1}
+
+
+def test_get_fuzzy_candidate_section_separators(get_search_index):
+    section_separators = sorted(SECTIONS)
+    assert get_search_index.get_fuzzy_candidate_section_separators(
+        fuzzy_words=[{"quod": 1, "quis": 1}], section_separators=section_separators
+    ) == ["<section=first> ", "<section=second> "]
+    assert get_search_index.get_fuzzy_candidate_section_separators(
+        fuzzy_words=[{"quod": 1, "quis": 1}, {"timet": 0}],
+        section_separators=section_separators,
+    ) == ["<section=second> "]
+
+
+def test_get_section_words(get_search_index):
+    assert get_search_index.get_section_words(
+        section_separator="<section=second> "
+    ) == {"quis", "istum", "dolorem", "timet"}
@@ -0,0 +1,101 @@
+import os
+from os import getcwd, stat
+
+import pytest
+
+from notes_app.section_index import (
+    get_section_index_file_path,
+    get_section_content_hash,
+    read_section_index,
+    write_section_index,
+)
+
+SECTION_OFFSETS = {"<section=first> ": (16, 44), "<section=second> ": (61, 85)}
+SECTION_HASHES = {"<section=first> ": 1, "<section=second> ": 2}
+
+
+@pytest.fixture
+def get_indexed_file_path():
+    file_path = f"{getcwd()}/indexed.txt"
+    with open(file=file_path, mode="w", encoding="utf8") as f:
+        f.write(
+            """<section=first> Quod equidem non reprehendo
+<section=second> Quis istum dolorem timet"""
+        )
+    yield file_path
+    for fp in (file_path, get_section_index_file_path(file_path=file_path)):
+        if os.path.exists(fp):
+            os.remove(fp)
+
+
+def test_get_section_index_file_path():
+    assert (
+        get_section_index_file_path(file_path="/tmp/notes.txt")
+        == "/tmp/.notes.txt.sections"
+    )
+    assert get_section_index_file_path(file_path="notes.txt") == ".notes.txt.sections"
+
+
+def test_get_section_content_hash():
+    assert get_section_content_hash(section_content_data=b"abc") == 891568578
+    assert get_section_content_hash(
+        section_content_data=memoryview(b"abc")
+    ) == get_section_content_hash(section_content_data=b"abc")
+
+
+def test_write_read_section_index(get_indexed_file_path):
+    file_stat = stat(get_indexed_file_path)
+
+    assert read_section_index(file_path=get_indexed_file_path, file_stat=file_stat) is None
+
+    assert (
+        write_section_index(
+            file_path=get_indexed_file_path,
+            file_stat=file_stat,
+            section_offsets=SECTION_OFFSETS,
+            section_hashes=SECTION_HASHES,
+        )
+        is None
+    )
+
+    assert read_section_index(
+        file_path=get_indexed_file_path, file_stat=file_stat
+    ) == (SECTION_OFFSETS, SECTION_HASHES)
+
+
+def test_read_section_index_file_changed(get_indexed_file_path):
+    write_section_index(
+        file_path=get_indexed_file_path,
+        file_stat=stat(get_indexed_file_path),
+        section_offsets=SECTION_OFFSETS,
+        section_hashes=SECTION_HASHES,
+    )
+
+    with open(file=get_indexed_file_path, mode="a", encoding="utf8") as f:
+        f.write("!")
+
+    assert (
+        read_section_index(
+            file_path=get_indexed_file_path, file_stat=stat(get_indexed_file_path)
+        )
+        is None
+    )
+
+
+def test_read_section_index_corrupted(get_indexed_file_path):
+    file_stat = stat(get_indexed_file_path)
+
+    write_section_index(
+        file_path=get_indexed_file_path,
+        file_stat=file_stat,
+        section_offsets=SECTION_OFFSETS,
+        section_hashes=SECTION_HASHES,
+    )
+
+    section_index_file_path = get_section_index_file_path(
+        file_path=get_indexed_file_path
+    )
+    with open(file=section_index_file_path, mode="r+b") as f:
+        f.truncate(os.path.getsize(section_index_file_path) - 1)
+
+    assert read_section_index(file_path=get_indexed_file_path, file_stat=file_stat) is None
@@ -0,0 +1,232 @@
+import os
+import sqlite3
+from os import getcwd
+
+import pytest
+
+from notes_app.storage.sqlite_storage import (
+    SQLITE_SYNCHRONOUS_FULL,
+    SqliteStorage,
+    _get_section_positions,
+)
+
+
+@pytest.fixture
+def get_sqlite_storage():
+    file_path = f"{getcwd()}/storage.sqlite"
+    storage = SqliteStorage(file_path=file_path)
+    storage.save_sections(
+        section_separators=["<section=first> ", "<section=second> "],
+        changed_sections=[
+            ("<section=first> ", "Quod equidem non reprehendo\n"),
+            ("<section=second> ", "Quis istum dolorem timet"),
+        ],
+    )
+    yield storage
+    storage.close()
+    for fp in (file_path, f"{file_path}-wal", f"{file_path}-shm"):
+        if os.path.exists(fp):
+            os.remove(fp)
+
+
+def get_sections_rows(storage):
+    with sqlite3.connect(storage._file_path) as connection:
+        return connection.execute(
+            "SELECT section_separator, position, version FROM sections ORDER BY position"
+        ).fetchall()
+
+
+@pytest.mark.parametrize(
+    "section_separators, saved_section_positions, result",
+    [
+        (["a", "b"], {}, [0, 1]),
+        (["a", "b", "c"], {"a": 0, "b": 1}, [0, 1, 2]),
+        (["a", "c"], {"a": 0, "b": 1, "c": 2}, [0, 2]),
+        (["b", "a"], {"a": 0, "b": 1}, [1, 2]),
+        (["c", "a", "b"], {"a": 0, "b": 1, "c": 2}, [2, 3, 4]),
+    ],
+)
+def test__get_section_positions(section_separators, saved_section_positions, result):
+    assert (
+        _get_section_positions(
+            section_separators=section_separators,
+            saved_section_positions=saved_section_positions,
+        )
+        == result
+    )
+
+
+class TestSqliteStorage:
+    def test_read_section_separators(self, get_sqlite_storage):
+        assert get_sqlite_storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+
+    def test_read_section_content(self, get_sqlite_storage):
+        assert (
+            get_sqlite_storage.read_section_content(section_separator="<section=second> ")
+            == "Quis istum dolorem timet"
+        )
+
+        with pytest.raises(KeyError):
+            get_sqlite_storage.read_section_content(section_separator="<section=a> ")
+
+    def test_save_sections(self, get_sqlite_storage):
+        assert (
+            get_sqlite_storage.save_sections(
+                section_separators=[
+                    "<section=first> ",
+                    "<section=second> ",
+                    "<section=a> ",
+                ],
+                changed_sections=[
+                    ("<section=second> ", "edited"),
+                    ("<section=a> ", "some content"),
+                ],
+            )
+            is None
+        )
+
+        assert get_sections_rows(storage=get_sqlite_storage) == [
+            ("<section=first> ", 0, 1),
+            ("<section=second> ", 1, 2),
+            ("<section=a> ", 2, 1),
+        ]
+        assert (
+            get_sqlite_storage.read_section_content(section_separator="<section=second> ")
+            == "edited"
+        )
+
+    def test_save_sections_delete_move(self, get_sqlite_storage):
+        get_sqlite_storage.save_sections(
+            section_separators=["<section=second> ", "<section=a> "],
+            changed_sections=[("<section=a> ", "Quod equidem non reprehendo\n")],
+            deleted_section_separators=["<section=first> "],
+        )
+
+        assert get_sections_rows(storage=get_sqlite_storage) == [
+            ("<section=second> ", 1, 1),
+            ("<section=a> ", 2, 1),
+        ]
+
+        get_sqlite_storage.save_sections(
+            section_separators=["<section=a> ", "<section=second> "],
+            changed_sections=[],
+        )
+
+        assert get_sqlite_storage.read_section_separators() == [
+            "<section=a> ",
+            "<section=second> ",
+        ]
+
+    def test_save_sections_other_instance(self, get_sqlite_storage):
+        assert get_sqlite_storage.is_changed() is False
+
+        storage = SqliteStorage(file_path=get_sqlite_storage._file_path)
+        storage.save_sections(
+            section_separators=["<section=first> ", "<section=second> ", "<section=b> "],
+            changed_sections=[("<section=b> ", "other instance")],
+        )
+        storage.close()
+
+        assert get_sqlite_storage.is_changed() is True
+
+        # the section saved by another instance is not deleted when not listed
+        get_sqlite_storage.save_sections(
+            section_separators=["<section=first> ", "<section=a> "],
+            changed_sections=[("<section=a> ", "some content")],
+            deleted_section_separators=["<section=second> "],
+        )
+        assert sorted(get_sqlite_storage.read_section_separators()) == [
+            "<section=a> ",
+            "<section=b> ",
+            "<section=first> ",
+        ]
+
+    def test_save_sections_error(self, get_sqlite_storage):
+        def get_changed_sections():
+            yield "<section=first> ", "edited"
+            raise OSError
+
+        with pytest.raises(OSError):
+            get_sqlite_storage.save_sections(
+                section_separators=["<section=first> "],
+                changed_sections=get_changed_sections(),
+            )
+
+        assert get_sqlite_storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+        assert (
+            get_sqlite_storage.read_section_content(section_separator="<section=first> ")
+            == "Quod equidem non reprehendo\n"
+        )
+
+    def test_journal_mode(self, get_sqlite_storage):
+        connection = get_sqlite_storage._get_connection()
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert connection.execute("PRAGMA synchronous").fetchone() == (1,)
+
+        storage = SqliteStorage(
+            file_path=get_sqlite_storage._file_path,
+            synchronous=SQLITE_SYNCHRONOUS_FULL,
+        )
+        assert storage._get_connection().execute("PRAGMA synchronous").fetchone() == (
+            2,
+        )
+        storage.close()
+
+    def test_close(self, get_sqlite_storage):
+        assert get_sqlite_storage.close() is None
+        assert get_sqlite_storage._connection is None
+
+        assert get_sqlite_storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+
+    def test_read_only(self, get_sqlite_storage):
+        file_path = get_sqlite_storage._file_path
+        get_sqlite_storage.close()
+        assert not os.path.exists(f"{file_path}-wal")
+
+        storage = SqliteStorage(file_path=file_path, read_only=True)
+        assert storage.read_section_separators() == [
+            "<section=first> ",
+            "<section=second> ",
+        ]
+        assert storage.is_changed() is False
+        # the write-ahead log files are not created
+        assert not os.path.exists(f"{file_path}-wal")
+        assert not os.path.exists(f"{file_path}-shm")
+        with pytest.raises(sqlite3.OperationalError):
+            storage.save_sections(
+                section_separators=["<section=first> "],
+                changed_sections=[("<section=first> ", "some content")],
+            )
+        storage.close()
+
+    def test_read_only_other_database(self, tmp_path):
+        file_path = str(tmp_path / "app.sqlite")
+        with sqlite3.connect(file_path) as connection:
+            connection.execute("CREATE TABLE sections (name TEXT)")
+        connection.close()
+        file_stat = os.stat(file_path)
+
+        storage = SqliteStorage(file_path=file_path, read_only=True)
+        with pytest.raises(ValueError):
+            storage.read_section_separators()
+        storage.close()
+
+        assert os.stat(file_path).st_mtime_ns == file_stat.st_mtime_ns
+        assert os.listdir(tmp_path) == ["app.sqlite"]
+
+        with open(file_path, mode="w", encoding="utf8") as f:
+            f.write("not a database")
+
+        storage = SqliteStorage(file_path=file_path, read_only=True)
+        with pytest.raises(sqlite3.DatabaseError):
+            storage.read_section_separators()
+        storage.close()
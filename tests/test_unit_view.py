@@ -9,6 +9,7 @@ from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.dialog import MDDialog
 from kivymd.uix.filemanager import MDFileManager, FloatButton
 from kivymd.uix.menu import MDDropdownMenu
+from kivymd.uix.textfield import TextInput
 
 from notes_app.defaults import Defaults
 from notes_app.file import (
@@ -16,7 +17,9 @@ from notes_app.file import (
     transform_section_name_to_section_separator,
     SECTION_FILE_NEW_SECTION_PLACEHOLDER,
 )
+from notes_app.folder_search import FolderSearchHit
 from notes_app.search import Search
+from notes_app.view import notes_view
 from notes_app.view.notes_view import (
     DrawerList,
     MenuSettingsItems,
@@ -304,15 +307,61 @@ class TestView:
 
         assert screen.dialog.title == "Add section:"
 
+    def test_custom_text_input_line_index(self, get_app):
+        screen = get_app.controller.get_screen()
+        text_input = screen.text_section_view
+
+        def assert_same_as_text_input():
+            text = text_input.text
+            for index in range(-1, len(text) + 2):
+                cursor = TextInput.get_cursor_from_index(text_input, index)
+                assert text_input.get_cursor_from_index(index) == cursor
+                assert text_input.cursor_index(cursor) == TextInput.cursor_index(
+                    text_input, cursor
+                )
+
+        # the long lines get wrapped into multiple rows
+        text_input.width = 200
+        text_input.text = "Quod equidem non reprehendo\n\n" + "Quis istum dolorem timet " * 5
+        text_input._refresh_text_from_property()
+        assert len(text_input._lines) > 3
+        assert_same_as_text_input()
+
+        text_input.cursor = text_input.get_cursor_from_index(5)
+        text_input.insert_text("sed ")
+        assert_same_as_text_input()
+        assert text_input.cursor_index() == 9
+
+        text_input.insert_text("x")
+        assert_same_as_text_input()
+        assert text_input.cursor_index() == 10
+
+        text_input.insert_text("\nnon")
+        assert_same_as_text_input()
+
+        text_input.do_backspace()
+        text_input.do_backspace()
+        assert_same_as_text_input()
+
+        text_input.text = "Quis"
+        text_input._refresh_text_from_property()
+        assert_same_as_text_input()
+
+        text_input.text = ""
+        text_input._refresh_text_from_property()
+        assert_same_as_text_input()
+
     def test_execute_goto_search_result(self, get_app):
         screen = get_app.controller.get_screen()
 
         class _CustomListItem:
-            def __init__(self, secondary_text, tertiary_text):
+            def __init__(self, secondary_text, tertiary_text, position_end):
+                self.file_path = ""
                 self.secondary_text = secondary_text
                 self.tertiary_text = tertiary_text
+                self.position_end = position_end
 
-        custom_list_item = _CustomListItem("second", "10")
+        custom_list_item = _CustomListItem("second", "10", 12)
 
         screen.dialog = MDDialog()
 
@@ -334,6 +383,31 @@ class TestView:
             == screen.search.search_all_sections
         )
 
+        assert (
+            screen.get_search_switch_state(switch_id="search_regex_switch")
+            == screen.search.search_regex
+        )
+
+        assert (
+            screen.get_search_switch_state(switch_id="search_live_switch")
+            == screen.search.search_live
+        )
+
+        assert (
+            screen.get_search_switch_state(switch_id="search_fuzzy_switch")
+            == screen.search.search_fuzzy
+        )
+
+        assert (
+            screen.get_search_switch_state(switch_id="search_multiple_switch")
+            == screen.search.search_multiple
+        )
+
+        assert (
+            screen.get_search_switch_state(switch_id="search_folder_switch")
+            == screen.search.search_folder
+        )
+
     def test_switch_callback(self, get_app):
         screen = get_app.controller.get_screen()
 
@@ -348,7 +422,24 @@ class TestView:
 
         assert screen.search.search_all_sections == "state2"
 
-    def test_execute_search(self, get_app):
+        screen.search_switch_callback(switch_id="search_regex_switch", state="state3")
+        assert screen.search.search_regex == "state3"
+
+        screen.search_switch_callback(switch_id="search_live_switch", state="state4")
+        assert screen.search.search_live == "state4"
+
+        screen.search_switch_callback(switch_id="search_fuzzy_switch", state="state5")
+        assert screen.search.search_fuzzy == "state5"
+
+        screen.search_switch_callback(
+            switch_id="search_multiple_switch", state="state6"
+        )
+        assert screen.search.search_multiple == "state6"
+
+        screen.search_switch_callback(switch_id="search_folder_switch", state="state7")
+        assert screen.search.search_folder == "state7"
+
+    def test_execute_search(self, get_app, monkeypatch):
         screen = get_app.controller.get_screen()
 
         class SearchDialogContent(MDBoxLayout):
@@ -357,6 +448,9 @@ class TestView:
             search_string_placeholder = StringProperty(None)
             search_results_message = StringProperty(None)
             execute_search = ObjectProperty(None)
+            get_search_result_texts = ObjectProperty(None)
+            execute_goto_search_result = ObjectProperty(None)
+            execute_live_search = ObjectProperty(None)
             cancel = ObjectProperty(None)
 
         def _(*args):
@@ -368,6 +462,9 @@ class TestView:
             search_string_placeholder="",
             search_results_message="",
             execute_search=_,
+            get_search_result_texts=screen.get_search_result_texts,
+            execute_goto_search_result=_,
+            execute_live_search=_,
             cancel=_,
         )
 
@@ -376,16 +473,25 @@ class TestView:
 
         assert screen.execute_search("") is None
         assert screen.dialog.content_cls.search_results_message == "Invalid search"
-        assert screen.dialog.content_cls.results_list.children == []
+        assert screen.dialog.content_cls.results_list.data == []
 
         assert screen.execute_search(None) is None
         assert screen.dialog.content_cls.search_results_message == "Invalid search"
-        assert screen.dialog.content_cls.results_list.children == []
+        assert screen.dialog.content_cls.results_list.data == []
+
+        screen.search.search_regex = True
+        assert screen.execute_search("(lor") is None
+        assert (
+            screen.dialog.content_cls.search_results_message
+            == "Invalid search pattern"
+        )
+        assert screen.dialog.content_cls.results_list.data == []
+        screen.search.search_regex = False
 
         screen.search.search_all_sections = False
         assert screen.execute_search("lor") is None
         assert screen.dialog.content_cls.search_results_message == "No match found"
-        assert screen.dialog.content_cls.results_list.children == []
+        assert screen.dialog.content_cls.results_list.data == []
 
         screen.search.search_all_sections = True
         assert screen.execute_search("lor") is None
@@ -393,59 +499,14 @@ class TestView:
             screen.dialog.content_cls.search_results_message
             == "Match on 1 position found"
         )
-        assert len(screen.dialog.content_cls.results_list.children) == 1
-        assert isinstance(
-            screen.dialog.content_cls.results_list.children[0], CustomListItem
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].text
-            == f"[b][color=ff0000]lor[/color][/b]em timet..."
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].secondary_text
-            == "section second"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].tertiary_text
-            == "position 13"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0]
-            .on_release.__str__()
-            .startswith(
-                "<bound method ButtonBehavior.on_release of <notes_app.view.notes_view.CustomListItem object at"
-            )
-        )
-
-        screen.search.search_case_sensitive = False
-        assert screen.execute_search("Quod") is None
-        assert (
-            screen.dialog.content_cls.search_results_message
-            == "Match on 1 position found"
-        )
-        assert len(screen.dialog.content_cls.results_list.children) == 1
-        assert isinstance(
-            screen.dialog.content_cls.results_list.children[0], CustomListItem
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].text
-            == f"[b][color=ff0000]Quod[/color][/b] equidem non reprehendo\n..."
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].secondary_text
-            == "section first"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].tertiary_text
-            == "position 0"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0]
-            .on_release.__str__()
-            .startswith(
-                "<bound method ButtonBehavior.on_release of <notes_app.view.notes_view.CustomListItem object at"
-            )
-        )
+        assert screen.dialog.content_cls.results_list.data == [
+            {
+                "section_separator": "<section=second> ",
+                "position_start": 13,
+                "position_end": 16,
+            }
+        ]
+        assert screen.search_results_event is None
 
         screen.search.search_case_sensitive = True
         assert screen.execute_search("Quod") is None
@@ -453,29 +514,13 @@ class TestView:
             screen.dialog.content_cls.search_results_message
             == "Match on 1 position found"
         )
-        assert len(screen.dialog.content_cls.results_list.children) == 1
-        assert isinstance(
-            screen.dialog.content_cls.results_list.children[0], CustomListItem
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].text
-            == f"[b][color=ff0000]Quod[/color][/b] equidem non reprehendo\n..."
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].secondary_text
-            == "section first"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].tertiary_text
-            == "position 0"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[0]
-            .on_release.__str__()
-            .startswith(
-                "<bound method ButtonBehavior.on_release of <notes_app.view.notes_view.CustomListItem object at"
-            )
-        )
+        assert screen.dialog.content_cls.results_list.data == [
+            {
+                "section_separator": "<section=first> ",
+                "position_start": 0,
+                "position_end": 4,
+            }
+        ]
 
         screen.search.search_case_sensitive = False
         assert screen.execute_search("Qu") is None
@@ -483,74 +528,264 @@ class TestView:
             screen.dialog.content_cls.search_results_message
             == "Matches on 3 positions found"
         )
-        assert len(screen.dialog.content_cls.results_list.children) == 3
-
-        assert isinstance(
-            screen.dialog.content_cls.results_list.children[0], CustomListItem
-        )
+        assert screen.dialog.content_cls.results_list.data == [
+            {
+                "section_separator": "<section=first> ",
+                "position_start": 0,
+                "position_end": 2,
+            },
+            {
+                "section_separator": "<section=first> ",
+                "position_start": 6,
+                "position_end": 8,
+            },
+            {
+                "section_separator": "<section=second> ",
+                "position_start": 0,
+                "position_end": 2,
+            },
+        ]
+
+        # the search results after the first page are added by the scheduled event
+        monkeypatch.setattr(notes_view, "SEARCH_LIST_PAGE_ITEM_COUNT", 2)
+        assert screen.execute_search("Qu") is None
         assert (
-            screen.dialog.content_cls.results_list.children[0].text
-            == f"[b][color=ff0000]Qu[/color][/b]is istum dolorem timet..."
+            screen.dialog.content_cls.search_results_message
+            == "Matches on 2 positions found so far"
         )
+        assert len(screen.dialog.content_cls.results_list.data) == 2
+        assert screen.search_results_event is not None
+
+        assert screen.search_results_event.get_callback()(0) is False
         assert (
-            screen.dialog.content_cls.results_list.children[0].secondary_text
-            == "section second"
+            screen.dialog.content_cls.search_results_message
+            == "Matches on 3 positions found"
         )
-        assert (
-            screen.dialog.content_cls.results_list.children[0].tertiary_text
-            == "position 0"
+        assert len(screen.dialog.content_cls.results_list.data) == 3
+        assert screen.search_results_event is None
+
+        screen.search.search_multiple = True
+        assert screen.execute_search("non, quis") is None
+        assert screen.dialog.content_cls.results_list.data == [
+            {
+                "section_separator": "<section=first> ",
+                "position_start": 13,
+                "position_end": 16,
+                "pattern": "non",
+            },
+            {
+                "section_separator": "<section=second> ",
+                "position_start": 0,
+                "position_end": 4,
+                "pattern": "quis",
+            },
+        ]
+        screen.search.search_multiple = False
+
+        assert screen.execute_search("Qu") is None
+        assert screen.search_results_event is not None
+        screen.cancel_dialog()
+        assert screen.search_results_event is None
+
+    def test_execute_search_folder(self, get_app, monkeypatch, tmp_path):
+        screen = get_app.controller.get_screen()
+
+        class SearchDialogContent(MDBoxLayout):
+            get_search_switch_state = ObjectProperty(None)
+            switch_callback = ObjectProperty(None)
+            search_string_placeholder = StringProperty(None)
+            search_results_message = StringProperty(None)
+            execute_search = ObjectProperty(None)
+            get_search_result_texts = ObjectProperty(None)
+            execute_goto_search_result = ObjectProperty(None)
+            execute_live_search = ObjectProperty(None)
+            cancel = ObjectProperty(None)
+
+        def _(*args):
+            return True
+
+        content = SearchDialogContent(
+            get_search_switch_state=_,
+            switch_callback=_,
+            search_string_placeholder="",
+            search_results_message="",
+            execute_search=_,
+            get_search_result_texts=screen.get_search_result_texts,
+            execute_goto_search_result=_,
+            execute_live_search=_,
+            cancel=_,
         )
-        assert (
-            screen.dialog.content_cls.results_list.children[0]
-            .on_release.__str__()
-            .startswith(
-                "<bound method ButtonBehavior.on_release of <notes_app.view.notes_view.CustomListItem object at"
-            )
+
+        screen.dialog = MDDialog(title="test title", content_cls=content)
+        screen.dialog.open()
+
+        file_path = tmp_path / "first.txt"
+        file_path.write_text(
+            "<section=first> Quis istum dolorem timet", encoding="utf8"
         )
-        assert isinstance(
-            screen.dialog.content_cls.results_list.children[1], CustomListItem
+        (tmp_path / "second.txt").write_text(
+            "<section=third> Quis quis", encoding="utf8"
         )
+        monkeypatch.setattr(screen.model, "file_path", str(file_path))
+
+        screen.search.search_folder = True
+        assert screen.execute_search("quis") is None
         assert (
-            screen.dialog.content_cls.results_list.children[1].text
-            == f"[b][color=ff0000]qu[/color][/b]idem non reprehendo\n..."
+            screen.dialog.content_cls.search_results_message
+            == "Matches on 0 positions found so far"
         )
+        assert screen.search_results_event is not None
+
+        while screen.search_results_event is not None:
+            screen.search_results_event.get_callback()(0)
+
         assert (
-            screen.dialog.content_cls.results_list.children[1].secondary_text
-            == "section first"
+            screen.dialog.content_cls.search_results_message
+            == "Matches on 3 positions found"
         )
+        assert sorted(
+            (data["file_path"], data["position_start"])
+            for data in screen.dialog.content_cls.results_list.data
+        ) == [
+            (str(file_path), 0),
+            (str(tmp_path / "second.txt"), 0),
+            (str(tmp_path / "second.txt"), 5),
+        ]
+
+        assert screen.execute_search("nothing") is None
+        while screen.search_results_event is not None:
+            screen.search_results_event.get_callback()(0)
+        assert screen.dialog.content_cls.search_results_message == "No match found"
+
+        screen.search.search_regex = True
+        assert screen.execute_search("(quis") is None
         assert (
-            screen.dialog.content_cls.results_list.children[1].tertiary_text
-            == "position 6"
+            screen.dialog.content_cls.search_results_message == "Invalid search pattern"
         )
-        assert (
-            screen.dialog.content_cls.results_list.children[1]
-            .on_release.__str__()
-            .startswith(
-                "<bound method ButtonBehavior.on_release of <notes_app.view.notes_view.CustomListItem object at"
+        screen.search.search_regex = False
+
+        assert screen.execute_search("quis") is None
+        assert screen.search_results_event is not None
+        screen.cancel_dialog()
+        assert screen.search_results_event is None
+
+    def test_get_search_result_texts(self, get_app):
+        screen = get_app.controller.get_screen()
+
+        assert screen.get_search_result_texts(
+            section_separator="<section=first> ", position_start=6, position_end=8
+        ) == {
+            "text": "[b][color=ff0000]qu[/color][/b]idem non reprehendo\n...",
+            "secondary_text": "section first",
+            "tertiary_text": "position 6",
+        }
+
+        assert screen.get_search_result_texts(
+            section_separator="<section=first> ",
+            position_start=6,
+            position_end=8,
+            pattern="QU",
+        ) == {
+            "text": "QU: [b][color=ff0000]qu[/color][/b]idem non reprehendo\n...",
+            "secondary_text": "section first",
+            "tertiary_text": "position 6",
+        }
+
+    def test_get_search_result_texts_folder(self, get_app):
+        screen = get_app.controller.get_screen()
+
+        assert screen.get_search_result_texts(
+            section_separator="<section=third> ",
+            position_start=10,
+            position_end=12,
+            file_path="/notes/other.txt",
+            context="quod quis",
+        ) == {
+            "text": "other.txt: [b][color=ff0000]qu[/color][/b]od quis...",
+            "secondary_text": "section third",
+            "tertiary_text": "position 10",
+        }
+
+    def test_get_folder_search_result_data(self, get_app):
+        screen = get_app.controller.get_screen()
+
+        assert screen.get_folder_search_result_data(
+            folder_search_hit=FolderSearchHit(
+                file_path="/notes/other.txt",
+                section_separator="<section=third> ",
+                start=10,
+                end=12,
+                context="quod quis",
             )
+        ) == {
+            "file_path": "/notes/other.txt",
+            "section_separator": "<section=third> ",
+            "position_start": 10,
+            "position_end": 12,
+            "context": "quod quis",
+        }
+
+    def test_get_search_result_data(self, get_app):
+        screen = get_app.controller.get_screen()
+
+        screen.search.search_multiple = False
+        assert screen.get_search_result_data(
+            pattern="qu",
+            section_separator="<section=first> ",
+            position_start=6,
+            position_end=8,
+        ) == {
+            "section_separator": "<section=first> ",
+            "position_start": 6,
+            "position_end": 8,
+        }
+
+        screen.search.search_multiple = True
+        assert screen.get_search_result_data(
+            pattern="qu",
+            section_separator="<section=first> ",
+            position_start=6,
+            position_end=8,
+        ) == {
+            "section_separator": "<section=first> ",
+            "position_start": 6,
+            "position_end": 8,
+            "pattern": "qu",
+        }
+
+    def test_custom_list_item(self, get_app):
+        screen = get_app.controller.get_screen()
+
+        class _SearchResultsList:
+            def __init__(self):
+                self.get_item_texts = screen.get_search_result_texts
+                self.goto_items = []
+
+            def execute_goto_item(self, item):
+                self.goto_items.append(item)
+
+        search_results_list = _SearchResultsList()
+        custom_list_item = CustomListItem()
+        custom_list_item.refresh_view_attrs(
+            search_results_list,
+            0,
+            {
+                "section_separator": "<section=second> ",
+                "position_start": 0,
+                "position_end": 4,
+            },
         )
-        assert isinstance(
-            screen.dialog.content_cls.results_list.children[2], CustomListItem
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[2].text
-            == f"[b][color=ff0000]Qu[/color][/b]od equidem non reprehendo\n..."
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[2].secondary_text
-            == "section first"
-        )
-        assert (
-            screen.dialog.content_cls.results_list.children[2].tertiary_text
-            == "position 0"
-        )
+
         assert (
-            screen.dialog.content_cls.results_list.children[2]
-            .on_release.__str__()
-            .startswith(
-                "<bound method ButtonBehavior.on_release of <notes_app.view.notes_view.CustomListItem object at"
-            )
+            custom_list_item.text
+            == f"[b][color=ff0000]Quis[/color][/b] istum dolorem timet..."
         )
+        assert custom_list_item.secondary_text == "section second"
+        assert custom_list_item.tertiary_text == "position 0"
+        assert custom_list_item.position_end == 4
+
+        custom_list_item.on_release()
+        assert search_results_list.goto_items == [custom_list_item]
 
     def test_execute_add_section(self, get_app):
         screen = get_app.controller.get_screen()
@@ -675,6 +910,40 @@ class TestView:
         # assert screen.execute_goto_external_url()
         pass
 
+    def test_execute_live_search(self, get_app):
+        screen = get_app.controller.get_screen()
+        screen.press_icon_search()
+
+        screen.search.search_live = False
+        assert screen.execute_live_search("lor") is None
+        assert screen.live_search_event is None
+
+        screen.search.search_live = True
+        assert screen.execute_live_search("") is None
+        assert screen.live_search_event is None
+
+        assert screen.execute_live_search("lo") is None
+        live_search_event = screen.live_search_event
+        assert live_search_event is not None
+
+        # a changed search string reschedules the search
+        screen.search.search_all_sections = True
+        assert screen.execute_live_search("lor") is None
+        assert screen.live_search_event is not live_search_event
+
+        screen.live_search_event.get_callback()(0)
+        assert screen.live_search_event is None
+        assert (
+            screen.dialog.content_cls.search_results_message
+            == "Match on 1 position found"
+        )
+        assert screen.last_searched_string == "lor"
+
+        assert screen.execute_live_search("lore") is None
+        assert screen.live_search_event is not None
+        assert screen.cancel_dialog() is None
+        assert screen.live_search_event is None
+
     def test_cancel_dialog(self, get_app):
         screen = get_app.controller.get_screen()
 
@@ -790,6 +1059,47 @@ class TestView:
             == """<section=first> Quod equidem non reprehendo\n<section=second> Quis istum dolorem timet<section=a> test text mod"""
         )
 
+    def test_save_current_section_to_file_is_external_update_three_way_merge(
+        self, get_app
+    ):
+        screen = get_app.controller.get_screen()
+
+        assert screen.text_section_view.section_file_separator == "<section=first> "
+        assert screen.text_section_view.text == "Quod equidem non reprehendo\n"
+
+        # the external update appends to the current section
+        screen.file._data_by_sections = {
+            "<section=first> ": "Quod equidem non reprehendo sed\n",
+            "<section=second> ": "Quis istum dolorem timet",
+        }
+        text_data = screen.file.transform_data_by_sections_to_raw_data_content()
+        screen.controller.save_file_data(data=text_data)
+        screen.file.reload()
+        # the reloaded current section is shown again and becomes the base of the current change
+        screen.text_section_view.text = screen.file.get_section_content(
+            section_separator="<section=first> "
+        )
+
+        # the current change deletes a word the external update did not touch
+        screen.text_section_view.text = "Quod non reprehendo\n"
+
+        screen.file._data_by_sections = {
+            "<section=first> ": "Quod equidem non reprehendo sed quis\n",
+            "<section=second> ": "Quis istum dolorem timet",
+        }
+        text_data = screen.file.transform_data_by_sections_to_raw_data_content()
+        screen.controller.save_file_data(data=text_data)
+
+        d = datetime.today() - timedelta(hours=1)
+        get_app.controller.model._last_updated_on = int(d.timestamp())
+
+        assert screen.save_current_section_to_file() is None
+        assert screen.text_section_view.text == "Quod non reprehendo sed quis\n"
+        assert (
+            screen.file.get_raw_data_content()
+            == """<section=first> Quod non reprehendo sed quis\n<section=second> Quis istum dolorem timet"""
+        )
+
     def test_save_current_section_to_file_is_external_update_delete_current_section(
         self, get_app
     ):
@@ -858,6 +1168,34 @@ class TestView:
             == """<section=first> Quod equidem non reprehendo\n<section=second> Quis istum dolorem timet<section=test> test data"""
         )
 
+    def test_save_current_section_to_file_is_external_update_keeps_changes_to_different_section(
+        self, get_app
+    ):
+        screen = get_app.controller.get_screen()
+
+        assert screen.text_section_view.section_file_separator == "<section=first> "
+
+        # a change to a different section not saved yet
+        screen.file.set_section_content(
+            section_separator="<section=second> ",
+            section_content="Quis istum dolorem timet sed",
+        )
+
+        # external update of the current section
+        screen.controller.save_file_data(
+            data="<section=first> Quod equidem non reprehendo quis\n<section=second> Quis istum dolorem timet"
+        )
+
+        d = datetime.today() - timedelta(hours=1)
+        get_app.controller.model._last_updated_on = int(d.timestamp())
+
+        assert screen.save_current_section_to_file() is None
+        assert screen.text_section_view.text == "Quod equidem non reprehendo quis\n"
+        assert (
+            screen.file.get_raw_data_content()
+            == """<section=first> Quod equidem non reprehendo quis\n<section=second> Quis istum dolorem timet sed"""
+        )
+
     def test_save_current_section_to_file_handle_error(self, get_app):
         # setting model._last_updated_on manually will guarantee model.external_update returns False
         get_app.controller.model._last_updated_on = int(time.time())
@@ -970,6 +1308,9 @@ class TestView:
         assert screen.dialog.content_cls.execute_search.__str__().startswith(
             "<bound method NotesView.execute_search of <Screen name=''>>"
         )
+        assert screen.dialog.content_cls.execute_live_search.__str__().startswith(
+            "<bound method NotesView.execute_live_search of <Screen name=''>>"
+        )
         assert screen.dialog.content_cls.cancel.__str__().startswith(
             "<bound method NotesView.cancel_dialog of <Screen name=''>>"
         )
@@ -1011,7 +1352,10 @@ class TestView:
 
         assert len(screen.ids.md_list.children) == 2
 
-        assert screen.file._data_by_sections == {
+        assert {
+            section_separator: screen.file.get_section_content(section_separator)
+            for section_separator in screen.file.section_separators_sorted
+        } == {
             "<section=first> ": "Quod equidem non reprehendo\n",
             "<section=second> ": "Quis istum dolorem timet",
         }
@@ -1030,9 +1374,10 @@ class TestView:
 
         assert screen.file.section_separators_sorted[0] == "<section=first> "
 
-        assert screen.file._data_by_sections == {
-            "<section=first> ": "Quod equidem non reprehendo\n"
-        }
+        assert {
+            section_separator: screen.file.get_section_content(section_separator)
+            for section_separator in screen.file.section_separators_sorted
+        } == {"<section=first> ": "Quod equidem non reprehendo\n"}
 
         section_item = screen.ids.md_list.children[0]
         assert screen.press_delete_section(section_item=section_item) is None